@@ -1,8 +1,12 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional, Callable
 import random
-from .engine import World
+from .engine import World, marker
+from .sinks import LogSink, open_sink
+from .registry import REGISTRY
+from .instrument import Profiler
+from time import perf_counter
 from .events import (
     Event,
     ev_awaken_neo, ev_train_neo, ev_rescue_morpheus, ev_neo_ascends,
@@ -16,66 +20,124 @@ Action = Callable[[World], None]
 class Agent:
     name: str
     rng: random.Random
+    # False keeps the canon, deterministic policy; True draws choices from `rng`
+    stochastic: bool = False
     def choose(self, w: World) -> Optional[Event]:
         return None
 
 class NeoAgent(Agent):
+    HESITATE = 0.2  # stochastic: chance an awake Neo lets a tick pass
+
     def choose(self, w: World) -> Optional[Event]:
         if not w.neo_awake:
-            return ev_awaken_neo()
+            return REGISTRY.get(ev_awaken_neo)
+        if self.stochastic and self.rng.random() < self.HESITATE:
+            return None
         if w.get("Neo").power < 60:
-            return ev_train_neo()
+            return REGISTRY.get(ev_train_neo)
         if w.smith_factor > 0.6:
             # Negotiate then fight in same tick via two events
-            return ev_machines_negotiate()
+            return REGISTRY.get(ev_machines_negotiate)
         # default: assert dominance
-        return ev_neo_ascends()
+        return REGISTRY.get(ev_neo_ascends)
 
 class SmithAgent(Agent):
+    RATES = (0.15, 0.25, 0.35)  # stochastic spread rates (deterministic: 0.25)
+    DORMANT = 0.15  # stochastic: chance Smith lies low for a tick
+
     def choose(self, w: World) -> Optional[Event]:
+        if self.stochastic and self.rng.random() < self.DORMANT:
+            return None
         if w.smith_factor < 0.6:
-            return ev_smith_spreads(0.25)
-        return ev_smith_copies_oracle()
+            rate = self.rng.choice(self.RATES) if self.stochastic else 0.25
+            return REGISTRY.get(ev_smith_spreads, rate)
+        return REGISTRY.get(ev_smith_copies_oracle)
 
 class MachineCollectiveAgent(Agent):
     """Sentinels pressure; negotiate when Smith is existential."""
+    INTENSITIES = (0.1, 0.2, 0.3)  # stochastic assault strengths (deterministic: 0.2)
+
     def choose(self, w: World) -> Optional[Event]:
         if w.smith_factor >= 0.75:
-            return ev_machines_negotiate()
+            return REGISTRY.get(ev_machines_negotiate)
         if w.zion_alive and w.zion_defense > 0:
-            return ev_zion_assault(0.2)
+            intensity = self.rng.choice(self.INTENSITIES) if self.stochastic else 0.2
+            return REGISTRY.get(ev_zion_assault, intensity)
         return None
 
+def default_agents(rng: random.Random, stochastic: bool = False) -> List[Agent]:
+    return [NeoAgent("NeoAgent", rng, stochastic), SmithAgent("SmithAgent", rng, stochastic),
+            MachineCollectiveAgent("MachineAgent", rng, stochastic)]
+
 @dataclass
 class AgentSimulator:
     world: World
     rng: random.Random
     max_ticks: int = 12
+    jsonl_path: Optional[str] = None
+    sink: Optional[LogSink] = None
+    profiler: Optional[Profiler] = None
+    ticks_run: int = field(default=0, init=False)
 
     def run(self, agents: List[Agent]) -> World:
-        self.world.log_event(self._m("Prelude"), "Start", "Agent mode: Neo, Smith, Machines act per tick.", [], [])
-        for t in range(self.max_ticks):
-            self.world.log_event(self._m("Tick"), f"T{t+1}", "Decision phase.", [], [])
+        sink = self.sink or open_sink(self.jsonl_path)
+        if sink is not None:
+            self.world.subscribe(sink.write)
+        if self.profiler is not None:
+            self.profiler.attach(self.world)
+        try:
+            return self._run(agents)
+        finally:
+            if self.profiler is not None:
+                self.profiler.detach(self.world)
+            if sink is not None:
+                self.world.unsubscribe(sink.write)
+                if self.sink is None:
+                    sink.close()
+                else:
+                    sink.flush()
+
+    def _run(self, agents: List[Agent]) -> World:
+        # tick mode is a compatibility layer over the discrete-event scheduler:
+        # one recurring action per unit of time, polling every agent
+        from .scheduler import Scheduler
+        self.ticks_run = 0
+        world = self.world
+        peace = REGISTRY.get(ev_peace)
+        final_fight = REGISTRY.get(ev_final_fight, 8)
+        tick = self._m("Tick")
+        prof = self.profiler
+
+        def decide(sched: Scheduler) -> bool:
+            t = self.ticks_run
+            world.log_event(tick, f"T{t+1}", "Decision phase.", [], [])
+            self.ticks_run = t + 1
             # Each agent proposes one event
             chosen: List[Event] = []
             for a in agents:
-                ev = a.choose(self.world)
+                if prof is None:
+                    ev = a.choose(world)
+                else:
+                    t0 = perf_counter()
+                    ev = a.choose(world)
+                    prof.record_choose(a.name, perf_counter() - t0)
                 if ev: chosen.append(ev)
             # Apply each event
             for ev in chosen:
-                ev.run(self.world)
+                ev.run(world)
                 # optional: if Neo negotiated and Smith is high, try immediate fight
-                if ev.name.startswith("Machines negotiate") and self.world.smith_factor >= 0.6:
-                    ev_final_fight(8).run(self.world)
+                if ev.name.startswith("Machines negotiate") and world.smith_factor >= 0.6:
+                    final_fight.run(world)
             # Check peace condition each tick
-            ev_peace().run(self.world)
-            if self.world.peace or not self.world.zion_alive:
-                break
-        self.world.log_event(self._m("Epilogue"), "End", "Agent simulation finished.", [], [])
-        return self.world
+            peace.run(world)
+            return not (world.peace or not world.zion_alive or self.ticks_run >= self.max_ticks)
+
+        world.log_event(self._m("Prelude"), "Start", "Agent mode: Neo, Smith, Machines act per tick.", [], [])
+        if self.max_ticks > 0:
+            sched = Scheduler(world)
+            sched.every(1.0, decide)
+            sched.run()
+        world.log_event(self._m("Epilogue"), "End", "Agent simulation finished.", [], [])
+        return world
 
-    @staticmethod
-    def _m(name: str):
-        class MM:
-            def __init__(self, v): self.value = v
-        return MM(name)
+    _m = staticmethod(marker)
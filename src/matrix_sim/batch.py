@@ -0,0 +1,196 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+from .engine import World, Realm
+from .movies import SimulationConfig, init_world
+
+try:  # optional dependency: pip install matrix-trilogy[batch]
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("matrix_sim.batch needs NumPy (pip install numpy)")
+
+def _clip01(x):
+    # identical to events._clamp01 elementwise: max(0.0, min(1.0, x))
+    return np.minimum(np.maximum(x, 0.0), 1.0)
+
+_FLOATS = ("matrix_control", "zion_defense", "smith_factor")
+_INTS = ("humans_free", "humans_enslaved")
+_FLAGS = ("neo_awake", "neo_alive", "trinity_alive", "zion_alive", "peace", "prophecy_valid")
+
+class BatchWorld:
+    """N independent worlds as NumPy columns (macro state, flags, Neo's stats).
+
+    Per-world parameters (`architect_zion`, `smith_rate`, `zion_intensity`,
+    `final_bonus`) are columns too, so one pass over the canon event list
+    advances every world with its own SimulationConfig.
+    """
+
+    def __init__(self, n: int, template: World | None = None):
+        _require_numpy()
+        w = template or init_world()
+        self.n = n
+        for f in _FLOATS:
+            setattr(self, f, np.full(n, getattr(w, f), dtype=np.float64))
+        for f in _INTS:
+            setattr(self, f, np.full(n, getattr(w, f), dtype=np.int64))
+        for f in _FLAGS:
+            setattr(self, f, np.full(n, getattr(w, f), dtype=bool))
+        neo = w.get("Neo")
+        self.neo_power = np.full(n, neo.power, dtype=np.int64)
+        self.neo_realm = np.full(n, neo.realm.value, dtype=np.int8)
+        self.neo_char_alive = np.full(n, neo.alive, dtype=bool)
+        cfg = SimulationConfig()
+        self.architect_zion = np.full(n, cfg.architect_choice.upper() == "ZION", dtype=bool)
+        self.smith_rate = np.full(n, cfg.smith_rate, dtype=np.float64)
+        self.zion_intensity = np.full(n, cfg.zion_intensity, dtype=np.float64)
+        self.final_bonus = np.full(n, cfg.final_bonus, dtype=np.int64)
+        self.ran = np.zeros((n, len(CANON)), dtype=bool)
+
+    @classmethod
+    def from_configs(cls, cfgs: Sequence[SimulationConfig]) -> "BatchWorld":
+        bw = cls(len(cfgs))
+        bw.architect_zion[:] = [c.architect_choice.upper() == "ZION" for c in cfgs]
+        bw.smith_rate[:] = [c.smith_rate for c in cfgs]
+        bw.zion_intensity[:] = [c.zion_intensity for c in cfgs]
+        bw.final_bonus[:] = [c.final_bonus for c in cfgs]
+        return bw
+
+    @classmethod
+    def from_params(cls, n: int, architect_choice="TRINITY", smith_rate=0.30,
+                    zion_intensity=0.25, final_bonus=8) -> "BatchWorld":
+        """Scalars broadcast; arrays (length n) give per-world values."""
+        bw = cls(n)
+        if isinstance(architect_choice, str):
+            bw.architect_zion[:] = architect_choice.upper() == "ZION"
+        else:
+            bw.architect_zion[:] = [str(a).upper() == "ZION" for a in architect_choice]
+        bw.smith_rate[:] = smith_rate
+        bw.zion_intensity[:] = zion_intensity
+        bw.final_bonus[:] = final_bonus
+        return bw
+
+    def run(self) -> "BatchWorld":
+        """Advance all worlds through the canon event list (build_events_trilogy order)."""
+        for j, (_, step) in enumerate(CANON):
+            self.ran[:, j] = step(self)
+        return self
+
+    def snapshot(self, i: int) -> Dict[str, Any]:
+        """World.snapshot() of world i (Python rounding, so results compare exactly)."""
+        snap: Dict[str, Any] = {}
+        for f in _FLOATS + _INTS + _FLAGS:
+            v = getattr(self, f)[i]
+            if f in _FLOATS:
+                snap[f] = round(float(v), 3)
+            elif f in _INTS:
+                snap[f] = int(v)
+            else:
+                snap[f] = bool(v)
+        return snap
+
+    def skipped(self, i: int) -> List[str]:
+        return [name for (name, _), ran in zip(CANON, self.ran[i]) if not ran]
+
+# ---- Vectorized canon events (each returns the "ran" mask) ----
+
+def _all(bw: BatchWorld):
+    return np.ones(bw.n, dtype=bool)
+
+def _v_awaken_neo(bw: BatchWorld):
+    bw.neo_awake[:] = True
+    bw.neo_realm[:] = Realm.REAL.value
+    np.maximum(bw.neo_power, 30, out=bw.neo_power)
+    bw.humans_free += 1
+    bw.matrix_control = _clip01(bw.matrix_control - 0.02)
+    return _all(bw)
+
+def _v_train_neo(bw: BatchWorld):
+    m = bw.neo_awake.copy()
+    bw.neo_realm[m] = Realm.MATRIX.value
+    bw.neo_power = np.where(m, np.maximum(bw.neo_power, 60), bw.neo_power)
+    return m
+
+def _v_rescue_morpheus(bw: BatchWorld):
+    m = bw.neo_awake & bw.trinity_alive
+    bw.neo_power = np.where(m, np.maximum(bw.neo_power, 70), bw.neo_power)
+    bw.matrix_control = np.where(m, _clip01(bw.matrix_control - 0.03), bw.matrix_control)
+    return m
+
+def _v_neo_ascends(bw: BatchWorld):
+    m = bw.neo_awake.copy()
+    bw.neo_power = np.where(m, np.maximum(bw.neo_power, 90), bw.neo_power)
+    bw.matrix_control = np.where(m, _clip01(bw.matrix_control - 0.05), bw.matrix_control)
+    bw.smith_factor = np.where(m, np.maximum(bw.smith_factor, 0.05), bw.smith_factor)
+    return m
+
+def _v_noop(bw: BatchWorld):
+    return _all(bw)
+
+def _v_keymaker_freed(bw: BatchWorld):
+    bw.matrix_control = _clip01(bw.matrix_control - 0.04)
+    return _all(bw)
+
+def _v_architect_choice(bw: BatchWorld):
+    z = bw.architect_zion
+    bw.zion_defense = np.where(z, 1.0, bw.zion_defense)
+    bw.matrix_control = np.where(z, 1.0, _clip01(bw.matrix_control - 0.02))
+    bw.prophecy_valid = z.copy()
+    return _all(bw)
+
+def _v_save_trinity(bw: BatchWorld):
+    m = bw.trinity_alive.copy()
+    bw.matrix_control = np.where(m, _clip01(bw.matrix_control - 0.02), bw.matrix_control)
+    return m
+
+def _v_smith_spreads(bw: BatchWorld):
+    bw.smith_factor = _clip01(bw.smith_factor + bw.smith_rate)
+    bw.matrix_control = _clip01(bw.matrix_control - 0.05)
+    return _all(bw)
+
+def _v_zion_assault(bw: BatchWorld):
+    bw.zion_defense = _clip01(bw.zion_defense - bw.zion_intensity)
+    bw.zion_alive = bw.zion_defense > 0.0
+    return _all(bw)
+
+def _v_smith_copies_oracle(bw: BatchWorld):
+    bw.smith_factor = _clip01(bw.smith_factor + 0.25)
+    return _all(bw)
+
+def _v_final_fight(bw: BatchWorld):
+    neo_power = np.maximum(bw.neo_power, 90)
+    threshold = np.trunc(60 + 40 * bw.smith_factor).astype(np.int64)
+    win = neo_power + bw.final_bonus >= threshold
+    bw.smith_factor = np.where(win, 0.0, _clip01(bw.smith_factor + 0.2))
+    bw.matrix_control = np.where(win, 0.5, bw.matrix_control)
+    bw.neo_char_alive &= ~win
+    bw.neo_alive &= ~win
+    return _all(bw)
+
+def _v_peace(bw: BatchWorld):
+    bw.peace |= bw.smith_factor == 0.0
+    return _all(bw)
+
+# Same order and names as events.build_events_trilogy
+CANON: List[Tuple[str, Callable[[BatchWorld], Any]]] = [
+    ("Neo awakens (Red Pill)", _v_awaken_neo),
+    ("Training (Kung Fu, Bullet Time)", _v_train_neo),
+    ("Rescue Morpheus", _v_rescue_morpheus),
+    ("Ascension: stop bullets & fly", _v_neo_ascends),
+    ("Merovingian & Persephone", _v_noop),
+    ("Keymaker freed", _v_keymaker_freed),
+    ("The Architect (choice)", _v_architect_choice),
+    ("Save Trinity", _v_save_trinity),
+    ("Smith spreads", _v_smith_spreads),
+    ("Sentinel assault on Zion", _v_zion_assault),
+    ("Smith copies the Oracle", _v_smith_copies_oracle),
+    ("Machines negotiate (Deus Ex Machina)", _v_noop),
+    ("Final fight: Neo vs Smith", _v_final_fight),
+    ("Peace accord", _v_peace),
+]
+
+def run_batch(cfgs: Sequence[SimulationConfig]) -> BatchWorld:
+    """Vectorized equivalent of running TimelineSimulator over build_trilogy(cfg) for every cfg."""
+    return BatchWorld.from_configs(cfgs).run()
@@ -0,0 +1,167 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import io, os, platform, random, tempfile, time, tracemalloc
+from .agents import AgentSimulator, NeoAgent, SmithAgent
+from .movies import SimulationConfig, build_trilogy, init_world
+from .simulate import TimelineSimulator, format_timeline
+from .sinks import JsonlSink
+from .themeindex import ThemeIndex
+
+# A case prepares its input (untimed) and returns the timed body; the body returns
+# how many events/records it processed.
+Body = Callable[[], int]
+
+@dataclass
+class Case:
+    name: str
+    setup: Callable[[float], Body]
+    full: bool = False   # long-running; only with `full=True` or when named explicitly
+
+def _n(base: int, scale: float) -> int:
+    return max(1, int(base * scale))
+
+def _agent_world(ticks: int, compact: bool = False, retention: str = "full"):
+    # Neo + Smith alone never reach peace or a fallen Zion, so every tick runs
+    rng = random.Random(0)
+    w = init_world()
+    w.set_retention(retention, keep=1000, compact=compact)
+    return AgentSimulator(w, rng, max_ticks=ticks), [NeoAgent("NeoAgent", rng), SmithAgent("SmithAgent", rng)]
+
+def _agent_log(ticks: int) -> List[Dict[str, Any]]:
+    sim, agents = _agent_world(ticks)
+    return sim.run(agents).log
+
+def case_timeline(scale: float, compiled: bool = False) -> Body:
+    runs = _n(500, scale)
+    def body() -> int:
+        n = 0
+        for _ in range(runs):
+            world, events = build_trilogy(SimulationConfig())
+            n += len(TimelineSimulator(world, compiled=compiled).run(events).log)
+        return n
+    return body
+
+def case_timeline_compiled(scale: float) -> Body:
+    return case_timeline(scale, compiled=True)
+
+def case_agent(ticks: int, compact: bool = False, retention: str = "full") -> Callable[[float], Body]:
+    def setup(scale: float) -> Body:
+        t = _n(ticks, scale)
+        def body() -> int:
+            sim, agents = _agent_world(t, compact, retention)
+            log = sim.run(agents).log
+            return getattr(log, "total", len(log))
+        return body
+    return setup
+
+def case_log_event(scale: float) -> Body:
+    n = _n(50_000, scale)
+    def body() -> int:
+        w = init_world()
+        tick = TimelineSimulator._m("Tick")
+        for i in range(n):
+            if i % 4 == 0:
+                w.smith_factor = (i % 100) / 100
+            w.log_event(tick, "T", "bench", [], [])
+        return n
+    return body
+
+def case_jsonl(scale: float) -> Body:
+    runs = _n(200, scale)
+    def body() -> int:
+        with tempfile.TemporaryDirectory() as d:
+            sink = JsonlSink(os.path.join(d, "bench.jsonl"))
+            n = 0
+            with sink:
+                for _ in range(runs):
+                    world, events = build_trilogy(SimulationConfig())
+                    n += len(TimelineSimulator(world, sink=sink).run(events).log)
+        return n
+    return body
+
+def case_format(scale: float) -> Body:
+    log = _agent_log(_n(2_000, scale))
+    def body() -> int:
+        format_timeline(log)
+        return len(log)
+    return body
+
+def case_theme_report(scale: float) -> Body:
+    world, events = build_trilogy(SimulationConfig())
+    one = TimelineSimulator(world).run(events).log
+    log = one * _n(2_000, scale)
+    def body() -> int:
+        idx = ThemeIndex.from_log(log)
+        idx.coverage()
+        idx.query(any_of=["FREE_WILL"])
+        return len(log)
+    return body
+
+CASES: List[Case] = [
+    Case("timeline_canon", case_timeline),
+    Case("timeline_compiled", case_timeline_compiled),
+    Case("agent_12", case_agent(12)),
+    Case("agent_2k", case_agent(2_000)),
+    Case("agent_1m", case_agent(1_000_000, compact=True), full=True),
+    Case("agent_1m_ring", case_agent(1_000_000, retention="ring"), full=True),
+    Case("log_event_snapshot", case_log_event),
+    Case("jsonl_emit", case_jsonl),
+    Case("format_timeline", case_format),
+    Case("theme_report", case_theme_report),
+]
+
+def run_case(case: Case, scale: float = 1.0, repeat: int = 3, memory: bool = True) -> Dict[str, Any]:
+    """Best-of-`repeat` wall time, plus tracemalloc peak from one extra (slower) pass."""
+    body = case.setup(scale)
+    best, events = float("inf"), 0
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        events = body()
+        best = min(best, time.perf_counter() - t0)
+    res: Dict[str, Any] = {"events": events, "seconds": round(best, 6),
+                           "events_per_sec": round(events / best, 1) if best > 0 else None}
+    if memory:
+        tracemalloc.start()
+        try:
+            body()
+            res["peak_kib"] = tracemalloc.get_traced_memory()[1] // 1024
+        finally:
+            tracemalloc.stop()
+    return res
+
+def run_benchmarks(only: Optional[Sequence[str]] = None, scale: float = 1.0, repeat: int = 3,
+                   memory: bool = True, progress: Optional[io.TextIOBase] = None,
+                   full: bool = False) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for case in CASES:
+        if only and case.name not in only:
+            continue
+        if case.full and not (full or only):
+            continue
+        results[case.name] = run_case(case, scale, repeat, memory)
+        if progress is not None:
+            progress.write(f"{case.name}: {results[case.name]}\n")
+            progress.flush()
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "scale": scale, "repeat": repeat, "full": full},
+        "results": results,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.25) -> List[str]:
+    """Regressions of `current` vs `baseline`: throughput or peak memory worse by more than `threshold`."""
+    problems = []
+    if current.get("meta", {}).get("scale") != baseline.get("meta", {}).get("scale"):
+        return [f"scale mismatch: {current.get('meta', {}).get('scale')} vs baseline {baseline.get('meta', {}).get('scale')}"]
+    for name, base in baseline.get("results", {}).items():
+        cur = current.get("results", {}).get(name)
+        if cur is None:
+            continue
+        if base.get("events_per_sec") and cur.get("events_per_sec") is not None:
+            if cur["events_per_sec"] < base["events_per_sec"] * (1 - threshold):
+                problems.append(f"{name}: {cur['events_per_sec']:.0f} ev/s vs baseline {base['events_per_sec']:.0f}")
+        if base.get("peak_kib") and cur.get("peak_kib") is not None:
+            if cur["peak_kib"] > base["peak_kib"] * (1 + threshold):
+                problems.append(f"{name}: peak {cur['peak_kib']} KiB vs baseline {base['peak_kib']} KiB")
+    return problems
@@ -0,0 +1,300 @@
+from __future__ import annotations
+from array import array
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
+import json, mmap, os, shutil, struct, sys, tempfile
+from .sinks import LogSink, Record
+
+try:  # optional: zero-copy NumPy column views
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+# File layout: MAGIC, u32 header length, JSON header, padding to 8 bytes, then
+# the columns back to back (each 8-byte aligned, offsets relative to the data start).
+MAGIC = b"MXBL\x01\x00\x00\x00"
+_ALIGN = 8
+# theme and myth *lists* are dictionary entries of their own (they repeat per
+# event definition); `theme` maps single names to bits of the `theme_mask` column
+_DICTS = ("movie", "event", "desc", "theme", "themes", "myths")
+# typecode per snapshot value type; bool is tested before int
+_SNAP_TYPES = ((bool, "B"), (int, "q"), (float, "d"))
+
+def _pad(n: int) -> int:
+    return -n % _ALIGN
+
+def _snap_code(v: Any) -> str:
+    for t, code in _SNAP_TYPES:
+        if isinstance(v, t):
+            return code
+    raise TypeError(f"unsupported snapshot value {v!r}")
+
+class _Dict:
+    __slots__ = ("ids", "values")
+
+    def __init__(self):
+        self.ids: Dict[Any, int] = {}
+        self.values: List[Any] = []
+
+    def __call__(self, v: Any) -> int:
+        key = tuple(v) if isinstance(v, list) else v
+        i = self.ids.get(key)
+        if i is None:
+            i = self.ids[key] = len(self.values)
+            self.values.append(v)
+        return i
+
+class BinlogSink(LogSink):
+    """Columnar binary log writer (a LogSink, so it takes the --jsonl path's place).
+
+    Strings are dictionary-encoded (movie u16; event, desc and the theme and
+    myth lists u32), themes are also a u64 bitmask for filtering, and every
+    snapshot field is a fixed-width column. Columns are spooled to one temp
+    file each and concatenated behind the header on close(), so memory stays
+    bounded by `buffer` records however long the run.
+    """
+
+    def __init__(self, path: str, buffer: int = 4096):
+        self.path = path
+        self.buffer = buffer
+        self.count = 0
+        self._dicts = {name: _Dict() for name in _DICTS}
+        self._cols: Dict[str, array] = {
+            "movie": array("H"), "event": array("I"), "desc": array("I"),
+            "themes": array("I"), "theme_mask": array("Q"), "myths": array("I"),
+        }
+        self._snap_fields: Optional[Tuple[str, ...]] = None
+        self._spool: Dict[str, BinaryIO] = {}
+        self._closed = False
+        self._masks: List[int] = []
+
+    def write(self, rec: Record) -> None:
+        d, cols = self._dicts, self._cols
+        cols["movie"].append(d["movie"](rec["movie"]))
+        cols["event"].append(d["event"](rec["event"]))
+        cols["desc"].append(d["desc"](rec["desc"]))
+        themes = rec["themes"]
+        n = len(d["themes"].values)
+        tid = d["themes"](themes)
+        cols["themes"].append(tid)
+        if tid == n:  # new theme list: work out its mask once
+            mask, theme = 0, d["theme"]
+            for t in themes:
+                bit = theme(t)
+                if bit >= 64:
+                    raise ValueError("binlog supports at most 64 distinct themes")
+                mask |= 1 << bit
+            self._masks.append(mask)
+        cols["theme_mask"].append(self._masks[tid])
+        cols["myths"].append(d["myths"](rec["myth"]))
+        snap = rec["snapshot"]
+        if self._snap_fields is None:
+            self._snap_fields = tuple(snap)
+            for f in self._snap_fields:
+                cols["snap." + f] = array(_snap_code(snap[f]))
+        elif tuple(snap) != self._snap_fields:
+            raise ValueError("snapshot fields changed mid-log")
+        for f in self._snap_fields:
+            col, v = cols["snap." + f], snap[f]
+            if col.typecode == "q" and isinstance(v, float):
+                col = self._promote("snap." + f)
+            col.append(v)
+        self.count += 1
+        if len(cols["movie"]) >= self.buffer:
+            self._spill()
+
+    def _promote(self, name: str) -> array:
+        # an int column met a float (e.g. a field that starts at 0): widen it to
+        # doubles, including whatever was already spooled
+        old = self._cols[name]
+        col = self._cols[name] = array("d", old)
+        fh = self._spool.get(name)
+        if fh is not None:
+            fh.seek(0)
+            ints = array("q")
+            ints.frombytes(fh.read())
+            fh.seek(0)
+            fh.truncate()
+            array("d", ints).tofile(fh)
+        return col
+
+    def _spill(self) -> None:
+        for name, col in self._cols.items():
+            if not col:
+                continue
+            fh = self._spool.get(name)
+            if fh is None:
+                fh = self._spool[name] = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(self.path)))
+            col.tofile(fh)
+            del col[:]
+
+    def flush(self) -> None:
+        self._spill()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._spill()
+        try:
+            if self.count:  # like JsonlSink, a sink that saw no records leaves no file
+                self._assemble()
+        finally:
+            for fh in self._spool.values():
+                fh.close()
+
+    def _assemble(self) -> None:
+        columns, offset = {}, 0
+        for name, col in self._cols.items():
+            fh = self._spool.get(name)
+            nbytes = fh.tell() if fh is not None else 0
+            columns[name] = {"type": col.typecode, "offset": offset, "nbytes": nbytes}
+            offset += nbytes + _pad(nbytes)
+        header = json.dumps({
+            "records": self.count,
+            "byteorder": sys.byteorder,
+            "snapshot_fields": list(self._snap_fields or ()),
+            "columns": columns,
+            "dicts": {name: d.values for name, d in self._dicts.items()},
+        }, ensure_ascii=False).encode("utf-8")
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as out:
+            out.write(MAGIC + struct.pack("<I", len(header)) + header)
+            out.write(b"\0" * _pad(len(MAGIC) + 4 + len(header)))
+            for name in columns:
+                fh = self._spool.get(name)
+                if fh is None:
+                    continue
+                fh.seek(0)
+                shutil.copyfileobj(fh, out)
+                out.write(b"\0" * _pad(columns[name]["nbytes"]))
+        os.replace(tmp, self.path)
+
+class BinlogReader:
+    """Memory-mapped reader: columns are zero-copy memoryviews over the file.
+
+    Views handed out by column() are released by close(); drop any NumPy
+    arrays first, since mmap refuses to close while they still exist.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fh = open(path, "rb")
+        self._views: Dict[str, memoryview] = {}
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path}: not a matrix-sim binlog")
+        (hlen,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        start = len(MAGIC) + 4
+        meta = json.loads(self._mm[start:start + hlen].decode("utf-8"))
+        if meta["byteorder"] != sys.byteorder:
+            self.close()
+            raise ValueError(f"{path}: written on a {meta['byteorder']}-endian machine")
+        self._base = start + hlen + _pad(start + hlen)
+        self.records: int = meta["records"]
+        self.snapshot_fields: List[str] = meta["snapshot_fields"]
+        self.columns: Dict[str, Dict[str, Any]] = meta["columns"]
+        self.dicts: Dict[str, List[str]] = meta["dicts"]
+        self._ids = {name: {v: i for i, v in enumerate(self.dicts[name])} for name in ("movie", "event", "theme")}
+
+    def __len__(self) -> int:
+        return self.records
+
+    def __enter__(self) -> "BinlogReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for view in self._views.values():
+            view.release()
+        self._views.clear()
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._fh.close()
+
+    def _key(self, name: str) -> str:
+        return name if name in self.columns or name.startswith("snap.") else "snap." + name
+
+    def column(self, name: str) -> memoryview:
+        """Zero-copy view of a raw column (`event`, `themes`, ...) or a snapshot field."""
+        key = self._key(name)
+        view = self._views.get(key)
+        if view is None:
+            meta = self.columns[key]
+            start = self._base + meta["offset"]
+            view = self._views[key] = memoryview(self._mm)[start:start + meta["nbytes"]].cast(meta["type"])
+        return view
+
+    def numpy(self, name: str):
+        if np is None:
+            raise ImportError("BinlogReader.numpy needs NumPy (pip install numpy)")
+        meta = self.columns[self._key(name)]
+        dtype = np.dtype(meta["type"])
+        return np.frombuffer(self._mm, dtype=dtype, count=meta["nbytes"] // dtype.itemsize,
+                             offset=self._base + meta["offset"])
+
+    def trajectory(self, field: str) -> memoryview:
+        """Per-record values of one snapshot field, e.g. `smith_factor`."""
+        if field not in self.snapshot_fields:
+            raise KeyError(f"unknown snapshot field {field!r}")
+        return self.column("snap." + field)
+
+    def theme_bit(self, theme: str) -> int:
+        i = self._ids["theme"].get(theme)
+        return 0 if i is None else 1 << i
+
+    def where(self, event: Optional[str] = None, theme: Optional[str] = None,
+              movie: Optional[str] = None) -> List[int]:
+        """Row numbers matching every given filter, found by comparing integer ids only."""
+        tests = []
+        if event is not None:
+            tests.append(("event", self._ids["event"].get(event, -1), False))
+        if movie is not None:
+            tests.append(("movie", self._ids["movie"].get(movie, -1), False))
+        if theme is not None:
+            tests.append(("theme_mask", self.theme_bit(theme), True))
+        if any(v == -1 or bit and v == 0 for _, v, bit in tests):
+            return []  # a value absent from the dictionary matches nothing
+        if np is not None:
+            keep = np.ones(self.records, dtype=bool)
+            for name, v, bit in tests:
+                col = self.numpy(name)
+                keep &= (col & v) != 0 if bit else col == v
+            return np.flatnonzero(keep).tolist()
+        rows = range(self.records)
+        for name, v, bit in tests:
+            col = self.column(name)
+            rows = [i for i in rows if col[i] & v] if bit else [i for i in rows if col[i] == v]
+        return list(rows)
+
+    def record(self, i: int) -> Record:
+        """Rebuild record `i` as the dict the simulators logged."""
+        if not 0 <= i < self.records:
+            raise IndexError(i)
+        d = self.dicts
+        snap = {}
+        for f in self.snapshot_fields:
+            meta = self.columns["snap." + f]
+            v = self.column("snap." + f)[i]
+            snap[f] = bool(v) if meta["type"] == "B" else v
+        return {"movie": d["movie"][self.column("movie")[i]], "event": d["event"][self.column("event")[i]],
+                "desc": d["desc"][self.column("desc")[i]],
+                "themes": list(d["themes"][self.column("themes")[i]]),
+                "myth": list(d["myths"][self.column("myths")[i]]), "snapshot": snap}
+
+    def __iter__(self) -> Iterator[Record]:
+        for i in range(self.records):
+            yield self.record(i)
+
+def convert_jsonl(src: str, dst: str) -> int:
+    """Re-encode a (possibly compressed) JSONL log as a binlog; returns the record count."""
+    from .sinks import open_text
+    sink = BinlogSink(dst)
+    with open_text(src) as fh, sink:
+        for line in fh:
+            if line.strip():
+                sink.write(json.loads(line))
+    return sink.count
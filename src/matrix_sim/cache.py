@@ -0,0 +1,305 @@
+from __future__ import annotations
+from contextlib import suppress
+from dataclasses import fields
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, get_type_hints
+import hashlib, json, os, sys, tempfile, types
+from .engine import SNAPSHOT_FIELDS, World
+from .events import Event
+from .instrument import Profiler
+from .registry import REGISTRY
+from .sinks import LogSink, open_text
+from .simulate import TimelineSimulator
+
+# bump when the entry layout or the key recipe changes
+CACHE_SCHEMA = 2
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+CACHE_DIR_ENV = "MATRIX_SIM_CACHE_DIR"
+
+def default_cache_dir() -> str:
+    if os.environ.get(CACHE_DIR_ENV):
+        return os.environ[CACHE_DIR_ENV]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "matrix-sim")
+
+@lru_cache(maxsize=None)
+def package_version() -> str:
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+        return version("matrix-trilogy")
+    except (ImportError, PackageNotFoundError):
+        return "0+source"
+
+# ---- Keys: hash of the initial world, the event definitions and the version ----
+
+def _code_digest(fn: Any, h: "hashlib._Hash", seen: Set[int]) -> None:
+    # bytecode, constants, closure values and same-package helpers (e.g. _clamp01)
+    code = getattr(fn, "__code__", None)
+    if code is None or id(code) in seen:
+        h.update(repr(fn).encode() if code is None else b"@")
+        return
+    seen.add(id(code))
+    stack, names = [code], set()
+    while stack:
+        co = stack.pop()
+        h.update(co.co_code)
+        h.update(repr(co.co_names).encode())
+        names.update(co.co_names)
+        for c in co.co_consts:
+            if isinstance(c, types.CodeType):
+                stack.append(c)
+            else:
+                h.update(repr(c).encode())
+    for cell in fn.__closure__ or ():
+        v = cell.cell_contents
+        if callable(v) and hasattr(v, "__code__"):
+            _code_digest(v, h, seen)
+        else:
+            h.update(repr(v).encode())
+    pkg = (fn.__module__ or "").split(".")[0]
+    for name in sorted(names):
+        g = fn.__globals__.get(name)
+        if isinstance(g, types.FunctionType) and (g.__module__ or "").split(".")[0] == pkg:
+            _code_digest(g, h, seen)
+
+# factory "module.qualname" -> digest of its code (nested effects and helpers included);
+# computed once per process, so keying a registry-built run only hashes the keys
+_FACTORY_DIGESTS: Dict[str, bytes] = {}
+
+def _factory_digest(name: str) -> Optional[bytes]:
+    d = _FACTORY_DIGESTS.get(name)
+    if d is None:
+        module, _, attr = name.rpartition(".")
+        fn = getattr(sys.modules.get(module), attr, None)
+        if not isinstance(fn, types.FunctionType):
+            return None
+        h = hashlib.sha256()
+        _code_digest(fn, h, set())
+        d = _FACTORY_DIGESTS[name] = h.digest()
+    return d
+
+def events_digest(events: Iterable[Event]) -> str:
+    """Fingerprint of an event list: registry keys and factory code, or texts, themes and effect code."""
+    h = hashlib.sha256()
+    seen: Set[int] = set()
+    for ev in events:
+        key = REGISTRY.key_of(ev)
+        code = _factory_digest(key.factory) if key is not None else None
+        if code is not None:  # the factory and its parameters determine the event
+            h.update(repr(key).encode())
+            h.update(code)
+            h.update(b"\0")
+            continue
+        h.update(repr((key, ev.movie.value, ev.name, ev.desc, sorted(ev.theme_names), ev.myth)).encode())
+        for fn in (ev.pre, ev.effect):
+            if fn is not None:
+                _code_digest(fn, h, seen)
+        h.update(b"\0")
+    return h.hexdigest()
+
+@lru_cache(maxsize=None)
+def _casts(cls: type) -> Tuple[Tuple[str, Any], ...]:
+    hints = get_type_hints(cls)
+    return tuple((f.name, hints[f.name] if hints.get(f.name) in (int, float, str) else None) for f in fields(cls))
+
+def normalize_config(config: Any) -> Dict[str, Any]:
+    """Dataclass config as a dict with every field cast to its declared type (8 and 8.0 hash alike)."""
+    return {name: cast(getattr(config, name)) if cast is not None else getattr(config, name)
+            for name, cast in _casts(type(config))}
+
+def run_key(world: World, events: List[Event], config: Any = None) -> str:
+    """Content address of a deterministic timeline run from `world` over `events`."""
+    state = {
+        "schema": CACHE_SCHEMA,
+        "version": package_version(),
+        "config": normalize_config(config) if config is not None else None,
+        "world": {f: getattr(world, f) for f in SNAPSHOT_FIELDS},
+        "chars": sorted(repr(c) for c in world.chars.values()),
+        "events": events_digest(events),
+    }
+    return hashlib.sha256(json.dumps(state, sort_keys=True, default=repr).encode()).hexdigest()
+
+# ---- Store ----
+
+class ResultCache:
+    """Content-addressed on-disk cache of run results, shared between processes.
+
+    Each entry is a small JSON file (final snapshot, record count, skipped
+    events) under `root/<key[:2]>/`, with the full log optionally beside it
+    as gzipped JSONL. Files are written to a temp name and renamed into
+    place, so concurrent readers and writers never see partial entries. A hit
+    touches the entry's mtime; when the store grows past `max_bytes` the
+    least recently used files are deleted.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+        self._size: Optional[int] = None
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.root, key[:2], key + suffix)
+
+    def get(self, key: str, with_log: bool = False) -> Optional[Dict[str, Any]]:
+        """The entry for `key` (with its "log" list if `with_log`), or None."""
+        path = self._path(key, ".json")
+        try:
+            with open(path, encoding="utf-8") as fh:
+                entry = json.load(fh)
+            if with_log:
+                log_path = self._path(key, ".log.jsonl.gz")
+                with open_text(log_path) as fh:
+                    entry["log"] = [json.loads(line) for line in fh if line.strip()]
+                os.utime(log_path)
+            os.utime(path)
+        except (OSError, ValueError, EOFError):  # missing, evicted meanwhile or corrupt
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any], log: Optional[Iterable[Dict[str, Any]]] = None) -> None:
+        os.makedirs(os.path.join(self.root, key[:2]), exist_ok=True)
+        written = 0
+        if log is not None:  # the log goes first: an entry on disk implies its log is complete
+            written += self._atomic(self._path(key, ".log.jsonl.gz"),
+                                    lambda path: _write_log(path, log))
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        written += self._atomic(self._path(key, ".json"), lambda path: _write_bytes(path, data))
+        if self._size is None:
+            self._size = self._scan_size()
+        else:
+            self._size += written
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def _atomic(self, dest: str, write) -> int:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dest), suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp)
+            size = os.path.getsize(tmp)
+            os.replace(tmp, dest)
+        except BaseException:
+            with suppress(FileNotFoundError):
+                os.unlink(tmp)
+            raise
+        return size
+
+    def _files(self) -> List[os.DirEntry]:
+        out = []
+        try:
+            subdirs = list(os.scandir(self.root))
+        except FileNotFoundError:
+            return out
+        for d in subdirs:
+            if d.is_dir():
+                out.extend(e for e in os.scandir(d.path) if e.is_file() and not e.name.endswith(".tmp"))
+        return out
+
+    def _scan_size(self) -> int:
+        total = 0
+        for e in self._files():
+            with suppress(FileNotFoundError):
+                total += e.stat().st_size
+        return total
+
+    def evict(self, target: Optional[int] = None) -> int:
+        """Delete least recently used files until the store is under `target` (default 90% of max_bytes)."""
+        target = int(self.max_bytes * 0.9) if target is None else target
+        files = []
+        for e in self._files():
+            with suppress(FileNotFoundError):
+                st = e.stat()
+                files.append((st.st_mtime_ns, st.st_size, e.path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in files:
+            if total <= target:
+                break
+            with suppress(FileNotFoundError):
+                os.unlink(path)
+                removed += 1
+            total -= size
+        self._size = total
+        return removed
+
+    def clear(self) -> int:
+        return self.evict(0)
+
+def _write_bytes(path: str, data: bytes) -> None:
+    with open(path, "wb") as fh:
+        fh.write(data)
+
+def _write_log(path: str, log: Iterable[Dict[str, Any]]) -> None:
+    with open_text(path, "w", compression="gzip") as fh:
+        for rec in log:
+            fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+def final_state(world: World) -> Dict[str, Any]:
+    """Exact snapshot-field values of `world` (snapshot() rounds some of them)."""
+    return {f: getattr(world, f) for f in SNAPSHOT_FIELDS}
+
+def compact_entry(final: Dict[str, Any], records: int, skipped: List[str],
+                  state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    entry = {"final": dict(final), "records": records, "skipped": skipped}
+    if state is not None:
+        entry["state"] = state
+    return entry
+
+# ---- Read-through timeline runs ----
+
+class _M:
+    def __init__(self, value: str):
+        self.value = value
+
+def replay(world: World, records: Iterable[Dict[str, Any]], state: Optional[Dict[str, Any]] = None) -> World:
+    """Re-log cached records on `world`: same log, index and listeners as the run.
+
+    Logged snapshots are rounded; pass the entry's exact `state` to end in the
+    run's final world state rather than the last record's rounded one.
+    """
+    for rec in records:
+        for f, v in rec["snapshot"].items():
+            setattr(world, f, v)
+        world.log_event(_M(rec["movie"]), rec["event"], rec["desc"], rec["themes"], rec["myth"])
+    for f, v in (state or {}).items():
+        setattr(world, f, v)
+    return world
+
+def cached_timeline(world: World, events: List[Event], cache: Optional[ResultCache],
+                    sink: Optional[LogSink] = None, profiler: Optional[Profiler] = None,
+                    config: Any = None, compiled: bool = False, with_log: bool = True) -> World:
+    """TimelineSimulator(world, sink, profiler, compiled).run(events), read through `cache`.
+
+    A hit replays the cached log instead of running the events and then
+    restores the exact final world state; character stats are not restored.
+    Without `with_log` only the final state is stored, and a hit leaves the
+    log (and sink) empty. Profiled runs always execute.
+    """
+    if cache is None or profiler is not None:
+        return TimelineSimulator(world, sink=sink, profiler=profiler, compiled=compiled).run(events)
+    from .sweep import SKIP_PREFIX
+    key = run_key(world, events, config)
+    hit = cache.get(key, with_log=with_log)   # a log-less entry misses when the log is wanted
+    if hit is not None:
+        if sink is not None:
+            world.subscribe(sink.write)
+        try:
+            return replay(world, hit.get("log", ()), hit["state"])
+        finally:
+            if sink is not None:
+                world.unsubscribe(sink.write)
+                sink.flush()
+    records: List[Dict[str, Any]] = []
+    world.subscribe(records.append)
+    try:
+        TimelineSimulator(world, sink=sink, compiled=compiled).run(events)
+    finally:
+        world.unsubscribe(records.append)
+    skipped = [r["event"][len(SKIP_PREFIX):] for r in records if r["event"].startswith(SKIP_PREFIX)]
+    cache.put(key, compact_entry(world.snapshot(), len(records), skipped, final_state(world)),
+              log=records if with_log else None)
+    return world
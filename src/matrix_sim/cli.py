@@ -1,24 +1,65 @@
 from __future__ import annotations
 import argparse, sys, random, json
 from .movies import build_trilogy, SimulationConfig
-from .simulate import TimelineSimulator, format_timeline
-from .agents import AgentSimulator, NeoAgent, SmithAgent, MachineCollectiveAgent
+from .simulate import TimelineWriter, OUTPUT_MODES
+from .agents import AgentSimulator, default_agents
+from .sinks import TeeSink, open_sink
+from .eventlog import RETENTION_MODES
+from .engine import ThemeFlag
+from .instrument import Profiler
 
 def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+    run_args(build_parser().parse_args(argv), sys.stdout)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Matrix Trilogy Simulation (timeline + agents)")
-    p.add_argument("--mode", choices=["timeline","agent"], default="timeline")
+    p.add_argument("--mode", choices=["timeline","agent","des"], default="timeline",
+                   help="des: discrete-event processes instead of fixed agent ticks")
     p.add_argument("--scenario", choices=["canon","zion_falls","neo_chooses_zion"], default="canon")
     p.add_argument("--architect", choices=["TRINITY","ZION"], default=None)
     p.add_argument("--smith-rate", type=float, default=None)
     p.add_argument("--zion-intensity", type=float, default=None)
     p.add_argument("--final-bonus", type=int, default=None)
-    p.add_argument("--jsonl", type=str, default=None)
+    p.add_argument("--jsonl", type=str, default=None, metavar="PATH", help="Append records as JSONL (.gz/.xz suffix compresses)")
+    p.add_argument("--jsonl-compress", choices=["gzip","lzma"], default=None, help="Force compression regardless of suffix")
+    p.add_argument("--jsonl-thread", action="store_true", help="Write JSONL from a background thread")
+    p.add_argument("--binlog", type=str, default=None, metavar="PATH", help="Write records to a columnar binary log (see 'matrix-sim binlog')")
     p.add_argument("--ticks", type=int, default=12)
+    p.add_argument("--until", type=float, default=100.0, help="DES mode: simulated time horizon")
+    p.add_argument("--sentinel-period", type=float, default=6.0, help="DES mode: time between Sentinel waves")
+    p.add_argument("--smith-delay", type=float, default=3.0, help="DES mode: Smith replication delay")
+    p.add_argument("--compiled", action="store_true", help="Timeline mode: run the event list as generated code")
+    p.add_argument("--compact-log", action="store_true", help="Keep the in-memory log delta-encoded (long agent runs)")
+    p.add_argument("--log-retention", choices=RETENTION_MODES, default="full",
+                   help="In-memory log: full, ring (last --log-keep records), events (no markers/skips), none")
+    p.add_argument("--log-keep", type=int, default=1000, help="Ring size for --log-retention ring")
+    p.add_argument("--spill", type=str, default=None, metavar="PATH", help="Append evicted/dropped log records here as JSONL")
     p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--stochastic", action="store_true", help="Agent mode: seeded random policies instead of canon")
     p.add_argument("--print-report", action="store_true", help="Print theme coverage & final snapshot")
-    p.add_argument("--query-theme", type=str, default=None, help="Filter events by theme name")
-    args = p.parse_args(argv)
+    p.add_argument("--output", choices=OUTPUT_MODES, default="full", help="Timeline rendering: full, events (no markers), headers (+summary), no-skips")
+    p.add_argument("--profile", choices=["table","json"], default=None, help="Dump per-event/per-agent timings to stderr")
+    p.add_argument("--query-theme", type=str, default=None, help="Filter events by theme name (A,B = any of; A+B = all of)")
+    _add_cache_args(p)
+    return p
+
+def _add_cache_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--cache", action="store_true", help="Read and write the on-disk result cache for deterministic timeline runs")
+    p.add_argument("--cache-dir", type=str, default=None, metavar="PATH", help="Result cache location for --cache (default: $MATRIX_SIM_CACHE_DIR or ~/.cache/matrix-sim)")
 
+def path_options(p: argparse.ArgumentParser) -> list:
+    """Dests of the options naming a file or directory the run writes to (metavar PATH)."""
+    return [a.dest for a in p._actions if a.metavar == "PATH"]
+
+def result_cache(args):
+    from .cache import ResultCache
+    return ResultCache(args.cache_dir) if args.cache else None
+
+def config_from_args(args) -> SimulationConfig:
     # Presets
     if args.scenario == "canon":
         cfg = SimulationConfig("TRINITY", 0.30, 0.25, 8)
@@ -32,42 +73,408 @@ def main(argv=None) -> int:
     if args.smith_rate is not None: cfg.smith_rate = args.smith_rate
     if args.zion_intensity is not None: cfg.zion_intensity = args.zion_intensity
     if args.final_bonus is not None: cfg.final_bonus = args.final_bonus
+    return cfg
+
+def run_args(args, out, err=None):
+    """Run one parsed invocation, rendering to `out` (None: no text at all); returns the final World."""
+    world, events = build_trilogy(config_from_args(args))
+    spill = open_sink(args.spill)
+    world.set_retention(args.log_retention, args.log_keep, spill.write if spill is not None else None,
+                        compact=args.compact_log)
+    # the index addresses records by log position, which only a full log keeps stable
+    if (args.print_report or args.query_theme) and args.log_retention == "full":
+        from .themeindex import ThemeIndex
+        world.index = ThemeIndex()
+    sink = open_sink(args.jsonl, compression=args.jsonl_compress, threaded=args.jsonl_thread)
+    if args.binlog:
+        from .binlog import BinlogSink
+        sink = BinlogSink(args.binlog) if sink is None else TeeSink([sink, BinlogSink(args.binlog)])
+    try:
+        return _run_mode(args, world, events, sink, out, err if err is not None else sys.stderr)
+    finally:
+        if sink is not None:
+            sink.close()
+        if spill is not None:
+            spill.close()
 
-    world, events = build_trilogy(cfg)
+def _run_mode(args, world, events, sink, out, err):
+    profiler = Profiler() if args.profile else None
+    try:
+        return _run_sim(args, world, events, sink, profiler, out)
+    finally:
+        if profiler is not None:
+            text = profiler.format_table() if args.profile == "table" else json.dumps(profiler.to_dict(), indent=2)
+            print(text, file=err)
 
+def _run_sim(args, world, events, sink, profiler, out):
+    # records are rendered as they are logged instead of after the run
+    writer = TimelineWriter(out, args.output) if out is not None else None
+    if writer is not None:
+        world.subscribe(writer)
     if args.mode == "timeline":
-        sim = TimelineSimulator(world, jsonl_path=args.jsonl)
-        result = sim.run(events)
-        print(format_timeline(result.log))
+        from .cache import cached_timeline
+        result = cached_timeline(world, events, result_cache(args), sink, profiler, config_from_args(args),
+                                 compiled=args.compiled)
+    elif args.mode == "des":
+        from .scheduler import DiscreteEventSimulator, default_processes
+        rng = random.Random(args.seed)
+        cfg = config_from_args(args)
+        procs = default_processes(rng if args.stochastic else None, args.sentinel_period, args.smith_delay,
+                                  cfg.final_bonus, cfg.smith_rate, cfg.zion_intensity)
+        result = DiscreteEventSimulator(world, until=args.until, sink=sink, profiler=profiler).run(procs)
+    else:
+        rng = random.Random(args.seed)
+        agents = default_agents(rng, stochastic=args.stochastic)
+        result = AgentSimulator(world, rng, max_ticks=args.ticks, sink=sink, profiler=profiler).run(agents)
+    if writer is not None:
+        writer.close()
         if args.print_report or args.query_theme:
-            _maybe_report_and_query(result.log, args.query_theme)
-        return 0
+            _maybe_report_and_query(result, args.query_theme, out)
+    return result
 
-    # agent mode
-    rng = random.Random(args.seed)
-    agents = [NeoAgent("NeoAgent", rng), SmithAgent("SmithAgent", rng), MachineCollectiveAgent("MachineAgent", rng)]
-    agent_sim = AgentSimulator(world, rng, max_ticks=args.ticks)
-    result = agent_sim.run(agents)
-    print(format_timeline(result.log))
-    if args.print_report or args.query_theme:
-        _maybe_report_and_query(result.log, args.query_theme)
-    return 0
+def theme_coverage(world):
+    """Theme name -> record count, and a ThemeIndex over the retained log."""
+    from .themeindex import ThemeIndex
+    # bounded logs carry rolling counters, so coverage covers evicted records too;
+    # queries can only return records that are still retained
+    index = world.index if world.index is not None else ThemeIndex.from_log(world.log)
+    summary = getattr(world.log, "summary", None)
+    return (dict(summary.themes) if summary is not None else index.coverage()), index
+
+def summarize(world):
+    """JSON-ready outcome of a run: final snapshot, record count and theme coverage."""
+    counts, _ = theme_coverage(world)
+    final = dict(world.snapshot())
+    return {"final": final, "peace": final["peace"], "zion_alive": final["zion_alive"],
+            "records": getattr(world.log, "total", len(world.log)),
+            "coverage": dict(sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])))}
 
-def _maybe_report_and_query(log, theme_name):
-    counts = {}
-    for rec in log:
-        for t in rec.get("themes", []):
-            counts[t] = counts.get(t, 0) + 1
-    print("\n=== Theme Coverage ===")
-    print(json.dumps(dict(sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))), indent=2))
-    print("\n=== Final Snapshot ===")
-    print(json.dumps(log[-1]["snapshot"], indent=2))
+def _maybe_report_and_query(world, theme_name, out):
+    counts, index = theme_coverage(world)
+    print("\n=== Theme Coverage ===", file=out)
+    print(json.dumps(dict(sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))), indent=2), file=out)
+    print("\n=== Final Snapshot ===", file=out)
+    # the End record is logged last with no state change after it
+    print(json.dumps(world.snapshot(), indent=2), file=out)
     if theme_name:
         theme_name = theme_name.strip().upper()
-        print(f"\n=== Events with theme {theme_name} ===")
-        for rec in log:
-            if theme_name in rec.get("themes", []):
-                print(f"{rec['movie']} :: {rec['event']} — {rec['desc']}")
+        print(f"\n=== Events with theme {theme_name} ===", file=out)
+        for pos in _query_positions(index, theme_name):
+            rec = world.log[pos]
+            print(f"{rec['movie']} :: {rec['event']} — {rec['desc']}", file=out)
+
+def _query_positions(index, expr):
+    """`A` single theme, `A,B` any of (OR), `A+B` all of (AND). Unknown names match nothing."""
+    mode, sep = ("all", "+") if "+" in expr else ("any", ",")
+    names = [n.strip() for n in expr.split(sep) if n.strip()]
+    known = [n for n in names if n in ThemeFlag.__members__]
+    if not known or (mode == "all" and len(known) < len(names)):
+        return []
+    return index.query(all_of=known) if mode == "all" else index.query(any_of=known)
+
+def _grid_from_args(p: argparse.ArgumentParser, args):
+    """expand_grid over the --architect/--smith-rate/--zion-intensity/--final-bonus specs."""
+    from .sweep import expand_grid, parse_values
+    values = []
+    for flag, spec, cast in (("--architect", args.architect, lambda v: v.upper()),
+                             ("--smith-rate", args.smith_rate, float),
+                             ("--zion-intensity", args.zion_intensity, float),
+                             ("--final-bonus", args.final_bonus, lambda v: int(float(v)))):
+        try:
+            values.append(parse_values(spec, cast))
+        except ValueError as exc:
+            p.error(f"{flag} {spec}: {exc} (expected a comma list or start:stop:step)")
+    return expand_grid(*values)
+
+def sweep_main(argv) -> int:
+    from .sweep import sweep
+    p = argparse.ArgumentParser(prog="matrix-sim sweep", description="Parallel parameter sweep over SimulationConfig grids")
+    p.add_argument("--architect", type=str, default="TRINITY", help="Comma list, e.g. TRINITY,ZION")
+    p.add_argument("--smith-rate", type=str, default="0.30", help="Comma list or start:stop:step")
+    p.add_argument("--zion-intensity", type=str, default="0.25", help="Comma list or start:stop:step")
+    p.add_argument("--final-bonus", type=str, default="8", help="Comma list or start:stop:step")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 1 = in-process)")
+    p.add_argument("--chunksize", type=int, default=64)
+    p.add_argument("--ordered", action="store_true", help="Emit rows in grid order")
+    p.add_argument("--out", type=str, default=None, help="Write JSONL rows here instead of stdout")
+    _add_cache_args(p)
+    args = p.parse_args(argv)
+
+    grid = _grid_from_args(p, args)
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    try:
+        for row in sweep(grid, workers=args.workers, chunksize=args.chunksize, ordered=args.ordered,
+                         cache=result_cache(args)):
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+def ensemble_main(argv) -> int:
+    from .ensemble import run_ensemble
+    p = argparse.ArgumentParser(prog="matrix-sim ensemble", description="Seeded stochastic agent ensembles")
+    p.add_argument("--mode", choices=["agent", "des"], default="agent",
+                   help="des: discrete-event processes instead of fixed agent ticks")
+    p.add_argument("--runs", type=int, default=10_000)
+    p.add_argument("--seed", type=int, default=0, help="Base seed; run i uses a seed derived from (seed, i)")
+    p.add_argument("--ticks", type=int, default=12)
+    p.add_argument("--until", type=float, default=100.0, help="DES mode: simulated time horizon")
+    p.add_argument("--sentinel-period", type=float, default=6.0, help="DES mode: time between Sentinel waves")
+    p.add_argument("--smith-delay", type=float, default=3.0, help="DES mode: Smith replication delay")
+    p.add_argument("--smith-rate", type=float, default=SimulationConfig.smith_rate, help="DES mode: Smith spread per replication")
+    p.add_argument("--zion-intensity", type=float, default=SimulationConfig.zion_intensity,
+                   help="DES mode: Sentinel wave strength (with --deterministic)")
+    p.add_argument("--final-bonus", type=int, default=SimulationConfig.final_bonus, help="DES mode: final fight bonus")
+    p.add_argument("--deterministic", action="store_true", help="Use the canon agent policies")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--chunksize", type=int, default=256)
+    p.add_argument("--ci", type=float, default=None, help="Stop once both 95%% CI half-widths are <= this")
+    p.add_argument("--min-runs", type=int, default=100)
+    p.add_argument("--stream", action="store_true", help="Print the aggregate after every finished chunk")
+    args = p.parse_args(argv)
+
+    des = None
+    if args.mode == "des":
+        des = {"until": args.until, "sentinel_period": args.sentinel_period, "smith_delay": args.smith_delay,
+               "final_bonus": args.final_bonus, "smith_rate": args.smith_rate, "zion_intensity": args.zion_intensity}
+    stats = None
+    for stats in run_ensemble(args.runs, base_seed=args.seed, max_ticks=args.ticks,
+                              stochastic=not args.deterministic, workers=args.workers,
+                              chunksize=args.chunksize, ci_halfwidth=args.ci, min_runs=args.min_runs, des=des):
+        if args.stream:
+            print(json.dumps(stats.to_dict()), flush=True)
+    if stats is not None and not args.stream:
+        print(json.dumps(stats.to_dict(), indent=2))
+    return 0
+
+def bench_main(argv) -> int:
+    from .bench import CASES, run_benchmarks, compare
+    p = argparse.ArgumentParser(prog="matrix-sim bench", description="Benchmark the simulation hot paths")
+    p.add_argument("--only", type=str, default=None, help="Comma list of cases: " + ",".join(c.name for c in CASES))
+    p.add_argument("--full", action="store_true",
+                   help="Also run the long cases (" + ",".join(c.name for c in CASES if c.full) + ")")
+    p.add_argument("--scale", type=float, default=1.0, help="Multiply every case size (e.g. 0.01 for a smoke run)")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    p.add_argument("--out", type=str, default=None, help="Write results JSON here (default: stdout)")
+    p.add_argument("--baseline", type=str, default=None, help="Compare against a stored results JSON")
+    p.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown / memory growth")
+    args = p.parse_args(argv)
+
+    only = [n.strip() for n in args.only.split(",")] if args.only else None
+    res = run_benchmarks(only, args.scale, args.repeat, not args.no_memory, progress=sys.stderr, full=args.full)
+    text = json.dumps(res, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = compare(res, json.load(f), args.threshold)
+        for line in problems:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+def serve_main(argv) -> int:
+    import asyncio
+    from .server import SimulationService, serve_forever
+    p = argparse.ArgumentParser(prog="matrix-sim serve", description="Warm simulation service (JSON over a Unix socket or localhost HTTP)")
+    p.add_argument("--socket", type=str, default=None, help="Unix socket path (JSON lines); default: HTTP")
+    p.add_argument("--host", type=str, default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 1 = in-process)")
+    p.add_argument("--batch-window", type=float, default=0.002, help="Seconds to gather concurrent requests into one batch")
+    p.add_argument("--max-batch", type=int, default=64)
+    p.add_argument("--cache-size", type=int, default=1024, help="LRU entries for deterministic results (0 = off)")
+    p.add_argument("--output-dir", type=str, default=None,
+                   help="Allow --jsonl/--spill/--binlog/--cache-dir in requests, as paths inside this directory")
+    args = p.parse_args(argv)
+
+    service = SimulationService(args.workers, args.batch_window, args.max_batch, args.cache_size, args.output_dir)
+    where = args.socket or f"http://{args.host}:{args.port}"
+    print(f"matrix-sim serve: listening on {where}", file=sys.stderr, flush=True)
+    try:
+        asyncio.run(serve_forever(service, socket_path=args.socket, host=args.host, port=args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+def binlog_main(argv) -> int:
+    from .binlog import BinlogReader, convert_jsonl
+    p = argparse.ArgumentParser(prog="matrix-sim binlog", description="Convert or inspect columnar binary run logs")
+    p.add_argument("path", help="Binary log to read (or to write, with --from-jsonl)")
+    p.add_argument("--from-jsonl", type=str, default=None, help="Convert this JSONL (.gz/.xz ok) into PATH")
+    p.add_argument("--event", type=str, default=None, help="Only records with this event name")
+    p.add_argument("--theme", type=str, default=None, help="Only records tagged with this theme")
+    p.add_argument("--field", type=str, action="append", default=[], help="Print this snapshot field per record (repeatable)")
+    args = p.parse_args(argv)
+
+    if args.from_jsonl:
+        n = convert_jsonl(args.from_jsonl, args.path)
+        print(json.dumps({"records": n, "path": args.path}))
+        return 0
+    with BinlogReader(args.path) as r:
+        unknown = [f for f in args.field if f not in r.snapshot_fields]
+        if unknown:
+            p.error(f"unknown --field {', '.join(unknown)} (snapshot fields: {', '.join(r.snapshot_fields)})")
+        if not (args.event or args.theme or args.field):
+            print(json.dumps({"records": len(r), "snapshot_fields": r.snapshot_fields,
+                              "distinct": {k: len(v) for k, v in r.dicts.items()}}, indent=2))
+            return 0
+        rows = r.where(event=args.event, theme=args.theme) if (args.event or args.theme) else range(len(r))
+        cols = [r.trajectory(f) for f in args.field]
+        events, names = r.column("event"), r.dicts["event"]
+        for i in rows:
+            print(json.dumps({"row": i, "event": names[events[i]], **{f: c[i] for f, c in zip(args.field, cols)}},
+                             ensure_ascii=False))
+        del cols, events
+    return 0
+
+def query_main(argv) -> int:
+    from .query import Query, merge_coverage, parse_predicate, run_query
+    p = argparse.ArgumentParser(prog="matrix-sim query", description="Query archived --jsonl runs (sidecar-indexed, parallel)")
+    p.add_argument("paths", nargs="+", help="JSONL logs or directories holding them (.gz/.xz ok)")
+    p.add_argument("--theme", type=str, default=None, help="A, A,B (any of) or A+B (all of)")
+    p.add_argument("--event", type=str, default=None, help="Only records with this event name")
+    p.add_argument("--movie", type=str, default=None, help="Only records from this movie")
+    p.add_argument("--where", type=str, action="append", default=[],
+                   help="Snapshot predicate, e.g. zion_alive=false or smith_factor>0.5 (repeatable)")
+    p.add_argument("--coverage", action="store_true", help="Aggregate theme coverage of the matches instead")
+    p.add_argument("--count", action="store_true", help="Print per-file match counts only")
+    p.add_argument("--rebuild-index", action="store_true", help="Rebuild sidecar indexes even if fresh")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 1 = in-process)")
+    p.add_argument("--chunksize", type=int, default=4, help="Files per worker task")
+    args = p.parse_args(argv)
+
+    try:
+        where = tuple(parse_predicate(w) for w in args.where)
+    except ValueError as exc:
+        p.error(str(exc))
+    q = Query(args.theme, args.event, args.movie, where, args.coverage)
+    results = run_query(args.paths, q, workers=args.workers, chunksize=args.chunksize, rebuild=args.rebuild_index)
+    if args.coverage:
+        results = list(results)
+        print(json.dumps({"files": len(results), "records": sum(r["records"] for r in results),
+                          "scanned": sum(r["scanned"] for r in results),
+                          "coverage": merge_coverage(results)}, indent=2))
+        return 0
+    for res in results:
+        if args.count:
+            print(json.dumps({"file": res["file"], "matches": len(res["matches"]), "scanned": res["scanned"],
+                              "records": res["records"]}))
+        else:
+            for rec in res["matches"]:
+                print(json.dumps(rec, ensure_ascii=False))
+    return 0
+
+def explore_main(argv) -> int:
+    from dataclasses import asdict
+    from .explore import AXES, DEFAULT_OUTCOME, Explorer
+    from .movies import SimulationConfig
+    p = argparse.ArgumentParser(prog="matrix-sim explore", description="Adaptive search for outcome boundaries over SimulationConfig")
+    p.add_argument("--axis", type=str, action="append", required=True,
+                   help="NAME=LO:HI[:TOL], NAME one of " + ",".join(AXES) + " (repeatable)")
+    p.add_argument("--set", type=str, action="append", default=[], help="Fix another config field, e.g. architect_choice=ZION")
+    p.add_argument("--outcome", type=str, default=",".join(DEFAULT_OUTCOME), help="Final-snapshot fields that define an outcome")
+    p.add_argument("--coarse", type=int, default=8, help="Initial cells per axis")
+    p.add_argument("--workers", type=int, default=1, help="Worker processes per refinement round (1 = in-process)")
+    p.add_argument("--cells", action="store_true", help="Also print every final cell")
+    _add_cache_args(p)
+    args = p.parse_args(argv)
+
+    base = asdict(SimulationConfig())
+    for item in args.set:
+        name, _, value = item.partition("=")
+        if name not in base or not value:
+            p.error(f"--set: expected FIELD=VALUE with FIELD in {','.join(base)}, got {item!r}")
+        try:
+            base[name] = value.upper() if name == "architect_choice" else AXES[name](value)
+        except ValueError as exc:
+            p.error(f"--set {item}: {exc}")
+    ranges, tol = {}, {}
+    for spec in args.axis:
+        name, _, span = spec.partition("=")
+        parts = span.split(":")
+        if name not in AXES or len(parts) not in (2, 3):
+            p.error(f"--axis: expected NAME=LO:HI[:TOL] with NAME in {','.join(AXES)}, got {spec!r}")
+        try:
+            ranges[name] = (AXES[name](float(parts[0])), AXES[name](float(parts[1])))
+            if len(parts) == 3:
+                tol[name] = float(parts[2])
+        except ValueError as exc:
+            p.error(f"--axis {spec}: {exc}")
+    ex = Explorer(SimulationConfig(**base), [f.strip() for f in args.outcome.split(",") if f.strip()],
+                  workers=args.workers, cache=result_cache(args))
+    try:
+        res = ex.explore(ranges, tol, coarse=args.coarse)
+    except ValueError as exc:
+        p.error(str(exc))
+    if not args.cells:
+        res.pop("cells")
+    print(json.dumps(res, indent=2))
+    return 0
+
+def trajectory_main(argv) -> int:
+    from .engine import SNAPSHOT_FIELDS
+    from .trajectory import DEFAULT_FIELDS, aggregate_agents, aggregate_timelines
+    p = argparse.ArgumentParser(prog="matrix-sim trajectory", description="Streaming per-tick/per-event statistics across many runs")
+    p.add_argument("--mode", choices=["agent", "timeline"], default="agent",
+                   help="agent: seeded ensemble, per tick; timeline: config grid, per event position")
+    p.add_argument("--runs", type=int, default=10_000, help="Agent mode: number of seeded runs")
+    p.add_argument("--seed", type=int, default=0, help="Agent mode: base seed (as in 'matrix-sim ensemble')")
+    p.add_argument("--ticks", type=int, default=12)
+    p.add_argument("--deterministic", action="store_true", help="Agent mode: canon policies")
+    p.add_argument("--architect", type=str, default="TRINITY", help="Timeline mode: comma list")
+    p.add_argument("--smith-rate", type=str, default="0.30", help="Timeline mode: comma list or start:stop:step")
+    p.add_argument("--zion-intensity", type=str, default="0.25", help="Timeline mode: comma list or start:stop:step")
+    p.add_argument("--final-bonus", type=str, default="8", help="Timeline mode: comma list or start:stop:step")
+    p.add_argument("--field", type=str, action="append", default=[],
+                   help="NAME[=LO:HI:BINS] histogram spec (repeatable; default: " + ",".join(DEFAULT_FIELDS) + ")")
+    p.add_argument("--alpha", type=float, default=0.01, help="Relative accuracy of the quantile sketches")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 1 = in-process)")
+    p.add_argument("--chunksize", type=int, default=256)
+    p.add_argument("--out", type=str, default=None, help="Write the JSON here instead of stdout")
+    args = p.parse_args(argv)
+
+    fields = {}
+    for spec in args.field:
+        name, _, rng = spec.partition("=")
+        if name not in SNAPSHOT_FIELDS:
+            p.error(f"--field {name!r}: not a snapshot field (one of {','.join(SNAPSHOT_FIELDS)})")
+        if rng:
+            try:
+                lo, hi, bins = rng.split(":")
+                fields[name] = (float(lo), float(hi), int(bins))
+            except ValueError:
+                p.error(f"--field {spec}: expected NAME=LO:HI:BINS, e.g. {name}=0:1:20")
+            if not (fields[name][0] < fields[name][1] and fields[name][2] > 0):
+                p.error(f"--field {spec}: need LO < HI and BINS > 0")
+        elif name in DEFAULT_FIELDS:
+            fields[name] = DEFAULT_FIELDS[name]
+        else:
+            p.error(f"--field {name}: give a histogram range, e.g. {name}=0:1:20")
+    opts = {"fields": fields or None, "alpha": args.alpha}
+    if args.mode == "agent":
+        agg = aggregate_agents(args.runs, args.seed, args.ticks, not args.deterministic,
+                               workers=args.workers, chunksize=args.chunksize, **opts)
+    else:
+        grid = _grid_from_args(p, args)
+        agg = aggregate_timelines(grid, workers=args.workers, chunksize=args.chunksize, **opts)
+    text = json.dumps(agg.to_dict(), indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+COMMANDS = {"sweep": sweep_main, "ensemble": ensemble_main, "bench": bench_main, "serve": serve_main,
+            "binlog": binlog_main, "query": query_main, "explore": explore_main, "trajectory": trajectory_main}
 
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,201 @@
+from __future__ import annotations
+from ast import literal_eval
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from .engine import Realm, World
+from .events import (
+    Event,
+    ev_awaken_neo, ev_train_neo, ev_rescue_morpheus, ev_neo_ascends,
+    ev_merovingian_persephone, ev_keymaker_freed, ev_architect_choice, ev_save_trinity,
+    ev_smith_spreads, ev_zion_assault, ev_smith_copies_oracle, ev_machines_negotiate,
+    ev_final_fight, ev_peace,
+)
+from .registry import REGISTRY
+
+# A template turns an event's parameters (Python expressions: literals for
+# specialised strings, argument names for numbers) into (pre, effect lines).
+# `neo` is the hoisted w.get("Neo"). Templates mirror the factories in events.py
+# for worlds without an EntityTable; tests/test_compiler.py keeps them honest.
+Template = Callable[[Sequence[str]], Tuple[Optional[str], List[str]]]
+
+def _clamp(expr: str) -> str:
+    return f"max(0.0, min(1.0, {expr}))"
+
+def _architect(p: Sequence[str]) -> Tuple[Optional[str], List[str]]:
+    if literal_eval(p[0]).upper() == "ZION":
+        return None, ["w.zion_defense = 1.0", "w.matrix_control = 1.0", "w.prophecy_valid = True"]
+    return None, ["w.prophecy_valid = False", f"w.matrix_control = {_clamp('w.matrix_control - 0.02')}"]
+
+TEMPLATES: Dict[Callable[..., Event], Template] = {
+    ev_awaken_neo: lambda p: (None, [
+        "w.neo_awake = True", "neo.realm = REAL", "neo.power = max(neo.power, 30)",
+        "w.humans_free += 1", f"w.matrix_control = {_clamp('w.matrix_control - 0.02')}"]),
+    ev_train_neo: lambda p: ("w.neo_awake", ["neo.realm = MATRIX", "neo.power = max(neo.power, 60)"]),
+    ev_rescue_morpheus: lambda p: ("w.neo_awake and w.trinity_alive", [
+        "neo.power = max(neo.power, 70)", f"w.matrix_control = {_clamp('w.matrix_control - 0.03')}"]),
+    ev_neo_ascends: lambda p: ("w.neo_awake", [
+        "neo.power = max(neo.power, 90)", f"w.matrix_control = {_clamp('w.matrix_control - 0.05')}",
+        "w.smith_factor = max(w.smith_factor, 0.05)"]),
+    ev_merovingian_persephone: lambda p: (None, []),
+    ev_keymaker_freed: lambda p: (None, [f"w.matrix_control = {_clamp('w.matrix_control - 0.04')}"]),
+    ev_architect_choice: _architect,
+    ev_save_trinity: lambda p: ("w.trinity_alive", [f"w.matrix_control = {_clamp('w.matrix_control - 0.02')}"]),
+    ev_smith_spreads: lambda p: (None, [
+        f"w.smith_factor = {_clamp('w.smith_factor + ' + p[0])}",
+        f"w.matrix_control = {_clamp('w.matrix_control - 0.05')}"]),
+    ev_zion_assault: lambda p: (None, [
+        f"w.zion_defense = {_clamp('w.zion_defense - ' + p[0])}", "w.zion_alive = w.zion_defense > 0.0"]),
+    ev_smith_copies_oracle: lambda p: (None, [f"w.smith_factor = {_clamp('w.smith_factor + 0.25')}"]),
+    ev_machines_negotiate: lambda p: (None, []),
+    ev_final_fight: lambda p: (None, [
+        f"if max(neo.power, 90) + {p[0]} >= int(60 + 40 * w.smith_factor):",
+        "    w.smith_factor = 0.0", "    w.matrix_control = 0.5",
+        "    neo.alive = False", "    w.neo_alive = False",
+        "else:", f"    w.smith_factor = {_clamp('w.smith_factor + 0.2')}"]),
+    ev_peace: lambda p: (None, ["if w.smith_factor == 0.0:", "    w.peace = True"]),
+}
+_BY_NAME = {f"{f.__module__}.{f.__qualname__}": f for f in TEMPLATES}
+
+def _runtime(v: Any) -> bool:
+    # numbers become arguments (one generated function serves a whole sweep);
+    # anything else is folded into the code
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+class CompiledTimeline:
+    """An event list as generated code; run(w) is equivalent to running each event.
+
+    Two variants are generated: one appends records to a plain list log
+    directly (no index, any listeners), the other goes through w.log_event
+    (bounded or compact logs, ThemeIndex). Worlds with hooks (profiling) or an
+    EntityTable take the interpreted path.
+    """
+
+    def __init__(self, events: List[Event], fns: Tuple[Callable[[World, tuple], None], ...],
+                 args: tuple, source: str):
+        self.events = events
+        self.source = source
+        self._fast, self._generic = fns
+        self._args = args
+
+    def run(self, w: World) -> World:
+        if w.hooks is not None or w.entities is not None:
+            for e in self.events:
+                e.run(w)
+        elif type(w.log) is list and w.index is None:
+            self._fast(w, self._args)
+        else:
+            self._generic(w, self._args)
+        return w
+
+# generated code per list shape, and compiled timelines per list (by event
+# identity; holding the events keeps their ids from being reused)
+_CACHE: Dict[tuple, Tuple[Tuple[Callable[[World, tuple], None], ...], str]] = {}
+_LISTS: "OrderedDict[tuple, CompiledTimeline]" = OrderedDict()
+_LISTS_MAX = 1024
+
+def clear_cache() -> None:
+    _CACHE.clear()
+    _LISTS.clear()
+
+def compile_events(events: Sequence[Event]) -> CompiledTimeline:
+    """Compile `events` (registry-built ones inline; others are called via Event.run).
+
+    Generated code is cached by the list's shape (factories and non-numeric
+    parameters), so configs that differ only in numbers share one function.
+    """
+    ids = tuple(map(id, events))
+    ct = _LISTS.get(ids)
+    if ct is not None:
+        _LISTS.move_to_end(ids)
+        return ct
+    events = list(events)
+    shape, args = [], []
+    for ev in events:
+        key = REGISTRY.key_of(ev)
+        if key is None or key.factory not in _BY_NAME:
+            shape.append(None)
+            args.append(ev)
+        else:
+            shape.append((key.factory, tuple("#" if _runtime(v) else v for v in key.params)))
+            args.extend(v for v in key.params if _runtime(v))
+    shape_key = tuple(shape)
+    hit = _CACHE.get(shape_key)
+    if hit is None:
+        hit = _CACHE[shape_key] = _generate(events)
+    fns, source = hit
+    ct = _LISTS[ids] = CompiledTimeline(events, fns, tuple(args), source)
+    if len(_LISTS) > _LISTS_MAX:
+        _LISTS.popitem(last=False)
+    return ct
+
+def _log_direct(i: int, skip: bool) -> List[str]:
+    # engine._record, inlined; key order matters for identical JSON
+    event, desc = (f"S{i}", '"Precondition failed"') if skip else (f"N{i}", f"D{i}")
+    return [f'rec = {{"movie": V{i}, "event": {event}, "desc": {desc}, "themes": T{i}, "myth": Y{i}, '
+            f'"snapshot": snapshot()}}',
+            "append(rec)",
+            "for fn in listeners:",
+            "    fn(rec)"]
+
+def _log_call(i: int, skip: bool) -> List[str]:
+    if skip:
+        return [f'log(M{i}, S{i}, "Precondition failed", T{i}, Y{i}, K{i})']
+    return [f"log(M{i}, N{i}, D{i}, T{i}, Y{i}, K{i})"]
+
+def _generate(events: List[Event]) -> Tuple[Tuple[Callable[[World, tuple], None], ...], str]:
+    ns: Dict[str, Any] = {"REAL": Realm.REAL, "MATRIX": Realm.MATRIX}
+    names: List[str] = []
+    steps: List[Tuple[int, Optional[str], List[str]]] = []
+    for i, ev in enumerate(events):
+        key = REGISTRY.key_of(ev)
+        if key is None or key.factory not in _BY_NAME:
+            names.append(f"e{i}")
+            steps.append((i, None, None))
+            continue
+        params = []
+        for j, v in enumerate(key.params):
+            if _runtime(v):
+                names.append(f"a{i}_{j}")
+                params.append(f"a{i}_{j}")
+            else:
+                params.append(repr(v))
+        pre, effect = TEMPLATES[_BY_NAME[key.factory]](params)
+        # constant log fields, bound once: the record lists are the event's own
+        ns.update({f"M{i}": ev.movie, f"V{i}": ev.movie.value, f"N{i}": ev.name, f"D{i}": ev.desc,
+                   f"S{i}": f"[SKIP] {ev.name}", f"T{i}": ev.theme_names, f"Y{i}": ev.myth,
+                   f"K{i}": ev.theme_mask})
+        steps.append((i, pre, effect))
+    unpack = [f"{', '.join(names)}{',' if len(names) == 1 else ''} = args"] if names else []
+    sources = []
+    for name, prologue, emit in (
+            ("timeline_fast", ["append = w.log.append", "snapshot = w.snapshot", "listeners = w.listeners"], _log_direct),
+            ("timeline", ["log = w.log_event"], _log_call)):
+        body = unpack + prologue + _body(events, steps, emit, fast=emit is _log_direct)
+        sources.append(f"def {name}(w, args):\n" + "".join(f"    {line}\n" for line in body))
+    source = "\n".join(sources)
+    exec(compile(source, "<matrix_sim.compiler>", "exec"), ns)
+    return (ns["timeline_fast"], ns["timeline"]), source
+
+def _body(events: List[Event], steps, emit, fast: bool) -> List[str]:
+    body: List[str] = []
+    neo_ok = False
+    for i, pre, effect in steps:
+        body.append(f"# {i}: {events[i].name}")
+        if effect is None:
+            body.append(f"e{i}.run(w)")
+            neo_ok = False  # an opaque event may rebind the characters
+            if fast:  # ... or swap the log store
+                body.extend(["append = w.log.append"])
+            continue
+        if not neo_ok and any("neo" in line.replace("w.neo_", "") for line in effect):
+            body.append('neo = w.chars["Neo"]')
+            neo_ok = True
+        if pre is None:
+            body.extend(effect)
+            body.extend(emit(i, False))
+        else:
+            body.append(f"if {pre}:")
+            body.extend("    " + line for line in effect + emit(i, False))
+            body.append("else:")
+            body.extend("    " + line for line in emit(i, True))
+    return body
@@ -1,13 +1,35 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
-from enum import Enum, auto
-from typing import Dict, List, Any
+from dataclasses import dataclass, field, replace
+import copy
+from enum import Enum, IntFlag, auto
+from typing import Dict, List, Any, Callable, ClassVar, Iterable, Optional, Set, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .eventlog import EventLog
+    from .themeindex import ThemeIndex
+    from .instrument import Hooks
+    from .entities import EntityTable
 
 class Movie(Enum):
     MATRIX = "Matrix (1999)"
     RELOADED = "Matrix Reloaded (2003)"
     REVOLUTIONS = "Matrix Revolutions (2003)"
 
+class _Marker:  # simple enum-ish shim with .value
+    __slots__ = ("value",)
+
+    def __init__(self, v: str):
+        self.value = v
+
+_MARKERS: Dict[str, _Marker] = {}
+
+def marker(name: str) -> _Marker:
+    """Pseudo-movie bucket for non-film log entries (Prelude, Tick, ...); one shared instance per name."""
+    m = _MARKERS.get(name)
+    if m is None:
+        m = _MARKERS[name] = _Marker(name)
+    return m
+
 class Realm(Enum):
     MATRIX = auto()
     REAL = auto()
@@ -29,7 +51,27 @@ class Theme(Enum):
     MESSIANIC_GNOSIS = auto()
     UNDERWORLD_PASSAGES = auto()
 
-@dataclass
+    @property
+    def flag(self) -> "ThemeFlag":
+        return ThemeFlag[self.name]
+
+# Bitmask twin of Theme: one bit per member, same names
+ThemeFlag = IntFlag("ThemeFlag", [t.name for t in Theme])
+_FLAG_BY_NAME = {f.name: int(f) for f in ThemeFlag}
+
+def theme_mask(themes: Iterable[Union[Theme, ThemeFlag, str]]) -> int:
+    """OR of the bits for `themes` (Theme members, ThemeFlags or names; unknown names ignored)."""
+    m = 0
+    for t in themes:
+        if isinstance(t, str):
+            m |= _FLAG_BY_NAME.get(t, 0)
+        elif isinstance(t, Theme):
+            m |= _FLAG_BY_NAME[t.name]
+        else:
+            m |= int(t)
+    return m
+
+@dataclass(slots=True)
 class Character:
     name: str
     faction: Faction
@@ -37,6 +79,23 @@ class Character:
     alive: bool = True
     power: int = 10  # rough 0..100
 
+class Snapshot(dict):
+    """Read-only snapshot dict. World hands out the same instance while nothing changes."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("snapshots are immutable; copy with dict(snapshot)")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (Snapshot, (dict(self),))
+
+_ROUNDED = frozenset({"matrix_control", "zion_defense", "smith_factor"})
+SNAPSHOT_FIELDS = ("matrix_control", "zion_defense", "smith_factor", "humans_free", "humans_enslaved",
+                   "neo_awake", "neo_alive", "trinity_alive", "zion_alive", "peace", "prophecy_valid")
+_SNAPSHOT_SET = frozenset(SNAPSHOT_FIELDS)
+
 @dataclass
 class World:
     # macro state
@@ -56,7 +115,33 @@ class World:
 
     # registry & log
     chars: Dict[str, Character] = field(default_factory=dict)
-    log: List[dict] = field(default_factory=list)
+    # columnar store for bulk entities; when set, `chars` is its name -> view mapping
+    entities: Optional["EntityTable"] = None
+    log: Union[List[dict], "EventLog"] = field(default_factory=list)
+    index: Optional["ThemeIndex"] = None
+    hooks: Optional["Hooks"] = None
+    listeners: List[Callable[[Dict[str, Any]], None]] = field(default_factory=list)
+
+    # snapshot cache: last Snapshot handed out and the fields assigned since then
+    _snap: ClassVar[Optional[Snapshot]] = None
+    _dirty: ClassVar[Set[str]]
+    # per-field write generations, kept only once track_changes() was called
+    _gens: ClassVar[Optional[Dict[str, int]]] = None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name in _SNAPSHOT_SET:
+            if self._snap is not None:
+                self._dirty.add(name)
+            gens = self._gens
+            if gens is not None:
+                gens[name] = gens.get(name, 0) + 1
+
+    def track_changes(self) -> Dict[str, int]:
+        """Start counting assignments per state field; returns the live generation map."""
+        if self._gens is None:
+            object.__setattr__(self, "_gens", {})
+        return self._gens
 
     def add(self, c: Character) -> None:
         self.chars[c.name] = c
@@ -64,27 +149,109 @@ class World:
     def get(self, name: str) -> Character:
         return self.chars[name]
 
+    def use_entities(self) -> "EntityTable":
+        """Move the characters into a columnar EntityTable (w.get keeps working)."""
+        if self.entities is None:
+            from .entities import EntityTable
+            self.entities = EntityTable.from_chars(self.chars)
+            self.chars = self.entities.chars
+        return self.entities
+
+    def clone(self) -> "World":
+        """Independent copy for forking a run: scalars, characters, log and index.
+
+        Log records are never mutated after logging, so a plain list log is
+        copied shallowly (records are shared between the forks).
+        """
+        w = copy.copy(self)
+        if self._snap is not None:
+            object.__setattr__(w, "_dirty", set(self._dirty))
+        if self._gens is not None:
+            object.__setattr__(w, "_gens", dict(self._gens))
+        if self.entities is not None:
+            w.entities = self.entities.copy()
+            w.chars = w.entities.chars
+        else:
+            w.chars = {name: replace(c) for name, c in self.chars.items()}
+        w.log = self.log.copy()
+        w.listeners = list(self.listeners)
+        if self.index is not None:
+            w.index = copy.deepcopy(self.index)
+        return w
+
     def snapshot(self) -> Dict[str, Any]:
-        return {
-            "matrix_control": round(self.matrix_control, 3),
-            "zion_defense": round(self.zion_defense, 3),
-            "smith_factor": round(self.smith_factor, 3),
-            "humans_free": self.humans_free,
-            "humans_enslaved": self.humans_enslaved,
-            "neo_awake": self.neo_awake,
-            "neo_alive": self.neo_alive,
-            "trinity_alive": self.trinity_alive,
-            "zion_alive": self.zion_alive,
-            "peace": self.peace,
-            "prophecy_valid": self.prophecy_valid,
-        }
-
-    def log_event(self, movie: Movie, event: str, desc: str, themes: list[str], myth: list[str]) -> None:
-        self.log.append({
-            "movie": movie.value,
-            "event": event,
-            "desc": desc,
-            "themes": themes,
-            "myth": myth,
-            "snapshot": self.snapshot(),
-        })
+        snap = self._snap
+        if snap is None:
+            data = {f: getattr(self, f) for f in SNAPSHOT_FIELDS}
+            for f in _ROUNDED:
+                data[f] = round(data[f], 3)
+            object.__setattr__(self, "_dirty", set())
+        else:
+            dirty = self._dirty
+            if not dirty:
+                return snap
+            # rebuild only the assigned fields; keep the old object if no value moved
+            data = None
+            for f in dirty:
+                v = getattr(self, f)
+                if f in _ROUNDED:
+                    v = round(v, 3)
+                old = snap[f]
+                if old != v or type(old) is not type(v):
+                    if data is None:
+                        data = dict(snap)
+                    data[f] = v
+            dirty.clear()
+            if data is None:
+                return snap
+        snap = Snapshot(data)
+        object.__setattr__(self, "_snap", snap)
+        return snap
+
+    def subscribe(self, fn: Callable[[Dict[str, Any]], None]) -> None:
+        """Call `fn(record)` for every record as it is logged."""
+        self.listeners.append(fn)
+
+    def unsubscribe(self, fn: Callable[[Dict[str, Any]], None]) -> None:
+        if fn in self.listeners:
+            self.listeners.remove(fn)
+
+    def set_retention(self, retention: str = "full", keep: int = 1000,
+                      spill: Optional[Callable[[Dict[str, Any]], None]] = None, compact: bool = False) -> None:
+        """Swap in an empty log store for `retention` (full, ring, events or none).
+
+        Bounded stores keep a rolling `summary` (record/theme/movie counts) so
+        reports still work after records are evicted; evicted or dropped
+        records go to `spill`, if given. Call before anything is logged.
+        """
+        from .eventlog import make_log
+        self.log = make_log(retention, keep, spill, compact)
+
+    def log_event(self, movie: Movie, event: str, desc: str, themes: list[str], myth: list[str],
+                  mask: Optional[int] = None) -> None:
+        if self.index is not None:
+            # record number, not len(): bounded stores stop growing (ring) or never do (none)
+            pos = self.log.total if hasattr(self.log, "total") else len(self.log)
+            self.index.add(pos, movie.value, theme_mask(themes) if mask is None else mask)
+        if isinstance(self.log, list):
+            rec = _record(movie.value, event, desc, themes, myth, self.snapshot())
+            self.log.append(rec)
+        else:
+            # compact logs (eventlog.EventLog) encode the fields without an intermediate dict
+            snap = self.snapshot()
+            self.log.append_event(movie.value, event, desc, themes, myth, snap)
+            if not self.listeners:
+                return
+            rec = _record(movie.value, event, desc, themes, myth, snap)
+        for fn in self.listeners:
+            fn(rec)
+
+def _record(movie: str, event: str, desc: str, themes: list[str], myth: list[str], snap: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "movie": movie,
+        "event": event,
+        "desc": desc,
+        "themes": themes,
+        "myth": myth,
+        "snapshot": snap,
+    }
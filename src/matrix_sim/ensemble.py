@@ -0,0 +1,116 @@
+from __future__ import annotations
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import hashlib, math, random
+from .agents import AgentSimulator, default_agents
+from .movies import SimulationConfig, init_world
+from .parallel import imap_chunks
+
+def derive_seed(base_seed: int, index: int) -> int:
+    """Per-run seed from (base_seed, index); stable across processes and Python versions."""
+    digest = hashlib.blake2b(f"{base_seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+def wilson_interval(k: int, n: int, z: float = 1.96) -> Tuple[float, float]:
+    if n == 0:
+        return 0.0, 1.0
+    p = k / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+@dataclass
+class EnsembleStats:
+    """Mergeable outcome counts for a batch of agent runs."""
+    runs: int = 0
+    peace: int = 0
+    zion_fell: int = 0
+    ticks: Counter = field(default_factory=Counter)
+
+    def add(self, peace: bool, zion_alive: bool, ticks: int) -> None:
+        self.runs += 1
+        self.peace += peace
+        self.zion_fell += not zion_alive
+        self.ticks[ticks] += 1
+
+    def merge(self, other: "EnsembleStats") -> "EnsembleStats":
+        self.runs += other.runs
+        self.peace += other.peace
+        self.zion_fell += other.zion_fell
+        self.ticks.update(other.ticks)
+        return self
+
+    def copy(self) -> "EnsembleStats":
+        return EnsembleStats(self.runs, self.peace, self.zion_fell, Counter(self.ticks))
+
+    def halfwidth(self, z: float = 1.96) -> float:
+        """Widest CI half-width of the two tracked probabilities."""
+        return max((hi - lo) / 2 for lo, hi in (wilson_interval(self.peace, self.runs, z),
+                                                 wilson_interval(self.zion_fell, self.runs, z)))
+
+    def to_dict(self, z: float = 1.96) -> Dict[str, Any]:
+        n = self.runs or 1
+        return {
+            "runs": self.runs,
+            "peace_prob": self.peace / n,
+            "peace_ci": wilson_interval(self.peace, self.runs, z),
+            "zion_fall_prob": self.zion_fell / n,
+            "zion_fall_ci": wilson_interval(self.zion_fell, self.runs, z),
+            "ticks_mean": sum(t * c for t, c in self.ticks.items()) / n,
+            "ticks_hist": {str(t): self.ticks[t] for t in sorted(self.ticks)},
+        }
+
+def run_seed(seed: int, max_ticks: int = 12, stochastic: bool = True) -> Tuple[bool, bool, int]:
+    """One agent run -> (peace, zion_alive, ticks)."""
+    rng = random.Random(seed)
+    sim = AgentSimulator(init_world(), rng, max_ticks=max_ticks)
+    w = sim.run(default_agents(rng, stochastic=stochastic))
+    return w.peace, w.zion_alive, sim.ticks_run
+
+def run_seed_des(seed: int, until: float = 100.0, stochastic: bool = True, sentinel_period: float = 6.0,
+                 smith_delay: float = 3.0, final_bonus: int = SimulationConfig.final_bonus,
+                 smith_rate: float = SimulationConfig.smith_rate,
+                 zion_intensity: float = SimulationConfig.zion_intensity) -> Tuple[bool, bool, int]:
+    """One discrete-event run -> (peace, zion_alive, simulated time rounded up)."""
+    from .scheduler import DiscreteEventSimulator, default_processes
+    rng = random.Random(seed)
+    sim = DiscreteEventSimulator(init_world(), until=until, mark_time=False)
+    w = sim.run(default_processes(rng if stochastic else None, sentinel_period, smith_delay, final_bonus,
+                                  smith_rate, zion_intensity))
+    return w.peace, w.zion_alive, math.ceil(sim.end_time)
+
+def _run_chunk(chunk: List[Tuple[int, int, bool, Optional[Dict[str, Any]]]]) -> List[EnsembleStats]:
+    stats = EnsembleStats()
+    for seed, max_ticks, stochastic, des in chunk:
+        if des is None:
+            stats.add(*run_seed(seed, max_ticks, stochastic))
+        else:
+            stats.add(*run_seed_des(seed, stochastic=stochastic, **des))
+    return [stats]
+
+def run_ensemble(runs: int, base_seed: int = 0, max_ticks: int = 12, stochastic: bool = True,
+                 workers: Optional[int] = None, chunksize: int = 256,
+                 ci_halfwidth: Optional[float] = None, min_runs: int = 100,
+                 z: float = 1.96, des: Optional[Dict[str, Any]] = None) -> Iterator[EnsembleStats]:
+    """Run up to `runs` seeded agent simulations, yielding a snapshot of the running aggregate per finished chunk.
+
+    Run i always uses `derive_seed(base_seed, i)`. With `ci_halfwidth`, the
+    ensemble stops once both the peace and Zion-fall Wilson intervals are at
+    least that tight (after `min_runs`); outstanding chunks are cancelled, so
+    the exact subset of seeds included then depends on scheduling.
+    `des` (keyword arguments of run_seed_des) runs the discrete-event
+    processes instead of agent ticks; "ticks" are then simulated time units.
+    """
+    items = ((derive_seed(base_seed, i), max_ticks, stochastic, des) for i in range(runs))
+    total = EnsembleStats()
+    parts = imap_chunks(_run_chunk, items, workers=workers, chunksize=chunksize)
+    try:
+        for part in parts:
+            total.merge(part)
+            yield total.copy()
+            if ci_halfwidth is not None and total.runs >= min_runs and total.halfwidth(z) <= ci_halfwidth:
+                return
+    finally:
+        parts.close()
@@ -0,0 +1,186 @@
+from __future__ import annotations
+from array import array
+from collections.abc import Mapping
+from enum import Enum
+from typing import Dict, Iterator, List, Optional, Tuple
+from .engine import Character, Faction, Realm
+
+class Kind(Enum):
+    CHARACTER = 0   # named cast member (Neo, Trinity, ...)
+    SMITH_COPY = 1
+    FREED_HUMAN = 2
+    SENTINEL = 3
+
+_FACTION = {f.value: f for f in Faction}
+_REALM = {r.value: r for r in Realm}
+
+def _fill(typecode: str, value: int, n: int) -> array:
+    return array(typecode, [value]) * n
+
+class CharacterView:
+    """Character-compatible handle on one row of an EntityTable."""
+    __slots__ = ("_t", "id")
+
+    def __init__(self, table: "EntityTable", eid: int):
+        self._t = table
+        self.id = eid
+
+    @property
+    def name(self) -> str:
+        return self._t.name_of(self.id)
+
+    @property
+    def faction(self) -> Faction:
+        return _FACTION[self._t.faction[self.id]]
+
+    @faction.setter
+    def faction(self, v: Faction) -> None:
+        self._t.faction[self.id] = v.value
+
+    @property
+    def realm(self) -> Realm:
+        return _REALM[self._t.realm[self.id]]
+
+    @realm.setter
+    def realm(self, v: Realm) -> None:
+        self._t.realm[self.id] = v.value
+
+    @property
+    def alive(self) -> bool:
+        return bool(self._t.alive[self.id])
+
+    @alive.setter
+    def alive(self, v: bool) -> None:
+        self._t.alive[self.id] = 1 if v else 0
+
+    @property
+    def power(self) -> int:
+        return self._t.power[self.id]
+
+    @power.setter
+    def power(self, v: int) -> None:
+        self._t.power[self.id] = v
+
+    def to_character(self) -> Character:
+        return Character(self.name, self.faction, self.realm, self.alive, self.power)
+
+    def __repr__(self) -> str:
+        return f"CharacterView({self.id}, {self.to_character()!r})"
+
+class _NameMap(Mapping):
+    """`World.chars` stand-in: name -> CharacterView, adding a Character appends a row."""
+
+    def __init__(self, table: "EntityTable"):
+        self._t = table
+
+    def __getitem__(self, name: str) -> CharacterView:
+        return CharacterView(self._t, self._t.names[name])
+
+    def __setitem__(self, name: str, c: Character) -> None:
+        self._t.add(c)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._t.names)
+
+    def __len__(self) -> int:
+        return len(self._t.names)
+
+class EntityTable:
+    """Columnar entity store: one array per component, dense integer ids.
+
+    Rows are never moved or reused, so an id stays valid for the table's life;
+    removing entities clears their `alive` flag. Bulk spawns append
+    contiguous id ranges that are remembered per Kind, so counting or killing
+    a whole kind is a handful of C-level slice operations, not a Python loop.
+    """
+
+    def __init__(self):
+        self.kind = array("b")
+        self.faction = array("b")
+        self.realm = array("b")
+        self.alive = array("b")
+        self.power = array("h")
+        self.names: Dict[str, int] = {}
+        self._names_by_id: Dict[int, str] = {}
+        self.ranges: Dict[Kind, List[Tuple[int, int]]] = {k: [] for k in Kind}
+        self.chars = _NameMap(self)
+
+    @classmethod
+    def from_chars(cls, chars) -> "EntityTable":
+        t = cls()
+        for c in chars.values():
+            t.add(c)
+        return t
+
+    def __len__(self) -> int:
+        return len(self.alive)
+
+    def add(self, c: Character) -> int:
+        """Append (or overwrite, for a known name) one named character; returns its id."""
+        eid = self.names.get(c.name)
+        if eid is not None:
+            self.faction[eid], self.realm[eid] = c.faction.value, c.realm.value
+            self.alive[eid], self.power[eid] = int(c.alive), c.power
+            return eid
+        eid = self.spawn(Kind.CHARACTER, c.faction, c.realm, c.power, 1, alive=c.alive).start
+        self.names[c.name] = eid
+        self._names_by_id[eid] = c.name
+        return eid
+
+    def name_of(self, eid: int) -> str:
+        name = self._names_by_id.get(eid)
+        if name is not None:
+            return name
+        for kind, spans in self.ranges.items():
+            if any(a <= eid < b for a, b in spans):
+                return f"{kind.name.lower()}#{eid}"
+        raise IndexError(eid)
+
+    def view(self, name: str) -> CharacterView:
+        return self.chars[name]
+
+    def spawn(self, kind: Kind, faction: Faction, realm: Realm, power: int, n: int,
+              alive: bool = True) -> range:
+        """Append `n` identical entities in one step; returns their id range."""
+        start = len(self.alive)
+        if n <= 0:
+            return range(start, start)
+        self.kind.extend(_fill("b", kind.value, n))
+        self.faction.extend(_fill("b", faction.value, n))
+        self.realm.extend(_fill("b", realm.value, n))
+        self.alive.extend(_fill("b", int(alive), n))
+        self.power.extend(_fill("h", power, n))
+        spans = self.ranges[kind]
+        if spans and spans[-1][1] == start:
+            spans[-1] = (spans[-1][0], start + n)
+        else:
+            spans.append((start, start + n))
+        return range(start, start + n)
+
+    def count(self, kind: Optional[Kind] = None, alive: bool = True) -> int:
+        flag = int(alive)
+        if kind is None:
+            return self.alive.count(flag)
+        return sum(self.alive[a:b].count(flag) for a, b in self.ranges[kind])
+
+    def kill(self, ids: range) -> None:
+        self.alive[ids.start:ids.stop] = _fill("b", 0, len(ids))
+
+    def kill_kind(self, kind: Kind) -> int:
+        """Clear `alive` for every entity of `kind`; returns how many were alive."""
+        n = self.count(kind)
+        for a, b in self.ranges[kind]:
+            self.alive[a:b] = _fill("b", 0, b - a)
+        return n
+
+    def set_realm(self, ids: range, realm: Realm) -> None:
+        self.realm[ids.start:ids.stop] = _fill("b", realm.value, len(ids))
+
+    def copy(self) -> "EntityTable":
+        t = EntityTable()
+        for col in ("kind", "faction", "realm", "alive", "power"):
+            setattr(t, col, array(getattr(self, col).typecode, getattr(self, col)))
+        t.names = dict(self.names)
+        t._names_by_id = dict(self._names_by_id)
+        t.ranges = {k: list(v) for k, v in self.ranges.items()}
+        return t
@@ -0,0 +1,325 @@
+from __future__ import annotations
+from array import array
+from bisect import bisect_right
+from collections import deque
+from collections.abc import Sequence
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+import copy
+from .engine import Movie, _record
+
+_FILM_MOVIES = frozenset(m.value for m in Movie)
+
+class _Interner:
+    """Maps hashable values to dense ids (and back)."""
+    __slots__ = ("ids", "values")
+
+    def __init__(self):
+        self.ids: Dict[Any, int] = {}
+        self.values: List[Any] = []
+
+    def __call__(self, v: Any) -> int:
+        i = self.ids.get(v)
+        if i is None:
+            i = self.ids[v] = len(self.values)
+            self.values.append(v)
+        return i
+
+class EventLog(Sequence):
+    """Compact, list-like replacement for `World.log`.
+
+    Strings, theme lists and myth lists are interned, per-record fields live in
+    parallel `array('I')` columns, and snapshots are stored as deltas against
+    the previous record with a full keyframe every `keyframe_every` records.
+    Indexing or iterating yields the same dicts the plain list log holds; they
+    are built on access and not retained.
+    """
+
+    def __init__(self, keyframe_every: int = 64):
+        self.keyframe_every = max(1, keyframe_every)
+        self._str = _Interner()
+        self._lists = _Interner()
+        self._movie = array("I")
+        self._event = array("I")
+        self._desc = array("I")
+        self._themes = array("I")
+        self._myth = array("I")
+        # snapshot storage: None (unchanged), ((idx, value), ...) delta, or keyframe values
+        self._snap: List[Optional[tuple]] = []
+        self._kf_pos = array("q")
+        self._kf_keys: List[Tuple[str, ...]] = []
+        self._keys: Tuple[str, ...] = ()
+        self._last: Optional[tuple] = None
+        self._last_obj: Optional[Dict[str, Any]] = None
+        self._since_kf = 0
+
+    # -- writing --------------------------------------------------------------
+
+    def append_event(self, movie: str, event: str, desc: str, themes: List[str], myth: List[str],
+                     snapshot: Dict[str, Any]) -> None:
+        s = self._str
+        self._movie.append(s(movie))
+        self._event.append(s(event))
+        self._desc.append(s(desc))
+        self._themes.append(self._lists(tuple(themes)))
+        self._myth.append(self._lists(tuple(myth)))
+        self._store_snapshot(snapshot)
+
+    def append(self, rec: Dict[str, Any]) -> None:
+        self.append_event(rec["movie"], rec["event"], rec["desc"], rec["themes"], rec["myth"], rec["snapshot"])
+
+    def extend(self, recs) -> None:
+        for rec in recs:
+            self.append(rec)
+
+    def _store_snapshot(self, snap: Dict[str, Any]) -> None:
+        if snap is self._last_obj and self._since_kf < self.keyframe_every:
+            # World reuses the Snapshot object while nothing changed
+            self._snap.append(None)
+            self._since_kf += 1
+            return
+        self._last_obj = snap
+        keys = tuple(snap)
+        values = tuple(snap.values())
+        prev = self._last
+        if prev is None or keys != self._keys or self._since_kf >= self.keyframe_every:
+            self._kf_pos.append(len(self._snap))
+            self._kf_keys.append(keys)
+            self._keys = keys
+            self._snap.append(values)
+            self._since_kf = 0
+        elif values == prev:
+            self._snap.append(None)
+        else:
+            self._snap.append(tuple((j, v) for j, (a, v) in enumerate(zip(prev, values)) if a != v))
+        self._last = values
+        self._since_kf += 1
+
+    def copy(self) -> "EventLog":
+        """Fork: columns are copied, the append-only interners are shared."""
+        new = object.__new__(EventLog)
+        new.__dict__.update(self.__dict__)
+        for name in ("_movie", "_event", "_desc", "_themes", "_myth", "_kf_pos"):
+            setattr(new, name, array(getattr(self, name).typecode, getattr(self, name)))
+        new._snap = list(self._snap)
+        new._kf_keys = list(self._kf_keys)
+        return new
+
+    # -- reading --------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._snap)
+
+    def _snapshot_values(self, i: int) -> Tuple[Tuple[str, ...], tuple]:
+        k = bisect_right(self._kf_pos, i) - 1
+        start = self._kf_pos[k]
+        keys = self._kf_keys[k]
+        if i == len(self._snap) - 1:
+            return keys, self._last
+        values = list(self._snap[start])
+        for idx in range(start + 1, i + 1):
+            d = self._snap[idx]
+            if d:
+                for j, v in d:
+                    values[j] = v
+        return keys, tuple(values)
+
+    def _record(self, i: int, keys: Tuple[str, ...], values: tuple) -> Dict[str, Any]:
+        s = self._str.values
+        lists = self._lists.values
+        return {
+            "movie": s[self._movie[i]],
+            "event": s[self._event[i]],
+            "desc": s[self._desc[i]],
+            "themes": list(lists[self._themes[i]]),
+            "myth": list(lists[self._myth[i]]),
+            "snapshot": dict(zip(keys, values)),
+        }
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("EventLog index out of range")
+        return self._record(i, *self._snapshot_values(i))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        # sequential walk: apply each delta once instead of replaying from the keyframe
+        kf = set(self._kf_pos)
+        k = -1
+        keys: Tuple[str, ...] = ()
+        values: List[Any] = []
+        for i, entry in enumerate(self._snap):
+            if i in kf:
+                k += 1
+                keys = self._kf_keys[k]
+                values = list(entry)
+            elif entry:
+                for j, v in entry:
+                    values[j] = v
+            yield self._record(i, keys, tuple(values))
+
+    def __repr__(self) -> str:
+        return f"EventLog(len={len(self)}, strings={len(self._str.values)}, keyframes={len(self._kf_pos)})"
+
+# ---- Retention policies -------------------------------------------------------
+
+RETENTION_MODES = ("full", "ring", "events", "none")
+Spill = Callable[[Dict[str, Any]], None]
+
+def is_marker(rec: Dict[str, Any]) -> bool:
+    """Prelude/Tick/Epilogue bookkeeping records (not a film event)."""
+    return rec["movie"] not in _FILM_MOVIES
+
+class LogSummary:
+    """Rolling counters that survive log eviction: totals, per-theme/per-movie counts, last record."""
+    __slots__ = ("records", "events", "skips", "themes", "movies", "_last")
+
+    def __init__(self):
+        self.records = 0
+        self.events = 0
+        self.skips = 0
+        self.themes: Dict[str, int] = {}
+        self.movies: Dict[str, int] = {}
+        self._last: Optional[tuple] = None   # append_event args; the dict is built on demand
+
+    @property
+    def last(self) -> Optional[Dict[str, Any]]:
+        """Most recent record, even when the log itself has evicted or dropped it."""
+        return _record(*self._last) if self._last is not None else None
+
+    def copy(self) -> "LogSummary":
+        new = copy.copy(self)
+        new.themes = dict(self.themes)
+        new.movies = dict(self.movies)
+        return new
+
+    def add(self, movie: str, event: str, themes: List[str]) -> None:
+        self.records += 1
+        if event.startswith("[SKIP] "):
+            self.skips += 1
+        elif movie in _FILM_MOVIES:
+            self.events += 1
+        self.movies[movie] = self.movies.get(movie, 0) + 1
+        counts = self.themes
+        for t in themes:
+            counts[t] = counts.get(t, 0) + 1
+
+class _RetainedLog(Sequence):
+    """Base for bounded logs: keeps a LogSummary and hands dropped records to `spill`."""
+
+    def __init__(self, spill: Optional[Spill] = None):
+        self.summary = LogSummary()
+        self.spill = spill
+
+    def append_event(self, movie: str, event: str, desc: str, themes: List[str], myth: List[str],
+                     snapshot: Dict[str, Any]) -> None:
+        summary = self.summary
+        summary.add(movie, event, themes)
+        summary._last = (movie, event, desc, themes, myth, snapshot)
+        self._keep(movie, event, desc, themes, myth, snapshot)
+
+    def append(self, rec: Dict[str, Any]) -> None:
+        self.append_event(rec["movie"], rec["event"], rec["desc"], rec["themes"], rec["myth"], rec["snapshot"])
+
+    def extend(self, recs) -> None:
+        for rec in recs:
+            self.append(rec)
+
+    @property
+    def total(self) -> int:
+        """Records ever appended (len() is only what is retained)."""
+        return self.summary.records
+
+    def _keep(self, movie, event, desc, themes, myth, snapshot) -> None:
+        raise NotImplementedError
+
+class RingLog(_RetainedLog):
+    """Keeps the last `maxlen` records; older ones are evicted (and spilled)."""
+
+    def __init__(self, maxlen: int, spill: Optional[Spill] = None):
+        super().__init__(spill)
+        self._items: Deque[Dict[str, Any]] = deque(maxlen=max(1, maxlen))
+
+    def _keep(self, movie, event, desc, themes, myth, snapshot) -> None:
+        items = self._items
+        if self.spill is not None and len(items) == items.maxlen:
+            self.spill(items[0])
+        items.append(_record(movie, event, desc, themes, myth, snapshot))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return list(self._items)[i]
+        return self._items[i]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def copy(self) -> "RingLog":
+        new = RingLog(self._items.maxlen, self.spill)
+        new._items = self._items.copy()
+        new.summary = self.summary.copy()
+        return new
+
+class EventsOnlyLog(_RetainedLog):
+    """Keeps film events only: Tick/Prelude/Epilogue markers and [SKIP]s are dropped (and spilled)."""
+
+    def __init__(self, spill: Optional[Spill] = None):
+        super().__init__(spill)
+        self._items: List[Dict[str, Any]] = []
+
+    def _keep(self, movie, event, desc, themes, myth, snapshot) -> None:
+        if movie in _FILM_MOVIES and not event.startswith("[SKIP] "):
+            self._items.append(_record(movie, event, desc, themes, myth, snapshot))
+        elif self.spill is not None:
+            self.spill(_record(movie, event, desc, themes, myth, snapshot))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, i):
+        return self._items[i]
+
+    def copy(self) -> "EventsOnlyLog":
+        new = EventsOnlyLog(self.spill)
+        new._items = list(self._items)
+        new.summary = self.summary.copy()
+        return new
+
+class NullLog(_RetainedLog):
+    """Retains nothing but the rolling summary (every record goes to `spill`, if set)."""
+
+    def _keep(self, movie, event, desc, themes, myth, snapshot) -> None:
+        if self.spill is not None:
+            self.spill(_record(movie, event, desc, themes, myth, snapshot))
+
+    def __len__(self) -> int:
+        return 0
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return []
+        raise IndexError("NullLog retains no records")
+
+    def copy(self) -> "NullLog":
+        new = NullLog(self.spill)
+        new.summary = self.summary.copy()
+        return new
+
+def make_log(retention: str = "full", keep: int = 1000, spill: Optional[Spill] = None,
+             compact: bool = False):
+    """Log store for a retention mode: full (list or EventLog), ring, events or none."""
+    if retention == "full":
+        return EventLog() if compact else []
+    if retention == "ring":
+        return RingLog(keep, spill)
+    if retention == "events":
+        return EventsOnlyLog(spill)
+    if retention == "none":
+        return NullLog(spill)
+    raise ValueError(f"Unknown retention {retention!r} (use one of {RETENTION_MODES})")
@@ -1,7 +1,15 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import Callable, Optional, Set, List
-from .engine import World, Movie, Theme, Realm
+from .engine import World, Movie, Theme, Realm, Faction, theme_mask
+from .registry import REGISTRY
+from .instrument import Timing
+from time import perf_counter
+
+# entity mode (World.entities set): bulk sizes per event
+SMITH_COPIES_PER_RATE = 10_000  # Smith copies spawned per unit of spread rate
+FREED_PER_AWAKENING = 1_000     # humans unplugged alongside Neo
+SENTINELS_PER_INTENSITY = 1_000 # Sentinels per unit of assault intensity
 
 def _clamp01(x: float) -> float:
     return max(0.0, min(1.0, x))
@@ -16,15 +24,43 @@ class Event:
     pre: Optional[Callable[[World], bool]] = None
     effect: Optional[Callable[[World], None]] = None
 
+    def __post_init__(self):
+        # computed once per Event; records share the name list
+        self.theme_names = [t.name for t in self.themes]
+        self.theme_mask = theme_mask(self.themes)
+
     def run(self, w: World) -> bool:
+        if w.hooks is not None:
+            return self._run_hooked(w)
         if self.pre and not self.pre(w):
-            w.log_event(self.movie, f"[SKIP] {self.name}", "Precondition failed", [t.name for t in self.themes], self.myth)
+            w.log_event(self.movie, f"[SKIP] {self.name}", "Precondition failed", self.theme_names, self.myth, self.theme_mask)
             return False
         if self.effect:
             self.effect(w)
-        w.log_event(self.movie, self.name, self.desc, [t.name for t in self.themes], self.myth)
+        w.log_event(self.movie, self.name, self.desc, self.theme_names, self.myth, self.theme_mask)
         return True
 
+    def _run_hooked(self, w: World) -> bool:
+        # same steps as run(), timed per phase and wrapped in the world's hooks
+        hooks = w.hooks
+        for fn in hooks.pre_run:
+            fn(self, w)
+        t0 = perf_counter()
+        ok = not self.pre or self.pre(w)
+        t1 = perf_counter()
+        if ok and self.effect:
+            self.effect(w)
+        t2 = perf_counter()
+        if ok:
+            w.log_event(self.movie, self.name, self.desc, self.theme_names, self.myth, self.theme_mask)
+        else:
+            w.log_event(self.movie, f"[SKIP] {self.name}", "Precondition failed", self.theme_names, self.myth, self.theme_mask)
+        t3 = perf_counter()
+        timing = Timing(t1 - t0, t2 - t1, t3 - t2)
+        for fn in hooks.post_run:
+            fn(self, w, ok, timing)
+        return ok
+
 # ---- Event factories (Matrix I–III + Machines) ----
 
 def ev_awaken_neo() -> Event:
@@ -34,6 +70,12 @@ def ev_awaken_neo() -> Event:
         w.get("Neo").power = max(w.get("Neo").power, 30)
         w.humans_free += 1
         w.matrix_control = _clamp01(w.matrix_control - 0.02)
+        if w.entities is not None:
+            from .entities import Kind  # entity mode only; keeps plain imports light
+            n = min(FREED_PER_AWAKENING, w.humans_enslaved)
+            w.entities.spawn(Kind.FREED_HUMAN, Faction.HUMAN, Realm.REAL, 10, n)
+            w.humans_free += n
+            w.humans_enslaved -= n
     return Event(Movie.MATRIX, "Neo awakens (Red Pill)",
                  "Morpheus frees Neo; reality revealed as simulation.",
                  {Theme.REALITY_ILLUSION, Theme.MESSIANIC_GNOSIS, Theme.FREE_WILL},
@@ -104,6 +146,11 @@ def ev_smith_spreads(rate: float) -> Event:
     def effect(w: World):
         w.smith_factor = _clamp01(w.smith_factor + rate)
         w.matrix_control = _clamp01(w.matrix_control - 0.05)
+        if w.entities is not None:
+            from .entities import Kind
+            smith = w.chars.get("Smith")
+            w.entities.spawn(Kind.SMITH_COPY, Faction.PROGRAM, Realm.MATRIX,
+                             smith.power if smith is not None else 80, int(rate * SMITH_COPIES_PER_RATE))
     return Event(Movie.RELOADED, "Smith spreads",
                  "Smith replicates across programs and humans.",
                  {Theme.SMITH_SHADOW, Theme.CONTROL_SYSTEMS}, [],
@@ -111,8 +158,15 @@ def ev_smith_spreads(rate: float) -> Event:
 
 def ev_zion_assault(intensity: float) -> Event:
     def effect(w: World):
+        defense = w.zion_defense
         w.zion_defense = _clamp01(w.zion_defense - intensity)
         w.zion_alive = w.zion_defense > 0.0
+        if w.entities is not None:
+            from .entities import Kind
+            squad = w.entities.spawn(Kind.SENTINEL, Faction.MACHINE, Realm.REAL, 40,
+                                     int(intensity * SENTINELS_PER_INTENSITY))
+            # the docks' defense (before the hit) destroys its share of the squad
+            w.entities.kill(squad[:int(len(squad) * defense)])
     return Event(Movie.REVOLUTIONS, "Sentinel assault on Zion",
                  "Sentinels erode Zion's defenses; docks under siege.",
                  {Theme.CONTROL_SYSTEMS}, [], effect=effect)
@@ -141,6 +195,9 @@ def ev_final_fight(bonus: int) -> Event:
             w.matrix_control = 0.5
             neo.alive = False
             w.neo_alive = False
+            if w.entities is not None:
+                from .entities import Kind
+                w.entities.kill_kind(Kind.SMITH_COPY)
         else:
             w.smith_factor = _clamp01(w.smith_factor + 0.2)
     return Event(Movie.REVOLUTIONS, "Final fight: Neo vs Smith",
@@ -152,25 +209,31 @@ def ev_peace() -> Event:
     def effect(w: World):
         if w.smith_factor == 0.0:
             w.peace = True
+            if w.entities is not None:
+                from .entities import Kind
+                w.entities.kill_kind(Kind.SENTINEL)  # the ceasefire recalls every squad
     return Event(Movie.REVOLUTIONS, "Peace accord",
                  "Ceasefire: humans may leave the Matrix (if Smith is gone).",
                  {Theme.HUMAN_MACHINE_SYMBIOSIS, Theme.FREE_WILL}, [], effect=effect)
 
-# Canon builder (used by timeline)
+# Canon builder (used by timeline); events come from the shared registry
 def build_events_trilogy(architect_choice: str, smith_rate: float, zion_intensity: float, final_bonus: int) -> list[Event]:
+    get = REGISTRY.get
+    # the registry keys on parameter types: 8 and 8.0 must share one event
+    smith_rate, zion_intensity, final_bonus = float(smith_rate), float(zion_intensity), int(final_bonus)
     return [
-        ev_awaken_neo(),
-        ev_train_neo(),
-        ev_rescue_morpheus(),
-        ev_neo_ascends(),
-        ev_merovingian_persephone(),
-        ev_keymaker_freed(),
-        ev_architect_choice(architect_choice),
-        ev_save_trinity(),
-        ev_smith_spreads(smith_rate),
-        ev_zion_assault(zion_intensity),
-        ev_smith_copies_oracle(),
-        ev_machines_negotiate(),
-        ev_final_fight(final_bonus),
-        ev_peace(),
+        get(ev_awaken_neo),
+        get(ev_train_neo),
+        get(ev_rescue_morpheus),
+        get(ev_neo_ascends),
+        get(ev_merovingian_persephone),
+        get(ev_keymaker_freed),
+        get(ev_architect_choice, architect_choice),
+        get(ev_save_trinity),
+        get(ev_smith_spreads, smith_rate),
+        get(ev_zion_assault, zion_intensity),
+        get(ev_smith_copies_oracle),
+        get(ev_machines_negotiate),
+        get(ev_final_fight, final_bonus),
+        get(ev_peace),
     ]
@@ -0,0 +1,144 @@
+from __future__ import annotations
+from dataclasses import astuple, fields, replace
+from itertools import product
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, get_type_hints
+from .cache import ResultCache
+from .movies import SimulationConfig
+from .sweep import sweep
+
+# Final-snapshot fields that define "the outcome" of a run unless told otherwise
+DEFAULT_OUTCOME = ("peace", "zion_alive", "neo_alive")
+# Numeric SimulationConfig fields the explorer can vary, with their type
+AXES = {f.name: get_type_hints(SimulationConfig)[f.name]
+        for f in fields(SimulationConfig) if f.name != "architect_choice"}
+
+Outcome = Tuple[Any, ...]
+Bounds = Tuple[Tuple[float, float], ...]
+
+class Explorer:
+    """Adaptive search for where the outcome of a canon run flips.
+
+    The box spanned by `ranges` is cut into a coarse grid of cells; a cell
+    whose corners disagree is split in half along every axis still wider than
+    its tolerance, until each cell is either uniform or at resolution. Only
+    cells straddling a boundary are refined, so the run count grows with the
+    boundary's size instead of the volume. Every evaluated config is memoized
+    and reused by later calls; each refinement round runs as one sweep().
+
+    Uniform cells are assumed uniform inside: a region narrower than one
+    coarse cell that does not touch a corner can be missed.
+    """
+
+    def __init__(self, base: Optional[SimulationConfig] = None, outcome: Sequence[str] = DEFAULT_OUTCOME,
+                 workers: Optional[int] = 1, chunksize: int = 16, cache: Optional[ResultCache] = None):
+        self.base = base or SimulationConfig()
+        self.cache = cache
+        self.outcome = tuple(outcome)
+        self.workers = workers
+        self.chunksize = chunksize
+        self.memo: Dict[tuple, Outcome] = {}
+        self.evaluations = 0
+
+    def config(self, point: Dict[str, float]) -> SimulationConfig:
+        return replace(self.base, **{k: AXES[k](v) for k, v in point.items()})
+
+    def evaluate(self, points: Iterable[Dict[str, float]]) -> List[Outcome]:
+        """Outcomes at `points`, running (in one batch) only configs not seen before."""
+        cfgs = [self.config(p) for p in points]
+        pending: Dict[tuple, SimulationConfig] = {}
+        for cfg in cfgs:
+            key = astuple(cfg)
+            if key not in self.memo:
+                pending.setdefault(key, cfg)
+        if pending:
+            todo = list(pending.values())
+            for row in sweep(todo, workers=self.workers, chunksize=self.chunksize, cache=self.cache):
+                final = row["final"]
+                self.memo[astuple(todo[row["index"]])] = tuple(final[f] for f in self.outcome)
+            self.evaluations += len(todo)
+        return [self.memo[astuple(cfg)] for cfg in cfgs]
+
+    def label(self, out: Outcome) -> Dict[str, Any]:
+        return dict(zip(self.outcome, out))
+
+    def explore(self, ranges: Dict[str, Tuple[float, float]], tol: Optional[Dict[str, float]] = None,
+                coarse: int = 8) -> Dict[str, Any]:
+        """Outcome regions over `ranges` ({axis: (lo, hi)}), resolved to `tol` per axis.
+
+        Default tolerance is 1 for integer axes and (hi - lo) / 256 otherwise.
+        """
+        names = list(ranges)
+        for n in names:
+            if n not in AXES:
+                raise ValueError(f"unknown axis {n!r}; choose from {', '.join(AXES)}")
+            if not ranges[n][0] < ranges[n][1]:
+                raise ValueError(f"axis {n}: empty range {ranges[n]}")
+        kinds = [AXES[n] for n in names]
+        tol = dict(tol or {})
+        tols = [max(tol.get(n, 1 if k is int else (ranges[n][1] - ranges[n][0]) / 256), 1 if k is int else 0.0)
+                for n, k in zip(names, kinds)]
+        ticks = [_ticks(k, *ranges[n], coarse) for n, k in zip(names, kinds)]
+        cells: List[Bounds] = list(product(*[list(zip(t, t[1:])) for t in ticks]))
+        before = self.evaluations
+        done: List[Tuple[Bounds, Optional[Outcome]]] = []
+        while cells:
+            corners = {c: list(product(*cell)) for c, cell in enumerate(cells)}
+            flat = [pt for pts in corners.values() for pt in pts]
+            outs = dict(zip(flat, self.evaluate(dict(zip(names, pt)) for pt in flat)))
+            nxt: List[Bounds] = []
+            for c, cell in enumerate(cells):
+                seen = {outs[pt] for pt in corners[c]}
+                split = [i for i, (a, b) in enumerate(cell) if b - a > tols[i]]
+                if len(seen) == 1:
+                    done.append((cell, seen.pop()))
+                elif not split:
+                    done.append((cell, None))
+                else:
+                    nxt.extend(_children(cell, split, kinds))
+            cells = nxt
+        done.sort()
+        grid = 1
+        for n, t in zip(names, tols):
+            grid *= int((ranges[n][1] - ranges[n][0]) / t + 1e-9) + 1
+        res: Dict[str, Any] = {
+            "axes": {n: list(ranges[n]) for n in names},
+            "tolerance": dict(zip(names, tols)),
+            "evaluations": self.evaluations - before,
+            "grid_equivalent": grid,
+            "cells": [{"bounds": {n: list(ab) for n, ab in zip(names, cell)},
+                       "outcome": None if out is None else self.label(out)} for cell, out in done],
+        }
+        if len(names) == 1:
+            res.update(self._regions_1d(names[0], done))
+        return res
+
+    def _regions_1d(self, name: str, done: List[Tuple[Bounds, Optional[Outcome]]]) -> Dict[str, Any]:
+        regions: List[Dict[str, Any]] = []
+        boundaries: List[Dict[str, Any]] = []
+        for ((a, b),), out in done:
+            if out is None:
+                below, above = self.evaluate([{name: a}, {name: b}])
+                boundaries.append({"between": [a, b], "below": self.label(below), "above": self.label(above)})
+            elif regions and regions[-1]["_out"] == out:
+                regions[-1]["to"] = b
+            else:
+                regions.append({"from": a, "to": b, "_out": out, "outcome": self.label(out)})
+        for r in regions:
+            del r["_out"]
+        return {"regions": regions, "boundaries": boundaries}
+
+def _ticks(kind: type, lo: float, hi: float, n: int) -> List[float]:
+    pts = [lo + (hi - lo) * i / max(1, n) for i in range(max(1, n) + 1)]
+    if kind is int:
+        return sorted({int(round(p)) for p in pts})
+    return [round(p, 12) for p in pts]
+
+def _children(cell: Bounds, split: List[int], kinds: List[type]) -> List[Bounds]:
+    parts = []
+    for i, (a, b) in enumerate(cell):
+        if i in split:
+            m = (a + b) // 2 if kinds[i] is int else round((a + b) / 2, 12)
+            parts.append([(a, m), (m, b)])
+        else:
+            parts.append([(a, b)])
+    return list(product(*parts))
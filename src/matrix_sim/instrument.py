@@ -0,0 +1,110 @@
+from __future__ import annotations
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, List, NamedTuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .engine import World
+    from .events import Event
+
+class Timing(NamedTuple):
+    """Seconds spent in one Event.run, split by phase."""
+    pre: float
+    effect: float
+    log: float
+
+PreHook = Callable[["Event", "World"], None]
+PostHook = Callable[["Event", "World", bool, Timing], None]
+
+class Hooks:
+    """Callbacks around Event.run, installed as `World.hooks`.
+
+    `World.hooks` is None by default and Event.run then takes its plain path,
+    so instrumentation costs one attribute check per event when unused.
+    """
+
+    def __init__(self):
+        self.pre_run: List[PreHook] = []
+        self.post_run: List[PostHook] = []
+
+    def on_pre(self, fn: PreHook) -> PreHook:
+        self.pre_run.append(fn)
+        return fn
+
+    def on_post(self, fn: PostHook) -> PostHook:
+        self.post_run.append(fn)
+        return fn
+
+@dataclass
+class EventStats:
+    runs: int = 0
+    skips: int = 0
+    pre_s: float = 0.0
+    effect_s: float = 0.0
+    log_s: float = 0.0
+
+    @property
+    def total_s(self) -> float:
+        return self.pre_s + self.effect_s + self.log_s
+
+@dataclass
+class ChooseStats:
+    calls: int = 0
+    seconds: float = 0.0
+
+@dataclass
+class Profiler:
+    """Per-event run/skip counters and phase timings, plus per-agent choose() timings."""
+    events: Dict[str, EventStats] = field(default_factory=dict)
+    agents: Dict[str, ChooseStats] = field(default_factory=dict)
+
+    def attach(self, world: "World") -> "Profiler":
+        if world.hooks is None:
+            world.hooks = Hooks()
+        if self._post not in world.hooks.post_run:
+            world.hooks.on_post(self._post)
+        return self
+
+    def detach(self, world: "World") -> None:
+        """Undo attach(); drops `world.hooks` again once no callbacks are left."""
+        hooks = world.hooks
+        if hooks is None:
+            return
+        if self._post in hooks.post_run:
+            hooks.post_run.remove(self._post)
+        if not hooks.pre_run and not hooks.post_run:
+            world.hooks = None
+
+    def _post(self, ev: "Event", world: "World", ran: bool, t: Timing) -> None:
+        st = self.events.get(ev.name)
+        if st is None:
+            st = self.events[ev.name] = EventStats()
+        if ran:
+            st.runs += 1
+        else:
+            st.skips += 1
+        st.pre_s += t.pre
+        st.effect_s += t.effect
+        st.log_s += t.log
+
+    def record_choose(self, agent: str, seconds: float) -> None:
+        st = self.agents.get(agent)
+        if st is None:
+            st = self.agents[agent] = ChooseStats()
+        st.calls += 1
+        st.seconds += seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"events": {k: asdict(v) for k, v in self.events.items()},
+                "agents": {k: asdict(v) for k, v in self.agents.items()}}
+
+    def format_table(self) -> str:
+        us = 1e6
+        out = [f"{'event':<40} {'runs':>7} {'skips':>6} {'pre µs':>9} {'effect µs':>10} {'log µs':>9}"]
+        for name, st in sorted(self.events.items(), key=lambda kv: -kv[1].total_s):
+            out.append(f"{name[:40]:<40} {st.runs:>7} {st.skips:>6} {st.pre_s*us:>9.1f} {st.effect_s*us:>10.1f} {st.log_s*us:>9.1f}")
+        if self.agents:
+            out.append("")
+            out.append(f"{'agent':<40} {'calls':>7} {'choose µs':>10}")
+            for name, st in sorted(self.agents.items(), key=lambda kv: -kv[1].seconds):
+                out.append(f"{name[:40]:<40} {st.calls:>7} {st.seconds*us:>10.1f}")
+        return "\n".join(out)
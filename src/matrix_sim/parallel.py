@@ -0,0 +1,48 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+import os
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+def imap_chunks(fn: Callable[[List[T]], List[R]], items: Iterable[T], workers: Optional[int] = None,
+                chunksize: int = 64) -> Iterator[R]:
+    """Apply `fn` to chunks of `items` on a process pool and stream results back.
+
+    Results arrive in completion order. At most `2 * workers` chunks are in flight,
+    so neither the inputs nor the outputs are ever fully materialised in the parent.
+    `workers <= 1` runs everything in-process (no pool, no pickling).
+    """
+    workers = default_workers() if workers is None else workers
+    chunks = chunked(items, max(1, chunksize))
+    if workers <= 1:
+        for chunk in chunks:
+            yield from fn(chunk)
+        return
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = set()
+        for chunk in chunks:
+            pending.add(pool.submit(fn, chunk))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield from fut.result()
+        for fut in as_completed(pending):
+            yield from fut.result()
+    finally:
+        # closing the generator early (e.g. a consumer that stops) drops queued work
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,262 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import json, operator, os, re
+from .parallel import imap_chunks
+from .sinks import compression_for, open_text
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+LOG_SUFFIXES = (".jsonl", ".jsonl.gz", ".jsonl.xz", ".jsonl.lzma")
+
+_OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    "<=": operator.le, ">=": operator.ge, "!=": operator.ne,
+    "=": operator.eq, "<": operator.lt, ">": operator.gt,
+}
+_PRED = re.compile(r"^\s*([A-Za-z_]\w*)\s*(<=|>=|!=|=|<|>)\s*(.+?)\s*$")
+
+@dataclass(frozen=True)
+class Predicate:
+    field: str
+    op: str
+    value: Any
+
+    def __call__(self, snap: Dict[str, Any]) -> bool:
+        v = snap.get(self.field)
+        return v is not None and _OPS[self.op](v, self.value)
+
+    def may_match(self, lo: float, hi: float) -> bool:
+        """Could any value in [lo, hi] satisfy this predicate? (bools count as 0/1)"""
+        v = self.value
+        if not isinstance(v, (int, float)):
+            return self.op == "!="  # numeric stats: never equal to a string
+        if self.op == "=":
+            return lo <= v <= hi
+        if self.op == "!=":
+            return not (lo == hi == v)
+        if self.op in ("<", "<="):
+            return _OPS[self.op](lo, v)
+        return _OPS[self.op](hi, v)
+
+def _value(text: str) -> Any:
+    low = text.lower()
+    if low in ("true", "false"):
+        return low == "true"
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+def parse_predicate(spec: str) -> Predicate:
+    """`field OP value` with OP one of = != < <= > >=, e.g. `smith_factor>0.5`, `zion_alive=false`."""
+    m = _PRED.match(spec)
+    if m is None:
+        raise ValueError(f"bad predicate {spec!r} (expected e.g. smith_factor>0.5)")
+    field, op, value = m.group(1), m.group(2), _value(m.group(3))
+    if op in ("<", "<=", ">", ">=") and not isinstance(value, (int, float)):
+        raise ValueError(f"bad predicate {spec!r}: {op} needs a number")
+    return Predicate(field, op, value)
+
+def parse_theme_expr(expr: str) -> Tuple[str, List[str]]:
+    """Same syntax as --query-theme: `A`, `A,B` (any of) or `A+B` (all of)."""
+    mode, sep = ("all", "+") if "+" in expr else ("any", ",")
+    return mode, [n.strip().upper() for n in expr.split(sep) if n.strip()]
+
+@dataclass(frozen=True)
+class Query:
+    theme: Optional[str] = None
+    event: Optional[str] = None
+    movie: Optional[str] = None
+    where: Tuple[Predicate, ...] = ()
+    coverage: bool = False  # aggregate theme counts instead of returning records
+
+    @property
+    def filtered(self) -> bool:
+        return bool(self.theme or self.event or self.movie or self.where)
+
+# ---- Sidecar index ----
+
+def index_path(path: str) -> str:
+    return path + INDEX_SUFFIX
+
+def _stamp(path: str) -> Dict[str, int]:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def build_index(path: str) -> Dict[str, Any]:
+    """One pass over a JSONL log: record byte offsets (uncompressed files only),
+    per-theme/event/movie record numbers and min/max of numeric snapshot fields."""
+    themes: Dict[str, List[int]] = {}
+    events: Dict[str, List[int]] = {}
+    movies: Dict[str, List[int]] = {}
+    stats: Dict[str, List[float]] = {}
+    offsets: Optional[List[int]] = None
+    n = 0
+
+    def add(i: int, rec: Dict[str, Any]) -> None:
+        for t in rec.get("themes", ()):
+            themes.setdefault(t, []).append(i)
+        events.setdefault(rec.get("event", ""), []).append(i)
+        movies.setdefault(rec.get("movie", ""), []).append(i)
+        for k, v in rec.get("snapshot", {}).items():
+            if isinstance(v, (int, float)):
+                s = stats.get(k)
+                if s is None:
+                    stats[k] = [v, v]
+                elif v < s[0]:
+                    s[0] = v
+                elif v > s[1]:
+                    s[1] = v
+
+    if compression_for(path) is None:
+        offsets = []
+        with open(path, "rb") as fh:
+            pos = 0
+            for line in fh:
+                if line.strip():
+                    offsets.append(pos)
+                    add(n, json.loads(line))
+                    n += 1
+                pos += len(line)
+    else:
+        with open_text(path) as fh:
+            for line in fh:
+                if line.strip():
+                    add(n, json.loads(line))
+                    n += 1
+    return {"version": INDEX_VERSION, "source": _stamp(path), "records": n, "offsets": offsets,
+            "themes": themes, "events": events, "movies": movies,
+            "stats": {k: [float(lo), float(hi)] for k, (lo, hi) in stats.items()}}
+
+def load_index(path: str, rebuild: bool = False) -> Dict[str, Any]:
+    """The sidecar index for `path`, rebuilt when missing, stale or `rebuild` is set."""
+    ipath = index_path(path)
+    if not rebuild:
+        try:
+            with open(ipath, encoding="utf-8") as fh:
+                idx = json.load(fh)
+            if idx.get("version") == INDEX_VERSION and idx.get("source") == _stamp(path):
+                return idx
+        except (OSError, ValueError):
+            pass
+    idx = build_index(path)
+    tmp = ipath + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(idx, fh, separators=(",", ":"))
+        os.replace(tmp, ipath)
+    except OSError:  # read-only archive: still answer the query
+        pass
+    return idx
+
+# ---- Query evaluation ----
+
+def _intersect(a: List[int], b: List[int]) -> List[int]:
+    sb = set(b)
+    return [i for i in a if i in sb]
+
+def candidates(idx: Dict[str, Any], q: Query) -> Optional[List[int]]:
+    """Record numbers that can match from the index alone ([] = skip file, None = every record)."""
+    for p in q.where:
+        st = idx["stats"].get(p.field)
+        if st is not None and isinstance(p.value, (int, float)) and not p.may_match(*st):
+            return []
+    rows: Optional[List[int]] = None
+    if q.theme:
+        mode, names = parse_theme_expr(q.theme)
+        lists = [idx["themes"].get(n, []) for n in names]
+        if mode == "all":
+            rows = lists[0] if lists else []
+            for other in lists[1:]:
+                rows = _intersect(rows, other)
+        else:
+            rows = sorted(set().union(*lists)) if lists else []
+    for key, value in (("events", q.event), ("movies", q.movie)):
+        if value is not None:
+            hits = idx[key].get(value, [])
+            rows = hits if rows is None else _intersect(rows, hits)
+    return rows
+
+def _read_rows(path: str, idx: Dict[str, Any], rows: Optional[List[int]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    if rows is None:
+        rows_set = None
+    elif not rows:
+        return
+    else:
+        rows_set = set(rows)
+    offsets = idx.get("offsets")
+    if offsets is not None and rows is not None:
+        with open(path, "rb") as fh:
+            for i in rows:
+                fh.seek(offsets[i])
+                yield i, json.loads(fh.readline())
+        return
+    with open_text(path) as fh:
+        n = 0
+        for line in fh:
+            if not line.strip():
+                continue
+            if rows_set is None or n in rows_set:
+                yield n, json.loads(line)
+            n += 1
+
+def query_file(path: str, q: Query, rebuild: bool = False) -> Dict[str, Any]:
+    """Run `q` on one log: {"file", "scanned", "matches": [...] or "coverage": {...}}.
+
+    Each match carries `record`, its 0-based record number (blank lines not counted).
+    """
+    idx = load_index(path, rebuild)
+    if q.coverage and not q.filtered:
+        return {"file": path, "scanned": 0, "records": idx["records"],
+                "coverage": {t: len(v) for t, v in idx["themes"].items()}}
+    rows = candidates(idx, q)
+    out: Dict[str, Any] = {"file": path, "scanned": 0, "records": idx["records"]}
+    matches: List[Dict[str, Any]] = []
+    coverage: Dict[str, int] = {}
+    for i, rec in _read_rows(path, idx, rows):
+        out["scanned"] += 1
+        snap = rec.get("snapshot", {})
+        if not all(p(snap) for p in q.where):
+            continue
+        if q.coverage:
+            for t in rec.get("themes", ()):
+                coverage[t] = coverage.get(t, 0) + 1
+        else:
+            matches.append({"file": path, "record": i, **rec})
+    if q.coverage:
+        out["coverage"] = coverage
+    else:
+        out["matches"] = matches
+    return out
+
+def _query_chunk(chunk: List[Tuple[str, Query, bool]]) -> List[Dict[str, Any]]:
+    return [query_file(path, q, rebuild) for path, q, rebuild in chunk]
+
+def find_logs(paths: Iterable[str]) -> List[str]:
+    """JSONL logs named by `paths` (directories are searched recursively)."""
+    found = []
+    for p in paths:
+        if os.path.isdir(p):
+            for root, dirs, files in os.walk(p):
+                dirs.sort()
+                found.extend(os.path.join(root, f) for f in sorted(files) if f.endswith(LOG_SUFFIXES))
+        else:
+            found.append(p)
+    return found
+
+def run_query(paths: Iterable[str], q: Query, workers: Optional[int] = None, chunksize: int = 4,
+              rebuild: bool = False) -> Iterator[Dict[str, Any]]:
+    """Per-file results of `q` over every log under `paths`, scanned on a process pool."""
+    items = ((path, q, rebuild) for path in find_logs(paths))
+    return imap_chunks(_query_chunk, items, workers=workers, chunksize=chunksize)
+
+def merge_coverage(results: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    total: Dict[str, int] = {}
+    for res in results:
+        for t, c in res.get("coverage", {}).items():
+            total[t] = total.get(t, 0) + c
+    return dict(sorted(total.items(), key=lambda kv: (-kv[1], kv[0])))
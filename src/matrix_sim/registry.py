@@ -0,0 +1,57 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .events import Event
+
+class EventKey(NamedTuple):
+    """Hashable definition of an event: the factory that builds it and its parameters."""
+    factory: str
+    params: Tuple[Any, ...]
+
+class EventRegistry:
+    """Builds each (factory, params) event once and hands out the shared instance.
+
+    `Event.run` keeps no per-run state, so one instance can be reused across
+    ticks, agents and runs. Treat registry events as read-only: mutating one
+    changes it for every caller.
+
+    At most `maxsize` events are kept, least recently used evicted first, so
+    continuous parameters (sweeps, the explorer, a long-running server) cannot
+    grow it without limit. An evicted event keeps working but is no longer
+    known to key_of(); asking for it again builds a new instance.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._events: "OrderedDict[tuple, Event]" = OrderedDict()
+        self._keys: Dict[int, EventKey] = {}
+
+    def get(self, factory: Callable[..., "Event"], *params: Any) -> "Event":
+        # types are part of the key: 8 == 8.0 and 1 == True, but they build different events
+        key = (factory, params, tuple(map(type, params)))
+        events = self._events
+        ev = events.get(key)
+        if ev is not None:
+            events.move_to_end(key)
+            return ev
+        ev = events[key] = factory(*params)
+        self._keys[id(ev)] = EventKey(f"{factory.__module__}.{factory.__qualname__}", params)
+        while len(events) > self.maxsize:
+            _, old = events.popitem(last=False)
+            del self._keys[id(old)]
+        return ev
+
+    def key_of(self, ev: "Event") -> Optional[EventKey]:
+        """Definition key of a registry-built event (None for ad-hoc or evicted events)."""
+        return self._keys.get(id(ev))
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def clear(self) -> None:
+        self._events.clear()
+        self._keys.clear()
+
+REGISTRY = EventRegistry()
@@ -0,0 +1,261 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Set, Union
+import random
+from .engine import World, SNAPSHOT_FIELDS
+from .events import (
+    Event,
+    ev_awaken_neo, ev_train_neo, ev_neo_ascends,
+    ev_smith_spreads, ev_smith_copies_oracle,
+    ev_zion_assault, ev_machines_negotiate,
+)
+from .registry import REGISTRY
+from .agents import Agent, NeoAgent, SmithAgent, MachineCollectiveAgent
+
+# Read/write keys are World state field names ("smith_factor") or character
+# attributes ("Neo.power"). Anything else a condition touches makes it volatile.
+_TRACKED = frozenset(SNAPSHOT_FIELDS)
+
+Then = Union[Event, Callable[[World, random.Random], Optional[Event]], None]
+
+class _CharTracer:
+    __slots__ = ("_c", "_name", "_acc")
+
+    def __init__(self, c, name: str, acc: "Access"):
+        object.__setattr__(self, "_c", c)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_acc", acc)
+
+    def __getattr__(self, attr: str) -> Any:
+        self._acc.reads.add(f"{self._name}.{attr}")
+        return getattr(self._c, attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        self._acc.writes.add(f"{self._name}.{attr}")
+        setattr(self._c, attr, value)
+
+class _Tracer:
+    """World stand-in that records which keys a callable reads and writes."""
+    __slots__ = ("_w", "_acc")
+
+    def __init__(self, w: World, acc: "Access"):
+        object.__setattr__(self, "_w", w)
+        object.__setattr__(self, "_acc", acc)
+
+    def __getattr__(self, name: str) -> Any:
+        self._acc.reads.add(name)
+        return getattr(self._w, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self._acc.writes.add(name)
+        setattr(self._w, name, value)
+
+    def get(self, name: str) -> _CharTracer:
+        return _CharTracer(self._w.get(name), name, self._acc)
+
+class Access(NamedTuple):
+    reads: Set[str]
+    writes: Set[str]
+
+def trace(fn: Callable[[Any], Any], w: World) -> tuple:
+    """Call `fn(w)` through a tracer; returns (result, Access)."""
+    acc = Access(set(), set())
+    return fn(_Tracer(w, acc)), acc
+
+def infer_access(ev: Event, w: World) -> Access:
+    """Read/write sets of one run of `ev` from state `w` (run on a clone; `w` is untouched).
+
+    Branches not taken from this state are not seen, so the sets describe this
+    state only; declare `Rule.reads` where a static set is needed.
+    """
+    w = w.clone()
+    w.listeners = []
+    acc = Access(set(), set())
+    t = _Tracer(w, acc)
+    if ev.pre is None or ev.pre(t):
+        if ev.effect is not None:
+            ev.effect(t)
+    return acc
+
+@dataclass
+class Rule:
+    """`when(world)` -> fire `then`, an Event or `then(world, rng)` (None = pass this tick).
+
+    `reads` declares the keys `when` depends on; left None they are traced on
+    every evaluation. `chance` makes a matching rule fire only with that
+    probability (drawn from the agent's rng), else matching moves on.
+    """
+    name: str
+    when: Callable[[World], bool]
+    then: Then = None
+    reads: Optional[FrozenSet[str]] = None
+    chance: Optional[float] = None
+
+    def fire(self, w: World, rng: random.Random) -> Optional[Event]:
+        if self.then is None or isinstance(self.then, Event):
+            return self.then
+        return self.then(w, rng)
+
+    @classmethod
+    def from_event(cls, ev: Event, reads: Optional[FrozenSet[str]] = None) -> "Rule":
+        """Rule that fires `ev` whenever its precondition holds."""
+        pre = ev.pre
+        return cls(ev.name, pre if pre is not None else _always, ev, reads)
+
+def _always(w: World) -> bool:
+    return True
+
+@dataclass
+class RuleEngine:
+    """Incremental matcher over an ordered rule list.
+
+    Each rule's condition is cached together with the keys it read; a rule is
+    re-evaluated only after one of those keys changed. World fields are seen
+    through World.track_changes() generations, character attributes by value.
+    """
+    rules: List[Rule]
+    evaluations: int = field(default=0, init=False)
+    skipped: int = field(default=0, init=False)
+
+    def __post_init__(self):
+        self._world: Optional[World] = None
+        self._value: List[bool] = [False] * len(self.rules)
+        self._stale: Set[int] = set(range(len(self.rules)))
+        self._volatile: Set[int] = set()
+        self._reads: List[FrozenSet[str]] = [frozenset()] * len(self.rules)
+        self._deps: Dict[str, Set[int]] = {}
+        self._seen: Dict[str, Any] = {}
+
+    def bind(self, w: World) -> None:
+        if w is self._world:
+            return
+        self._world = w
+        self._gens = w.track_changes()
+        self._stale = set(range(len(self.rules)))
+        self._volatile.clear()
+        self._reads = [frozenset()] * len(self.rules)
+        self._deps.clear()
+        self._seen.clear()
+
+    def _changed(self, w: World) -> None:
+        gens, chars = self._gens, w.chars
+        for key, seen in self._seen.items():
+            if key in _TRACKED:
+                now = gens.get(key, 0)
+            else:
+                name, _, attr = key.partition(".")
+                c = chars.get(name)
+                now = getattr(c, attr, None) if c is not None else None
+            if now != seen:
+                self._seen[key] = now
+                self._stale.update(self._deps[key])
+        self._stale.update(self._volatile)
+
+    def _evaluate(self, i: int, w: World) -> None:
+        rule = self.rules[i]
+        self.evaluations += 1
+        old = self._reads[i]
+        if rule.reads is not None:
+            value, reads = bool(rule.when(w)), rule.reads
+        else:
+            value, acc = trace(rule.when, w)
+            value, reads = bool(value), frozenset(acc.reads)
+        self._value[i] = value
+        if reads != old:
+            for key in old - reads:
+                self._deps[key].discard(i)
+            for key in reads - old:
+                self._watch(key, w).add(i)
+            self._reads[i] = reads
+        if all(k in _TRACKED or "." in k for k in reads):
+            self._volatile.discard(i)
+        else:
+            self._volatile.add(i)
+
+    def _watch(self, key: str, w: World) -> Set[int]:
+        deps = self._deps.get(key)
+        if deps is None:
+            deps = self._deps[key] = set()
+            if key in _TRACKED:
+                self._seen[key] = self._gens.get(key, 0)
+            elif "." in key:
+                name, _, attr = key.partition(".")
+                c = w.chars.get(name)
+                self._seen[key] = getattr(c, attr, None) if c is not None else None
+        return deps
+
+    def matching(self, w: World) -> Iterator[Rule]:
+        """Rules whose condition holds in `w`, in rule order (lazily refreshed)."""
+        self.bind(w)
+        self._changed(w)
+        stale = self._stale
+        for i, rule in enumerate(self.rules):
+            if i in stale:
+                stale.discard(i)
+                self._evaluate(i, w)
+            else:
+                self.skipped += 1
+            if self._value[i]:
+                yield rule
+
+@dataclass
+class PolicyAgent(Agent):
+    """Agent driven by an ordered rule list: the first matching rule fires.
+
+    Plugs into AgentSimulator like any Agent; conditions are matched
+    incrementally, so unchanged world state costs no re-evaluation.
+    """
+    rules: List[Rule] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.engine = RuleEngine(self.rules)
+
+    def choose(self, w: World) -> Optional[Event]:
+        for rule in self.engine.matching(w):
+            if rule.chance is not None and self.rng.random() >= rule.chance:
+                continue
+            return rule.fire(w, self.rng)
+        return None
+
+# ---- Declarative twins of agents.NeoAgent / SmithAgent / MachineCollectiveAgent ----
+
+def _get(factory, *params) -> Callable[[World, random.Random], Event]:
+    return lambda w, rng: REGISTRY.get(factory, *params)
+
+def neo_rules(stochastic: bool = False) -> List[Rule]:
+    rules = [Rule("awaken", lambda w: not w.neo_awake, _get(ev_awaken_neo), frozenset({"neo_awake"}))]
+    if stochastic:
+        rules.append(Rule("hesitate", _always, None, frozenset(), chance=NeoAgent.HESITATE))
+    rules += [
+        Rule("train", lambda w: w.get("Neo").power < 60, _get(ev_train_neo), frozenset({"Neo.power"})),
+        Rule("negotiate", lambda w: w.smith_factor > 0.6, _get(ev_machines_negotiate), frozenset({"smith_factor"})),
+        Rule("ascend", _always, _get(ev_neo_ascends), frozenset()),
+    ]
+    return rules
+
+def smith_rules(stochastic: bool = False) -> List[Rule]:
+    rules = []
+    if stochastic:
+        rules.append(Rule("dormant", _always, None, frozenset(), chance=SmithAgent.DORMANT))
+    spread = ((lambda w, rng: REGISTRY.get(ev_smith_spreads, rng.choice(SmithAgent.RATES))) if stochastic
+              else _get(ev_smith_spreads, 0.25))
+    rules += [
+        Rule("spread", lambda w: w.smith_factor < 0.6, spread, frozenset({"smith_factor"})),
+        Rule("copy_oracle", _always, _get(ev_smith_copies_oracle), frozenset()),
+    ]
+    return rules
+
+def machine_rules(stochastic: bool = False) -> List[Rule]:
+    assault = ((lambda w, rng: REGISTRY.get(ev_zion_assault, rng.choice(MachineCollectiveAgent.INTENSITIES)))
+               if stochastic else _get(ev_zion_assault, 0.2))
+    return [
+        Rule("negotiate", lambda w: w.smith_factor >= 0.75, _get(ev_machines_negotiate), frozenset({"smith_factor"})),
+        Rule("assault", lambda w: w.zion_alive and w.zion_defense > 0, assault,
+             frozenset({"zion_alive", "zion_defense"})),
+    ]
+
+def policy_agents(rng: random.Random, stochastic: bool = False) -> List[PolicyAgent]:
+    """Rule-based equivalents of agents.default_agents (same choices, same rng draws)."""
+    return [PolicyAgent("NeoAgent", rng, stochastic, neo_rules(stochastic)),
+            PolicyAgent("SmithAgent", rng, stochastic, smith_rules(stochastic)),
+            PolicyAgent("MachineAgent", rng, stochastic, machine_rules(stochastic))]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .engine import World
+from .events import Event, build_events_trilogy
+from .movies import SimulationConfig, init_world
+from .simulate import TimelineSimulator
+
+@dataclass
+class _Node:
+    children: Dict[int, Tuple[Event, "_Node"]] = field(default_factory=dict)
+    leaves: List[int] = field(default_factory=list)
+
+def _build_trie(event_lists: Iterable[Sequence[Event]]) -> _Node:
+    # events are keyed by identity: registry events are shared per (factory, params),
+    # so equal definitions collapse into one edge; ad-hoc events never merge
+    root = _Node()
+    for i, events in enumerate(event_lists):
+        node = root
+        for ev in events:
+            edge = node.children.get(id(ev))
+            if edge is None:
+                edge = node.children[id(ev)] = (ev, _Node())
+            node = edge[1]
+        node.leaves.append(i)
+    return root
+
+def run_event_lists(event_lists: Iterable[Sequence[Event]], world: Optional[World] = None) -> Iterator[Tuple[int, World]]:
+    """Run every event list from the same start state, sharing common prefixes.
+
+    Walks a prefix trie depth-first: each shared prefix runs once and the
+    world is cloned only where lists diverge (the last branch reuses the
+    parent's world). At most one checkpoint per branching level is alive, so
+    memory is bounded by the tree depth. Yields `(list_index, finished_world)`
+    in DFS order; each world's log equals an independent `TimelineSimulator.run`.
+    """
+    root = _build_trie(event_lists)
+    w = world if world is not None else init_world()
+    TimelineSimulator(w).begin()
+    yield from _walk(root, w)
+
+def _walk(node: _Node, world: World) -> Iterator[Tuple[int, World]]:
+    remaining = len(node.leaves) + len(node.children)
+    for idx in node.leaves:
+        remaining -= 1
+        w = world if remaining == 0 else world.clone()
+        yield idx, TimelineSimulator(w).finish()
+    for ev, child in node.children.values():
+        remaining -= 1
+        w = world if remaining == 0 else world.clone()
+        TimelineSimulator(w).step(ev)
+        yield from _walk(child, w)
+
+def run_tree(configs: Sequence[SimulationConfig]) -> Iterator[Tuple[int, SimulationConfig, World]]:
+    """Scenario-tree equivalent of running build_trilogy(cfg) for each config."""
+    configs = list(configs)
+    lists = (build_events_trilogy(c.architect_choice, c.smith_rate, c.zion_intensity, c.final_bonus)
+             for c in configs)
+    for idx, w in run_event_lists(lists):
+        yield idx, configs[idx], w
@@ -0,0 +1,243 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from heapq import heappop, heappush
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple, Union
+import random
+from .engine import World, marker
+from .events import (
+    Event,
+    ev_awaken_neo, ev_train_neo, ev_neo_ascends,
+    ev_smith_spreads, ev_smith_copies_oracle,
+    ev_zion_assault, ev_machines_negotiate, ev_final_fight, ev_peace,
+)
+from .agents import MachineCollectiveAgent
+from .instrument import Profiler
+from .movies import SimulationConfig
+from .registry import REGISTRY
+from .sinks import LogSink, open_sink
+
+# An action is an Event (run against the world) or a callable taking the
+# scheduler; a recurring callable returns False to cancel itself (an Event's
+# result only says whether its precondition held, so it never cancels).
+Action = Union[Event, Callable[["Scheduler"], Any]]
+
+class Scheduler:
+    """Discrete-event core: a heap of timestamped actions over one World.
+
+    Time jumps straight to the next pending action, so idle stretches cost
+    nothing: a run costs O(actions · log pending), independent of the horizon.
+    """
+
+    def __init__(self, world: World, start: float = 0.0):
+        self.world = world
+        self.now = start
+        self.processed = 0
+        self._heap: List[Tuple[float, int, Action]] = []
+        self._seq = 0
+        self._ready: Dict[str, float] = {}
+        self._triggers: List[Tuple[Callable[[World], bool], Action]] = []
+        self._stopped = False
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def at(self, time: float, action: Action) -> float:
+        if time < self.now:
+            raise ValueError(f"cannot schedule in the past ({time} < {self.now})")
+        self._seq += 1
+        heappush(self._heap, (time, self._seq, action))
+        return time
+
+    def schedule(self, delay: float, action: Action, duration: float = 0.0,
+                 key: Optional[str] = None, cooldown: float = 0.0) -> float:
+        """Start `action` `delay` from now; it takes effect when its `duration` has elapsed.
+
+        Actions sharing a `key` never overlap and are spaced `cooldown` apart:
+        a start that comes too early is deferred. Returns the effect time.
+        """
+        start = self.now + delay
+        if key is not None:
+            start = max(start, self._ready.get(key, start))
+            self._ready[key] = start + duration + cooldown
+        return self.at(start + duration, action)
+
+    def every(self, period: float, action: Action, start: Optional[float] = None,
+              until: Optional[float] = None) -> None:
+        """Run `action` at `start` (default: one period from now) and every `period` after."""
+        if period <= 0:
+            raise ValueError("period must be > 0")
+        def step(s: "Scheduler") -> None:
+            if isinstance(action, Event):
+                action.run(s.world)
+            elif action(s) is False:
+                return
+            nxt = s.now + period
+            if until is None or nxt <= until:
+                s.at(nxt, step)
+        self.at(self.now + period if start is None else start, step)
+
+    def when(self, pred: Callable[[World], bool], action: Action) -> None:
+        """Run `action` once, right after the first action that leaves `pred(world)` true."""
+        self._triggers.append((pred, action))
+
+    def stop(self) -> None:
+        self._stopped = True
+
+    def _call(self, action: Action) -> Any:
+        if isinstance(action, Event):
+            return action.run(self.world)
+        return action(self)
+
+    def run(self, until: Optional[float] = None, max_actions: Optional[int] = None,
+            on_advance: Optional[Callable[[float], None]] = None) -> int:
+        """Process actions in time order until the queue empties, stop() or a limit; returns the count.
+
+        `on_advance(t)` is called whenever the clock moves forward.
+        """
+        self._stopped = False
+        heap, n = self._heap, 0
+        while heap and not self._stopped:
+            if until is not None and heap[0][0] > until:
+                break
+            if max_actions is not None and n >= max_actions:
+                break
+            t, _, action = heappop(heap)
+            if t > self.now and on_advance is not None:
+                on_advance(t)
+            self.now = t
+            self._call(action)
+            n += 1
+            if self._triggers:
+                self._fire_triggers()
+        self.processed += n
+        return n
+
+    def _fire_triggers(self) -> None:
+        w = self.world
+        fired = [tr for tr in self._triggers if tr[0](w)]
+        if fired:
+            self._triggers = [tr for tr in self._triggers if tr not in fired]
+            for _, action in fired:
+                self._call(action)
+
+# ---- Processes: agents that schedule their own future actions ----
+
+class Process(Protocol):
+    def start(self, sched: Scheduler) -> None: ...
+
+@dataclass
+class SentinelWaves:
+    """Sentinel assault every `period` time units while Zion stands."""
+    period: float = 6.0
+    intensity: float = 0.1
+    rng: Optional[random.Random] = None  # set: draw each wave from MachineCollectiveAgent.INTENSITIES
+
+    def start(self, sched: Scheduler) -> None:
+        def wave(s: Scheduler):
+            w = s.world
+            if w.peace or not w.zion_alive or w.zion_defense <= 0:
+                return False
+            intensity = self.rng.choice(MachineCollectiveAgent.INTENSITIES) if self.rng is not None else self.intensity
+            REGISTRY.get(ev_zion_assault, intensity).run(w)
+        sched.every(self.period, wave)
+
+@dataclass
+class SmithReplication:
+    """Smith spreads, then replicates again after `delay`, until he copies the Oracle."""
+    rate: float = 0.25
+    delay: float = 3.0
+    threshold: float = 0.6
+
+    def start(self, sched: Scheduler) -> None:
+        spread = REGISTRY.get(ev_smith_spreads, self.rate)
+        oracle = REGISTRY.get(ev_smith_copies_oracle)
+        def replicate(s: Scheduler) -> None:
+            w = s.world
+            if w.peace or not w.neo_alive:
+                return
+            if w.smith_factor < self.threshold:
+                spread.run(w)
+                s.schedule(0.0, replicate, duration=self.delay, key="smith")
+            else:
+                oracle.run(w)
+        sched.schedule(0.0, replicate, duration=self.delay, key="smith")
+
+@dataclass
+class NeoArc:
+    """Neo awakens, trains and ascends with fixed durations, then confronts Smith.
+
+    The confrontation (negotiation, final fight, peace accord) is a trigger:
+    it fires as soon as Smith crosses `threshold`, without polling.
+    """
+    train_time: float = 2.0
+    ascend_time: float = 3.0
+    threshold: float = 0.6
+    final_bonus: int = SimulationConfig.final_bonus
+
+    def start(self, sched: Scheduler) -> None:
+        sched.schedule(0.0, REGISTRY.get(ev_awaken_neo))
+        sched.schedule(0.0, REGISTRY.get(ev_train_neo), duration=self.train_time, key="neo")
+        sched.schedule(0.0, REGISTRY.get(ev_neo_ascends), duration=self.ascend_time, key="neo")
+        fight = REGISTRY.get(ev_final_fight, self.final_bonus)
+        def confront(s: Scheduler) -> None:
+            w = s.world
+            REGISTRY.get(ev_machines_negotiate).run(w)
+            fight.run(w)
+            REGISTRY.get(ev_peace).run(w)
+        sched.when(lambda w: w.neo_alive and w.smith_factor >= self.threshold, confront)
+
+@dataclass
+class DiscreteEventSimulator:
+    """Runs Processes on a Scheduler until `until`, peace or the fall of Zion."""
+    world: World
+    until: float = 100.0
+    mark_time: bool = True
+    jsonl_path: Optional[str] = None
+    sink: Optional[LogSink] = None
+    profiler: Optional[Profiler] = None
+    actions_run: int = field(default=0, init=False)
+    end_time: float = field(default=0.0, init=False)
+
+    def run(self, processes: List[Process]) -> World:
+        sink = self.sink or open_sink(self.jsonl_path)
+        if sink is not None:
+            self.world.subscribe(sink.write)
+        if self.profiler is not None:
+            self.profiler.attach(self.world)
+        try:
+            return self._run(processes)
+        finally:
+            if self.profiler is not None:
+                self.profiler.detach(self.world)
+            if sink is not None:
+                self.world.unsubscribe(sink.write)
+                if self.sink is None:
+                    sink.close()
+                else:
+                    sink.flush()
+
+    def _run(self, processes: List[Process]) -> World:
+        w = self.world
+        clock = self._m("Clock")
+        w.log_event(self._m("Prelude"), "Start", "Event mode: processes schedule their own actions.", [], [])
+        sched = Scheduler(w)
+        for p in processes:
+            p.start(sched)
+        sched.when(lambda w: w.peace or not w.zion_alive, lambda s: s.stop())
+        on_advance = None
+        if self.mark_time:
+            on_advance = lambda t: w.log_event(clock, f"t={t:g}", "Time advances.", [], [])
+        self.actions_run = sched.run(until=self.until, on_advance=on_advance)
+        self.end_time = sched.now
+        w.log_event(self._m("Epilogue"), "End", "Event simulation finished.", [], [])
+        return w
+
+    _m = staticmethod(marker)
+
+def default_processes(rng: Optional[random.Random] = None, sentinel_period: float = 6.0,
+                      smith_delay: float = 3.0, final_bonus: int = SimulationConfig.final_bonus,
+                      smith_rate: float = SimulationConfig.smith_rate,
+                      zion_intensity: float = SimulationConfig.zion_intensity) -> List[Process]:
+    """Neo, Smith and the Sentinels; `zion_intensity` is the wave strength when no `rng` is given."""
+    return [NeoArc(final_bonus=final_bonus), SmithReplication(smith_rate, delay=smith_delay),
+            SentinelWaves(sentinel_period, zion_intensity, rng=rng)]
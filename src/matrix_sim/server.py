@@ -0,0 +1,287 @@
+from __future__ import annotations
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import asyncio, contextlib, io, json, os
+
+FORMATS = ("timeline", "summary")
+
+class LRUCache:
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+def parse_request(req: Dict[str, Any], output_dir: Optional[str] = None) -> Tuple[Any, str]:
+    """Validate one request ({"argv": [...], "format": ...}) into (parsed args, format).
+
+    `argv` takes exactly the options of `matrix-sim` itself; argparse errors
+    come back as ValueError instead of exiting. Options that write files
+    (--jsonl, --spill, ...) are refused unless `output_dir` is set, and then
+    resolved inside it; a path escaping it is refused too.
+    """
+    from .cli import build_parser, path_options
+    argv = req.get("argv", [])
+    fmt = req.get("format", "timeline")
+    if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+        raise ValueError("argv must be a list of strings")
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}")
+    p = build_parser()
+    err = io.StringIO()
+    try:
+        with contextlib.redirect_stderr(err):
+            args = p.parse_args(argv)
+    except SystemExit:
+        raise ValueError(err.getvalue().strip().splitlines()[-1] if err.getvalue().strip() else "invalid argv")
+    for name in path_options(p):
+        value = getattr(args, name)
+        if value is not None:
+            setattr(args, name, _confine(name, value, output_dir))
+    return args, fmt
+
+def _confine(name: str, path: str, output_dir: Optional[str]) -> str:
+    flag = "--" + name.replace("_", "-")
+    if output_dir is None:
+        raise ValueError(f"{flag} is not allowed (start 'matrix-sim serve' with --output-dir)")
+    root = os.path.realpath(output_dir)
+    full = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, full]) != root:
+        raise ValueError(f"{flag}: {path!r} is outside the output directory")
+    return full
+
+@lru_cache(maxsize=None)
+def _side_effects() -> Tuple[str, ...]:
+    # options whose effect goes beyond the returned JSON; such requests are never cached.
+    # Every file-writing option counts, so a new output flag cannot be served from the cache
+    from .cli import build_parser, path_options
+    return tuple(path_options(build_parser())) + ("profile",)
+
+def cache_key(args, fmt: str) -> Optional[Hashable]:
+    """Key for results that depend on the options alone, else None."""
+    if any(getattr(args, name) for name in _side_effects()):
+        return None
+    if args.mode != "timeline" and args.stochastic and args.seed is None:
+        return None
+    return (fmt,) + tuple(sorted(vars(args).items()))
+
+def execute(args, fmt: str) -> Dict[str, Any]:
+    from .cli import run_args, summarize
+    out = io.StringIO() if fmt == "timeline" else None
+    err = io.StringIO()
+    args.cache = False   # the service has its own LRU; requests never touch the on-disk cache
+    world = run_args(args, out, err)
+    res: Dict[str, Any] = {"summary": summarize(world)}
+    if out is not None:
+        res["output"] = out.getvalue()
+    if err.getvalue():
+        res["stderr"] = err.getvalue()
+    return res
+
+def execute_batch(batch: List[Tuple[Any, str]]) -> List[Dict[str, Any]]:
+    """Worker entry point: one pool task runs a whole batch of requests."""
+    results = []
+    for args, fmt in batch:
+        try:
+            results.append({"ok": True, **execute(args, fmt)})
+        except Exception as exc:  # one bad request must not fail its batch
+            results.append({"ok": False, "error": f"{type(exc).__name__}: {exc}"})
+    return results
+
+class SimulationService:
+    """Batches concurrent requests onto a process pool, with an LRU result cache.
+
+    Requests arriving within `batch_window` seconds (up to `max_batch`) are
+    sent to one worker as a single task, so per-task pickling and IPC is paid
+    per batch. `workers <= 1` runs batches in-process, as parallel.imap_chunks does.
+    """
+
+    def __init__(self, workers: Optional[int] = None, batch_window: float = 0.002,
+                 max_batch: int = 64, cache_size: int = 1024, output_dir: Optional[str] = None):
+        from .parallel import default_workers
+        self.workers = default_workers() if workers is None else workers
+        self.output_dir = output_dir
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.cache = LRUCache(cache_size)
+        self.batches = 0
+        self._pool: Optional[Executor] = ProcessPoolExecutor(self.workers) if self.workers > 1 else None
+        self._queue: List[Tuple[Any, str, asyncio.Future]] = []
+        self._flush: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+    async def submit(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            args, fmt = parse_request(req, self.output_dir)
+        except ValueError as exc:
+            return self._reply(req, {"ok": False, "error": str(exc)})
+        key = cache_key(args, fmt)
+        if key is not None:
+            hit = self.cache.get(key)
+            if hit is not None:
+                return self._reply(req, {**hit, "cached": True})
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._queue.append((args, fmt, fut))
+        if len(self._queue) >= self.max_batch:
+            self._dispatch()
+        elif self._flush is None:
+            self._flush = loop.call_later(self.batch_window, self._dispatch)
+        res = await fut
+        if key is not None and res["ok"]:
+            self.cache.put(key, res)
+        return self._reply(req, {**res, "cached": False})
+
+    @staticmethod
+    def _reply(req: Dict[str, Any], res: Dict[str, Any]) -> Dict[str, Any]:
+        return {"id": req["id"], **res} if "id" in req else res
+
+    def _dispatch(self) -> None:
+        if self._flush is not None:
+            self._flush.cancel()
+            self._flush = None
+        batch, self._queue = self._queue, []
+        if batch:
+            self.batches += 1
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Any, str, asyncio.Future]]) -> None:
+        work = [(args, fmt) for args, fmt, _ in batch]
+        try:
+            if self._pool is None:
+                results = execute_batch(work)
+            else:
+                results = await asyncio.get_running_loop().run_in_executor(self._pool, execute_batch, work)
+        except Exception as exc:
+            results = [{"ok": False, "error": f"{type(exc).__name__}: {exc}"}] * len(batch)
+        for (_, _, fut), res in zip(batch, results):
+            if not fut.done():
+                fut.set_result(res)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "batches": self.batches, "cache_size": len(self.cache),
+                "cache_hits": self.cache.hits, "cache_misses": self.cache.misses}
+
+# ---- Transports ----
+
+async def _handle_lines(service: SimulationService, reader: asyncio.StreamReader,
+                        writer: asyncio.StreamWriter) -> None:
+    # one JSON request per line, answered in order; requests on a connection run concurrently
+    pending: List[asyncio.Future] = []
+    async def answer(task: "asyncio.Task", prev: Optional[asyncio.Task]) -> None:
+        res = await task
+        if prev is not None:
+            await prev
+        writer.write((json.dumps(res, ensure_ascii=False) + "\n").encode("utf-8"))
+        await writer.drain()
+    last: Optional[asyncio.Task] = None
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                req = json.loads(line)
+                if not isinstance(req, dict):
+                    raise ValueError("request must be a JSON object")
+            except ValueError as exc:
+                task = asyncio.ensure_future(_const({"ok": False, "error": f"bad request: {exc}"}))
+            else:
+                task = asyncio.ensure_future(_route(service, req))
+            last = asyncio.ensure_future(answer(task, last))
+            pending.append(last)
+        if pending:
+            await asyncio.gather(*pending)
+    finally:
+        writer.close()
+
+async def _const(value: Dict[str, Any]) -> Dict[str, Any]:
+    return value
+
+async def _route(service: SimulationService, req: Dict[str, Any]) -> Dict[str, Any]:
+    if req.get("op") == "stats":
+        return {"ok": True, "stats": service.stats()}
+    return await service.submit(req)
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            415: "Unsupported Media Type"}
+
+async def _handle_http(service: SimulationService, reader: asyncio.StreamReader,
+                       writer: asyncio.StreamWriter) -> None:
+    # minimal HTTP/1.1: POST /run with a JSON body, GET /stats; one request per connection
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        method, path, _ = lines[0].split(" ", 2)
+        headers = {k.strip().lower(): v.strip() for k, _, v in (l.partition(":") for l in lines[1:] if l)}
+        body = await reader.readexactly(int(headers.get("content-length", "0") or 0))
+        if path == "/stats" and method == "GET":
+            status, res = 200, {"ok": True, "stats": service.stats()}
+        elif path != "/run":
+            status, res = 404, {"ok": False, "error": "not found"}
+        elif method != "POST":
+            status, res = 405, {"ok": False, "error": "use POST"}
+        elif headers.get("content-type", "").split(";")[0].strip().lower() != "application/json":
+            # browsers cannot send this cross-origin without a preflight, which is never answered
+            status, res = 415, {"ok": False, "error": "Content-Type must be application/json"}
+        else:
+            try:
+                req = json.loads(body or b"{}")
+                if not isinstance(req, dict):
+                    raise ValueError("request must be a JSON object")
+            except ValueError as exc:
+                status, res = 400, {"ok": False, "error": f"bad request: {exc}"}
+            else:
+                res = await service.submit(req)
+                status = 200 if res["ok"] else 400
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+        status, res = 400, {"ok": False, "error": "malformed HTTP request"}
+    data = json.dumps(res, ensure_ascii=False).encode("utf-8")
+    writer.write(f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode("latin-1") + data)
+    try:
+        await writer.drain()
+    finally:
+        writer.close()
+
+async def start_server(service: SimulationService, socket_path: Optional[str] = None,
+                       host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+    """JSON lines on a Unix socket if `socket_path` is given, else HTTP on host:port."""
+    if socket_path is not None:
+        return await asyncio.start_unix_server(lambda r, w: _handle_lines(service, r, w), path=socket_path)
+    return await asyncio.start_server(lambda r, w: _handle_http(service, r, w), host=host, port=port)
+
+async def serve_forever(service: SimulationService, **kw) -> None:
+    server = await start_server(service, **kw)
+    async with server:
+        await server.serve_forever()
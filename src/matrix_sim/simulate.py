@@ -1,48 +1,133 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Iterable, Dict, Any, List, Optional
-import json
-from .engine import World
+from typing import Iterable, Iterator, Dict, Any, List, Optional, TextIO
+from .engine import World, Movie, marker
 from .events import Event
+from .sinks import LogSink, open_sink
+from .instrument import Profiler
 
 @dataclass
 class TimelineSimulator:
     world: World
     jsonl_path: Optional[str] = None
-
-    def _emit(self, rec: Dict[str, Any]) -> None:
-        if not self.jsonl_path: return
-        with open(self.jsonl_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    sink: Optional[LogSink] = None
+    profiler: Optional[Profiler] = None
+    compiled: bool = False  # run the list as one generated function (see compiler.py)
 
     def run(self, events: Iterable[Event]) -> World:
+        # a sink passed in is only flushed (caller owns it); one built from jsonl_path is closed.
+        # Records reach the sink as a World listener, so bounded log retention doesn't hide them.
+        sink = self.sink or open_sink(self.jsonl_path)
+        if sink is not None:
+            self.world.subscribe(sink.write)
+        if self.profiler is not None:
+            self.profiler.attach(self.world)
+        try:
+            return self._run(events)
+        finally:
+            if self.profiler is not None:
+                self.profiler.detach(self.world)
+            if sink is not None:
+                self.world.unsubscribe(sink.write)
+                if self.sink is None:
+                    sink.close()
+                else:
+                    sink.flush()
+
+    def _run(self, events: Iterable[Event]) -> World:
+        self.begin()
+        if self.compiled:
+            from .compiler import compile_events
+            compile_events(events).run(self.world)
+        else:
+            for e in events:
+                self.step(e)
+        return self.finish()
+
+    # begin/step/finish are the pieces of run(); the scenario tree drives them directly
+    def begin(self) -> None:
         self.world.log_event(movie=self._m("Prelude"), event="Start",
                              desc="Matrix exists; Neo asleep; Machines rule.",
                              themes=["CONTROL_SYSTEMS"], myth=[])
-        self._emit(self.world.log[-1])
-        for e in events:
-            before = len(self.world.log)
-            e.run(self.world)
-            if len(self.world.log) > before:
-                self._emit(self.world.log[-1])
+
+    def step(self, e: Event) -> None:
+        e.run(self.world)
+
+    def finish(self) -> World:
         self.world.log_event(movie=self._m("Epilogue"), event="End",
                              desc="Simulation finished.", themes=["HUMAN_MACHINE_SYMBIOSIS"], myth=[])
-        self._emit(self.world.log[-1])
         return self.world
 
-    @staticmethod
-    def _m(name: str):
-        # lightweight pseudo-movie bucket for non-film entries
-        from types import SimpleNamespace
-        class MM:  # simple enum-ish shim with .value
-            def __init__(self, v): self.value = v
-        return MM(name)
+    _m = staticmethod(marker)
 
-def format_timeline(log: List[Dict[str, Any]]) -> str:
-    out, current = [], None
+OUTPUT_MODES = ("full", "events", "headers", "no-skips")
+_FILM_MOVIES = frozenset(m.value for m in Movie)
+
+class TimelineWriter:
+    """Renders records to a text stream one at a time (usable as a World listener).
+
+    Modes: `full` (every record, same text as format_timeline), `events` (film
+    events only, no Prelude/Tick/Epilogue markers), `no-skips` (drop [SKIP]
+    records) and `headers` (movie headers only, plus a summary on close()).
+    """
+
+    def __init__(self, stream: TextIO, mode: str = "full"):
+        if mode not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode {mode!r} (use one of {OUTPUT_MODES})")
+        self.stream = stream
+        self.mode = mode
+        self._current: Optional[str] = None
+        self._counts: Dict[str, List[int]] = {}  # movie -> [records, skips]
+        self._last: Optional[Dict[str, Any]] = None
+
+    def lines(self, rec: Dict[str, Any]) -> Iterator[str]:
+        mode = self.mode
+        skipped = rec["event"].startswith("[SKIP] ")
+        if mode == "events" and rec["movie"] not in _FILM_MOVIES:
+            return
+        if mode == "no-skips" and skipped:
+            return
+        if rec["movie"] != self._current:
+            self._current = rec["movie"]
+            yield f"\n=== {self._current} ==="
+        if mode == "headers":
+            c = self._counts.setdefault(rec["movie"], [0, 0])
+            c[0] += 1
+            c[1] += skipped
+            self._last = rec
+            return
+        yield f"- {rec['event']}: {rec['desc']} | themes={rec['themes']} myth={rec['myth']} | snapshot={rec['snapshot']}"
+
+    def write(self, rec: Dict[str, Any]) -> None:
+        for line in self.lines(rec):
+            self.stream.write(line + "\n")
+
+    __call__ = write
+
+    def summary(self) -> Iterator[str]:
+        if self.mode != "headers":
+            return
+        yield "\n=== Summary ==="
+        for movie, (n, skips) in self._counts.items():
+            yield f"- {movie}: {n} records, {skips} skipped"
+        if self._last is not None:
+            yield f"- final snapshot={self._last['snapshot']}"
+
+    def close(self) -> None:
+        for line in self.summary():
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+def iter_timeline(log: Iterable[Dict[str, Any]], mode: str = "full") -> Iterator[str]:
+    """Rendered lines of `log`, one record at a time (nothing is accumulated)."""
+    w = TimelineWriter(None, mode)  # type: ignore[arg-type]
     for rec in log:
-        if rec["movie"] != current:
-            current = rec["movie"]
-            out.append(f"\n=== {current} ===")
-        out.append(f"- {rec['event']}: {rec['desc']} | themes={rec['themes']} myth={rec['myth']} | snapshot={rec['snapshot']}")
-    return "\n".join(out)
+        yield from w.lines(rec)
+    yield from w.summary()
+
+def write_timeline(log: Iterable[Dict[str, Any]], stream: TextIO, mode: str = "full") -> None:
+    for line in iter_timeline(log, mode):
+        stream.write(line + "\n")
+
+def format_timeline(log: List[Dict[str, Any]]) -> str:
+    return "\n".join(iter_timeline(log))
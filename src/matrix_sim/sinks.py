@@ -0,0 +1,187 @@
+from __future__ import annotations
+from typing import Any, Dict, IO, List, Optional
+import importlib, json, queue, threading
+
+Record = Dict[str, Any]
+
+class LogSink:
+    """Destination for log records. Subclasses override write/flush/close."""
+
+    def write(self, rec: Record) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "LogSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+class NullSink(LogSink):
+    def write(self, rec: Record) -> None:
+        pass
+
+class ListSink(LogSink):
+    """Collects records in memory (handy for tests and in-process consumers)."""
+
+    def __init__(self):
+        self.records: List[Record] = []
+
+    def write(self, rec: Record) -> None:
+        self.records.append(rec)
+
+class TeeSink(LogSink):
+    """Fans every record out to several sinks (e.g. JSONL and binlog at once)."""
+
+    def __init__(self, sinks: List[LogSink]):
+        self.sinks = sinks
+
+    def write(self, rec: Record) -> None:
+        for s in self.sinks:
+            s.write(rec)
+
+    def flush(self) -> None:
+        for s in self.sinks:
+            s.flush()
+
+    def close(self) -> None:
+        for s in self.sinks:
+            s.close()
+
+# module per compression, imported on first use (plain runs never load zlib/_lzma)
+COMPRESSORS = {"gzip": "gzip", "lzma": "lzma"}
+
+def compression_for(path: str) -> Optional[str]:
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith((".xz", ".lzma")):
+        return "lzma"
+    return None
+
+def open_text(path: str, mode: str = "r", compression: Optional[str] = None) -> IO[str]:
+    """Open a (possibly compressed) text file; compression defaults to the suffix."""
+    compression = compression or compression_for(path)
+    if compression is None:
+        return open(path, mode, encoding="utf-8")
+    if compression not in COMPRESSORS:
+        raise ValueError(f"Unknown compression {compression!r} (use one of {sorted(COMPRESSORS)})")
+    return importlib.import_module(COMPRESSORS[compression]).open(path, mode + "t", encoding="utf-8")
+
+class JsonlSink(LogSink):
+    """Buffered JSONL writer: one open per run, flushed by size or record count.
+
+    The file is opened lazily on the first record, so a sink that never
+    receives anything leaves no file behind (matching the old open-per-record
+    behaviour).
+    """
+
+    def __init__(self, path: str, compression: Optional[str] = None, append: bool = True,
+                 max_records: int = 1024, max_bytes: int = 1 << 20):
+        self.path = path
+        self.compression = compression
+        self.append = append
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self._fh: Optional[IO[str]] = None
+        self._buf: List[str] = []
+        self._size = 0
+
+    def write(self, rec: Record) -> None:
+        line = json.dumps(rec, ensure_ascii=False) + "\n"
+        self._buf.append(line)
+        self._size += len(line)
+        if len(self._buf) >= self.max_records or self._size >= self.max_bytes:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buf:
+            return
+        if self._fh is None:
+            self._fh = open_text(self.path, "a" if self.append else "w", self.compression)
+        self._fh.write("".join(self._buf))
+        self._buf.clear()
+        self._size = 0
+        self._fh.flush()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+_STOP = object()
+
+class ThreadedSink(LogSink):
+    """Hands records to a background thread via a bounded queue.
+
+    Producers block when the queue is full, so a slow disk applies
+    back-pressure instead of growing memory. Errors raised by the inner sink
+    are re-raised on the next flush/close.
+    """
+
+    def __init__(self, inner: LogSink, maxsize: int = 10_000):
+        self.inner = inner
+        self._q: "queue.Queue[Any]" = queue.Queue(maxsize=maxsize)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._worker, name="matrix-sim-sink", daemon=True)
+        self._thread.start()
+
+    def _worker(self) -> None:
+        while True:
+            item = self._q.get()
+            try:
+                if item is _STOP:
+                    return
+                if isinstance(item, threading.Event):
+                    self.inner.flush()
+                    item.set()
+                elif self._error is None:
+                    self.inner.write(item)
+            except BaseException as e:  # surfaced to the producer thread
+                self._error = e
+                if isinstance(item, threading.Event):
+                    item.set()
+            finally:
+                self._q.task_done()
+
+    def _raise_pending(self) -> None:
+        if self._error is not None:
+            err, self._error = self._error, None
+            raise err
+
+    def write(self, rec: Record) -> None:
+        self._raise_pending()
+        self._q.put(rec)
+
+    def flush(self) -> None:
+        done = threading.Event()
+        self._q.put(done)
+        done.wait()
+        self._raise_pending()
+
+    def close(self) -> None:
+        if not self._thread.is_alive():
+            return
+        try:
+            self.flush()
+        finally:
+            self._q.put(_STOP)
+            self._thread.join()
+            self.inner.close()
+
+def open_sink(path: Optional[str], compression: Optional[str] = None, threaded: bool = False,
+              **kwargs: Any) -> Optional[LogSink]:
+    """Build the standard sink for `--jsonl PATH` (None if no path)."""
+    if not path:
+        return None
+    sink: LogSink = JsonlSink(path, compression=compression, **kwargs)
+    if threaded:
+        sink = ThreadedSink(sink)
+    return sink
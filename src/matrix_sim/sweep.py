@@ -0,0 +1,98 @@
+from __future__ import annotations
+from dataclasses import asdict
+from functools import partial
+from itertools import product
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+from .movies import SimulationConfig, build_trilogy
+from .simulate import TimelineSimulator
+from .scenario_tree import run_tree
+from .engine import World
+from .parallel import imap_chunks
+from .cache import ResultCache, compact_entry, final_state, run_key
+
+SKIP_PREFIX = "[SKIP] "
+
+def frange(start: float, stop: float, step: float) -> List[float]:
+    """Inclusive float range, rounded to kill accumulated step error."""
+    if step <= 0:
+        raise ValueError("step must be > 0")
+    n = int(round((stop - start) / step))
+    return [round(start + i * step, 10) for i in range(n + 1)]
+
+def expand_grid(architect_choice: Sequence[str] = ("TRINITY",),
+                smith_rate: Sequence[float] = (0.30,),
+                zion_intensity: Sequence[float] = (0.25,),
+                final_bonus: Sequence[int] = (8,)) -> Iterator[SimulationConfig]:
+    """Cartesian product of parameter values (architect choice varies slowest)."""
+    for a, s, z, b in product(architect_choice, smith_rate, zion_intensity, final_bonus):
+        yield SimulationConfig(a, s, z, b)
+
+def run_config(cfg: SimulationConfig, index: int = 0, cache: Optional[ResultCache] = None) -> Dict[str, Any]:
+    """Run one canon timeline and reduce it to a compact result row."""
+    return _run_chunk([(index, cfg)], cache)[0]
+
+def result_row(cfg: SimulationConfig, index: int, world: World) -> Dict[str, Any]:
+    final = world.log[-1]["snapshot"]
+    skipped = [rec["event"][len(SKIP_PREFIX):] for rec in world.log if rec["event"].startswith(SKIP_PREFIX)]
+    return _row(cfg, index, final, skipped)
+
+def _row(cfg: SimulationConfig, index: int, final: Dict[str, Any], skipped: List[str]) -> Dict[str, Any]:
+    return {
+        "index": index,
+        "config": asdict(cfg),
+        "final": final,
+        "peace": final["peace"],
+        "zion_alive": final["zion_alive"],
+        "skipped": skipped,
+    }
+
+def _run_chunk(chunk: List[tuple], cache: Optional[ResultCache] = None) -> List[Dict[str, Any]]:
+    # neighbouring grid points share their leading events; run each prefix once
+    rows: List[Dict[str, Any]] = []
+    todo = []
+    for i, cfg in chunk:
+        key = None
+        if cache is not None:
+            key = run_key(*build_trilogy(cfg), cfg)
+            hit = cache.get(key)
+            if hit is not None:
+                rows.append(_row(cfg, i, hit["final"], hit["skipped"]))
+                continue
+        todo.append((i, cfg, key))
+    for j, cfg, world in run_tree([cfg for _, cfg, _ in todo]):
+        i, _, key = todo[j]
+        row = result_row(cfg, i, world)
+        if key is not None:
+            cache.put(key, compact_entry(row["final"], len(world.log), row["skipped"], final_state(world)))
+        rows.append(row)
+    return rows
+
+def sweep(configs: Iterable[SimulationConfig], workers: Optional[int] = None,
+          chunksize: int = 64, ordered: bool = False,
+          cache: Optional[ResultCache] = None) -> Iterator[Dict[str, Any]]:
+    """Run many configs over a process pool, yielding one result row per config.
+
+    Rows stream back in completion order (each carries its input `index`); pass
+    `ordered=True` to re-sequence them, at the cost of buffering out-of-order rows.
+    With a `cache`, configs already stored are not run again and new rows are stored.
+    """
+    fn = _run_chunk if cache is None else partial(_run_chunk, cache=cache)
+    rows = imap_chunks(fn, enumerate(configs), workers=workers, chunksize=chunksize)
+    if not ordered:
+        yield from rows
+        return
+    held: Dict[int, Dict[str, Any]] = {}
+    nxt = 0
+    for row in rows:
+        held[row["index"]] = row
+        while nxt in held:
+            yield held.pop(nxt)
+            nxt += 1
+
+def parse_values(spec: str, cast=float) -> List[Union[float, int, str]]:
+    """`a:b:step` (inclusive range) or `v1,v2,...`."""
+    if ":" in spec:
+        start, stop, step = (float(x) for x in spec.split(":"))
+        values = frange(start, stop, step)
+        return [cast(v) for v in values]
+    return [cast(v.strip()) for v in spec.split(",") if v.strip()]
@@ -0,0 +1,92 @@
+from __future__ import annotations
+from array import array
+from heapq import merge
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+from .engine import Theme, ThemeFlag, theme_mask
+
+ThemeLike = Union[Theme, ThemeFlag, str]
+_BITS = {int(f): f.name for f in ThemeFlag}
+
+def _flag(theme: ThemeLike) -> ThemeFlag:
+    if isinstance(theme, ThemeFlag):
+        return theme
+    if isinstance(theme, Theme):
+        return theme.flag
+    return ThemeFlag[theme.strip().upper()]
+
+class ThemeIndex:
+    """Theme/movie index over a log, maintained by `World.log_event`.
+
+    Keeps per-theme counters, per-theme position lists, per-movie buckets and
+    one theme bitmask per record, so coverage is O(#themes) and queries cost
+    O(size of the smallest matching list) instead of a full log scan.
+    Positions are record numbers: indices into a full `World.log`; with a
+    bounded retention they keep counting past evicted or dropped records.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.start = 0  # log position of the first indexed record
+        self.masks = array("I")
+        # keyed by the int value of each ThemeFlag bit
+        self.counts: Dict[int, int] = dict.fromkeys(_BITS, 0)
+        self.positions: Dict[int, array] = {b: array("q") for b in _BITS}
+        self.movies: Dict[str, array] = {}
+
+    def add(self, pos: int, movie: str, mask: int) -> None:
+        if not self.total:
+            self.start = pos
+        self.total += 1
+        self.masks.append(mask)
+        bucket = self.movies.get(movie)
+        if bucket is None:
+            bucket = self.movies[movie] = array("q")
+        bucket.append(pos)
+        counts, positions = self.counts, self.positions
+        while mask:
+            low = mask & -mask
+            counts[low] += 1
+            positions[low].append(pos)
+            mask ^= low
+
+    @classmethod
+    def from_log(cls, log: Iterable[dict]) -> "ThemeIndex":
+        idx = cls()
+        for pos, rec in enumerate(log):
+            idx.add(pos, rec["movie"], theme_mask(rec.get("themes", ())))
+        return idx
+
+    # -- queries --------------------------------------------------------------
+
+    def count(self, theme: ThemeLike) -> int:
+        return self.counts[int(_flag(theme))]
+
+    def coverage(self) -> Dict[str, int]:
+        """Theme name -> number of records tagged with it (unseen themes omitted)."""
+        return {_BITS[b]: c for b, c in self.counts.items() if c}
+
+    def by_movie(self, movie: str) -> Sequence[int]:
+        return self.movies.get(movie, array("q"))
+
+    def query(self, all_of: Sequence[ThemeLike] = (), any_of: Sequence[ThemeLike] = ()) -> List[int]:
+        """Sorted log positions whose themes include every `all_of` and at least one `any_of`."""
+        need = theme_mask(_flag(t) for t in all_of)
+        anym = theme_mask(_flag(t) for t in any_of)
+        if not need and not anym:
+            return []
+        masks, start = self.masks, self.start
+        if need:
+            # walk the rarest required theme, check the rest via the record bitmask
+            rarest = min((b for b in _BITS if b & need), key=self.counts.__getitem__)
+            return [p for p in self.positions[rarest]
+                    if masks[p - start] & need == need and (not anym or masks[p - start] & anym)]
+        lists = [self.positions[b] for b in _BITS if b & anym]
+        if len(lists) == 1:
+            return list(lists[0])
+        out: List[int] = []
+        last: Optional[int] = None
+        for p in merge(*lists):
+            if p != last:
+                out.append(p)
+                last = p
+        return out
@@ -0,0 +1,324 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import math, random
+from .agents import AgentSimulator, default_agents
+from .engine import World
+from .movies import SimulationConfig, build_trilogy, init_world
+from .parallel import imap_chunks
+from .simulate import TimelineSimulator
+
+# field -> (histogram low, high, bins); values outside land in under/over
+DEFAULT_FIELDS: Dict[str, Tuple[float, float, int]] = {
+    "matrix_control": (0.0, 1.0, 20),
+    "zion_defense": (0.0, 1.0, 20),
+    "smith_factor": (0.0, 1.0, 20),
+    "humans_free": (0.0, 10_000.0, 20),
+}
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+@dataclass
+class Welford:
+    """Running count, mean, variance (Welford) and min/max; merge() is Chan's pairwise update."""
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+
+    def merge(self, o: "Welford") -> "Welford":
+        if o.n:
+            n = self.n + o.n
+            d = o.mean - self.mean
+            self.mean += d * o.n / n
+            self.m2 += o.m2 + d * d * self.n * o.n / n
+            self.n = n
+            self.min = min(self.min, o.min)
+            self.max = max(self.max, o.max)
+        return self
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        if not self.n:
+            return {"n": 0}
+        return {"n": self.n, "mean": self.mean, "std": math.sqrt(self.variance), "min": self.min, "max": self.max}
+
+@dataclass
+class Histogram:
+    lo: float
+    hi: float
+    bins: int
+    counts: List[int] = field(default_factory=list)
+    under: int = 0
+    over: int = 0
+
+    def __post_init__(self):
+        if not self.counts:
+            self.counts = [0] * self.bins
+
+    def add(self, x: float) -> None:
+        if x < self.lo:
+            self.under += 1
+        elif x > self.hi:
+            self.over += 1
+        else:  # hi itself falls in the last bin
+            self.counts[min(int((x - self.lo) / (self.hi - self.lo) * self.bins), self.bins - 1)] += 1
+
+    def merge(self, o: "Histogram") -> "Histogram":
+        if (o.lo, o.hi, o.bins) != (self.lo, self.hi, self.bins):
+            raise ValueError("cannot merge histograms with different bins")
+        self.counts = [a + b for a, b in zip(self.counts, o.counts)]
+        self.under += o.under
+        self.over += o.over
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"lo": self.lo, "hi": self.hi, "counts": self.counts, "under": self.under, "over": self.over}
+
+class QuantileSketch:
+    """DDSketch-style quantiles: log-spaced buckets with relative error `alpha`.
+
+    Memory is O(log(max/min) / alpha) buckets whatever the count, and two
+    sketches with the same `alpha` merge by adding bucket counts.
+    """
+
+    __slots__ = ("alpha", "_gamma", "_gamma_log", "pos", "neg", "zeros", "n")
+
+    def __init__(self, alpha: float = 0.01):
+        self._set_alpha(alpha)
+        self.pos: Dict[int, int] = {}
+        self.neg: Dict[int, int] = {}
+        self.zeros = 0
+        self.n = 0
+
+    def __getstate__(self):
+        return (self.alpha, self.pos, self.neg, self.zeros, self.n)
+
+    def __setstate__(self, state):
+        alpha, self.pos, self.neg, self.zeros, self.n = state
+        self._set_alpha(alpha)
+
+    def _set_alpha(self, alpha: float) -> None:
+        self.alpha = alpha
+        self._gamma = (1 + alpha) / (1 - alpha)
+        self._gamma_log = math.log(self._gamma)
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        if x == 0:
+            self.zeros += 1
+            return
+        store = self.pos if x > 0 else self.neg
+        i = math.ceil(math.log(abs(x)) / self._gamma_log)
+        store[i] = store.get(i, 0) + 1
+
+    def merge(self, o: "QuantileSketch") -> "QuantileSketch":
+        if o.alpha != self.alpha:
+            raise ValueError("cannot merge sketches with different alpha")
+        for mine, theirs in ((self.pos, o.pos), (self.neg, o.neg)):
+            for i, c in theirs.items():
+                mine[i] = mine.get(i, 0) + c
+        self.zeros += o.zeros
+        self.n += o.n
+        return self
+
+    def _value(self, i: int) -> float:
+        # midpoint (in relative terms) of bucket (gamma^(i-1), gamma^i]
+        g = self._gamma
+        return 2 * g ** i / (g + 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.n:
+            return None
+        rank = q * (self.n - 1)
+        seen = 0
+        for i in sorted(self.neg, reverse=True):  # most negative first
+            seen += self.neg[i]
+            if seen > rank:
+                return -self._value(i)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for i in sorted(self.pos):
+            seen += self.pos[i]
+            if seen > rank:
+                return self._value(i)
+        # rank not reached (q > 1 or rounding): the largest value present
+        if self.pos:
+            return self._value(max(self.pos))
+        return 0.0 if self.zeros else -self._value(min(self.neg))
+
+class FieldStats:
+    __slots__ = ("moments", "hist", "sketch")
+
+    def __init__(self, lo: float, hi: float, bins: int, alpha: float):
+        self.moments = Welford()
+        self.hist = Histogram(lo, hi, bins)
+        self.sketch = QuantileSketch(alpha)
+
+    def add(self, x: float) -> None:
+        self.moments.add(x)
+        self.hist.add(x)
+        self.sketch.add(x)
+
+    def merge(self, o: "FieldStats") -> "FieldStats":
+        self.moments.merge(o.moments)
+        self.hist.merge(o.hist)
+        self.sketch.merge(o.sketch)
+        return self
+
+    def to_dict(self, quantiles: Sequence[float] = QUANTILES) -> Dict[str, Any]:
+        return {**self.moments.to_dict(), "hist": self.hist.to_dict(),
+                "quantiles": {f"p{round(q * 100):02d}": self.sketch.quantile(q) for q in quantiles}}
+
+class TrajectoryAggregator:
+    """Per-position statistics of snapshot fields across many runs, in constant memory per position.
+
+    Positions are record indices (`by="record"`, natural for timelines) or
+    ticks (`by="tick"`: the state at the end of each tick, taken from the
+    last record before the next `tick_movie` marker). Memory grows with the
+    horizon, never with the number of runs; aggregates from worker processes
+    combine with merge().
+    """
+
+    def __init__(self, fields: Optional[Dict[str, Tuple[float, float, int]]] = None, by: str = "record",
+                 alpha: float = 0.01, tick_movie: str = "Tick"):
+        if by not in ("record", "tick"):
+            raise ValueError("by must be 'record' or 'tick'")
+        self.fields = dict(DEFAULT_FIELDS if fields is None else fields)
+        self.by = by
+        self.alpha = alpha
+        self.tick_movie = tick_movie
+        self.runs = 0
+        self.positions: List[Dict[str, FieldStats]] = []
+
+    def _at(self, pos: int) -> Dict[str, FieldStats]:
+        while len(self.positions) <= pos:
+            self.positions.append({f: FieldStats(lo, hi, bins, self.alpha) for f, (lo, hi, bins) in self.fields.items()})
+        return self.positions[pos]
+
+    def add_snapshot(self, pos: int, snap: Dict[str, Any]) -> None:
+        for f, stats in self._at(pos).items():
+            v = snap.get(f)
+            if v is not None:
+                stats.add(v)
+
+    def track(self, world: World) -> "RunTracker":
+        """Subscribe to `world`'s records for one run; use as a context manager (or call close())."""
+        return RunTracker(self, world)
+
+    def merge(self, other: "TrajectoryAggregator") -> "TrajectoryAggregator":
+        if (other.fields, other.by, other.alpha) != (self.fields, self.by, self.alpha):
+            raise ValueError("cannot merge aggregators with different fields, positions or alpha")
+        for pos, stats in enumerate(other.positions):
+            mine = self._at(pos)
+            for f, s in stats.items():
+                mine[f].merge(s)
+        self.runs += other.runs
+        return self
+
+    def to_dict(self, quantiles: Sequence[float] = QUANTILES) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "by": self.by,
+            "alpha": self.alpha,
+            "fields": {f: list(spec) for f, spec in self.fields.items()},
+            "positions": [{f: s.to_dict(quantiles) for f, s in stats.items()} for stats in self.positions],
+        }
+
+class RunTracker:
+    """World listener feeding one run into a TrajectoryAggregator."""
+
+    def __init__(self, agg: TrajectoryAggregator, world: World):
+        self.agg = agg
+        self.world = world
+        self.pos = 0
+        self._last: Optional[Dict[str, Any]] = None
+        self._open = False
+        world.subscribe(self)
+
+    def __call__(self, rec: Dict[str, Any]) -> None:
+        if self.agg.by == "record":
+            self.agg.add_snapshot(self.pos, rec["snapshot"])
+            self.pos += 1
+            return
+        if rec["movie"] == self.agg.tick_movie:
+            self._commit()
+            self._open = True
+        self._last = rec["snapshot"]
+
+    def _commit(self) -> None:
+        if self._open and self._last is not None:
+            self.agg.add_snapshot(self.pos, self._last)
+            self.pos += 1
+        self._open = False
+
+    def close(self) -> None:
+        if self.world is None:
+            return
+        self.world.unsubscribe(self)
+        self.world = None
+        self._commit()
+        self.agg.runs += 1
+
+    def __enter__(self) -> "RunTracker":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+# ---- Drivers: parallel runs folded into one aggregator ----
+
+def _agent_chunk(chunk: List[Tuple[int, int, bool, Dict[str, Any]]]) -> List[TrajectoryAggregator]:
+    agg = None
+    for seed, max_ticks, stochastic, opts in chunk:
+        agg = agg or TrajectoryAggregator(**opts)
+        rng = random.Random(seed)
+        w = init_world()
+        w.set_retention("none")  # the aggregate is all we keep
+        with agg.track(w):
+            AgentSimulator(w, rng, max_ticks=max_ticks).run(default_agents(rng, stochastic=stochastic))
+    return [agg] if agg is not None else []
+
+def _timeline_chunk(chunk: List[Tuple[SimulationConfig, bool, Dict[str, Any]]]) -> List[TrajectoryAggregator]:
+    agg = None
+    for cfg, compiled, opts in chunk:
+        agg = agg or TrajectoryAggregator(**opts)
+        w, events = build_trilogy(cfg)
+        w.set_retention("none")
+        with agg.track(w):
+            TimelineSimulator(w, compiled=compiled).run(events)
+    return [agg] if agg is not None else []
+
+def _fold(parts: Iterable[TrajectoryAggregator], opts: Dict[str, Any]) -> TrajectoryAggregator:
+    total = TrajectoryAggregator(**opts)
+    for part in parts:
+        total.merge(part)
+    return total
+
+def aggregate_agents(runs: int, base_seed: int = 0, max_ticks: int = 12, stochastic: bool = True,
+                     workers: Optional[int] = None, chunksize: int = 256, **opts) -> TrajectoryAggregator:
+    """Per-tick aggregate of `runs` seeded agent runs (same seeds as run_ensemble)."""
+    from .ensemble import derive_seed
+    opts.setdefault("by", "tick")
+    items = ((derive_seed(base_seed, i), max_ticks, stochastic, opts) for i in range(runs))
+    return _fold(imap_chunks(_agent_chunk, items, workers=workers, chunksize=chunksize), opts)
+
+def aggregate_timelines(configs: Iterable[SimulationConfig], workers: Optional[int] = None,
+                        chunksize: int = 64, compiled: bool = True, **opts) -> TrajectoryAggregator:
+    """Per-record aggregate of canon timelines over `configs` (e.g. an expand_grid)."""
+    items = ((cfg, compiled, opts) for cfg in configs)
+    return _fold(imap_chunks(_timeline_chunk, items, workers=workers, chunksize=chunksize), opts)
@@ -0,0 +1,6 @@
+import pytest
+
+@pytest.fixture(autouse=True)
+def _isolated_result_cache(tmp_path, monkeypatch):
+    # Läufe mit --cache lesen/schreiben den Ergebnis-Cache; nie den des Benutzers
+    monkeypatch.setenv("MATRIX_SIM_CACHE_DIR", str(tmp_path / "result-cache"))
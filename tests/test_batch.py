@@ -0,0 +1,31 @@
+import pytest
+from matrix_sim.events import build_events_trilogy
+from matrix_sim.movies import build_trilogy, SimulationConfig
+from matrix_sim.simulate import TimelineSimulator
+from matrix_sim.sweep import expand_grid
+
+np = pytest.importorskip("numpy")
+from matrix_sim.batch import BatchWorld, CANON, run_batch
+
+def test_canon_order_matches_event_builder():
+    names = [e.name for e in build_events_trilogy("TRINITY", 0.3, 0.25, 8)]
+    assert [n for n, _ in CANON] == names
+
+def test_batch_matches_scalar_engine_exactly():
+    # Grid deckt beide Architect-Pfade, Zion-Fall und beide Seiten der Final-Fight-Schwelle ab
+    grid = list(expand_grid(["TRINITY", "ZION"], [0.0, 0.15, 0.3, 0.45, 0.7],
+                            [0.1, 0.25, 0.4, 1.0], [0, 2, 6, 8, 20]))
+    bw = run_batch(grid)
+    for i, cfg in enumerate(grid):
+        world, events = build_trilogy(cfg)
+        log = TimelineSimulator(world).run(events).log
+        assert bw.snapshot(i) == log[-1]["snapshot"], cfg
+        skipped = [r["event"][len("[SKIP] "):] for r in log if r["event"].startswith("[SKIP] ")]
+        assert bw.skipped(i) == skipped
+
+def test_masked_preconditions():
+    bw = BatchWorld.from_params(3)
+    bw.trinity_alive[1] = False
+    bw.run()
+    assert bw.skipped(0) == []
+    assert bw.skipped(1) == ["Rescue Morpheus", "Save Trinity"]
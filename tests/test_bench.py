@@ -0,0 +1,20 @@
+from matrix_sim.bench import CASES, compare, run_benchmarks
+
+def test_smoke_run_covers_all_cases():
+    res = run_benchmarks(scale=0.001, repeat=1, full=True)
+    assert set(res["results"]) == {c.name for c in CASES}
+    for r in res["results"].values():
+        assert r["events"] > 0 and r["peak_kib"] >= 0
+
+def test_long_cases_need_full_or_a_name():
+    res = run_benchmarks(only=None, scale=0.001, repeat=1, memory=False)
+    assert set(res["results"]) == {c.name for c in CASES if not c.full}
+    assert set(run_benchmarks(["agent_1m"], scale=0.001, repeat=1, memory=False)["results"]) == {"agent_1m"}
+
+def test_compare_flags_regressions():
+    base = {"meta": {"scale": 1.0}, "results": {"x": {"events_per_sec": 1000.0, "peak_kib": 100}}}
+    ok = {"meta": {"scale": 1.0}, "results": {"x": {"events_per_sec": 900.0, "peak_kib": 110}}}
+    slow = {"meta": {"scale": 1.0}, "results": {"x": {"events_per_sec": 500.0, "peak_kib": 300}}}
+    assert compare(ok, base, threshold=0.25) == []
+    assert len(compare(slow, base, threshold=0.25)) == 2
+    assert compare({"meta": {"scale": 0.1}, "results": {}}, base)[0].startswith("scale mismatch")
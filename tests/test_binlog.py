@@ -0,0 +1,87 @@
+import os, random, tempfile
+import pytest
+from matrix_sim import binlog
+from matrix_sim.agents import AgentSimulator, NeoAgent, SmithAgent
+from matrix_sim.binlog import BinlogReader, BinlogSink
+from matrix_sim.movies import build_trilogy, init_world, SimulationConfig
+from matrix_sim.simulate import TimelineSimulator
+
+def agent_run(path, ticks=200):
+    rng = random.Random(0)
+    with BinlogSink(path, buffer=64) as sink:   # kleiner Puffer: mehrere Spill-Runden
+        w = AgentSimulator(init_world(), rng, max_ticks=ticks, sink=sink).run([NeoAgent("n", rng), SmithAgent("s", rng)])
+    return w.log
+
+def test_roundtrip_and_column_views():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "run.mxbl")
+        log = agent_run(path)
+        with BinlogReader(path) as r:
+            assert len(r) == len(log) and list(r) == log
+            assert r.record(len(r) - 1) == log[-1]
+            assert list(r.trajectory("smith_factor")) == [rec["snapshot"]["smith_factor"] for rec in log]
+            assert r.column("neo_awake").format == "B"
+
+def test_filters_compare_ids_only(monkeypatch):
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "run.mxbl")
+        log = agent_run(path)
+        want_ev = [i for i, rec in enumerate(log) if rec["event"] == "Smith spreads"]
+        want_th = [i for i, rec in enumerate(log) if "REALITY_ILLUSION" in rec["themes"]]
+        for np in (binlog.np, None):            # NumPy- und reiner array-Pfad
+            monkeypatch.setattr(binlog, "np", np)
+            with BinlogReader(path) as r:
+                assert r.where(event="Smith spreads") == want_ev
+                assert r.where(theme="REALITY_ILLUSION") == want_th
+                assert r.where(event="Smith spreads", theme="REALITY_ILLUSION") == []
+                assert r.where(event="no such event") == [] and r.where(theme="NOPE") == []
+
+def test_numpy_views_are_zero_copy():
+    np = pytest.importorskip("numpy")
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "run.mxbl")
+        log = agent_run(path)
+        r = BinlogReader(path)
+        zd = r.numpy("zion_defense")
+        assert not zd.flags.owndata and zd.tolist() == [rec["snapshot"]["zion_defense"] for rec in log]
+        del zd
+        r.close()
+
+def test_empty_sink_writes_nothing_and_timeline_matches():
+    with tempfile.TemporaryDirectory() as d:
+        BinlogSink(os.path.join(d, "empty.mxbl")).close()
+        assert os.listdir(d) == []
+        path = os.path.join(d, "canon.mxbl")
+        world, events = build_trilogy(SimulationConfig())
+        log = TimelineSimulator(world).run(events).log
+        with BinlogSink(path) as sink:
+            world, events = build_trilogy(SimulationConfig())
+            TimelineSimulator(world, sink=sink).run(events)
+        with BinlogReader(path) as r:
+            assert list(r) == log
+
+def _rec(**snap):
+    return {"movie": "M", "event": "e", "desc": "", "themes": [], "myth": [], "snapshot": snap}
+
+def test_int_columns_widen_to_float(tmp_path):
+    path = str(tmp_path / "mixed.mxbl")
+    values = [0, 1, 2, 2.5, 3]   # erst ganzzahlig, dann ein float – nach dem ersten Spill
+    with BinlogSink(path, buffer=2) as sink:
+        for v in values:
+            sink.write(_rec(x=v, ok=True))
+    with BinlogReader(path) as r:
+        assert list(r.trajectory("x")) == values and r.column("x").format == "d"
+    with pytest.raises(ValueError, match="snapshot fields changed"):
+        with BinlogSink(str(tmp_path / "keys.mxbl")) as sink:
+            sink.write(_rec(x=1, ok=True))
+            sink.write(_rec(y=1, ok=True))   # gleiche Anzahl, anderer Name
+
+def test_cli_rejects_unknown_fields(tmp_path, capsys):
+    from matrix_sim.cli import main
+    path = str(tmp_path / "run.mxbl")
+    agent_run(path, ticks=5)
+    with pytest.raises(SystemExit) as exc:
+        main(["binlog", path, "--field", "nope"])
+    assert exc.value.code == 2 and "unknown --field nope" in capsys.readouterr().err
+    with BinlogReader(path) as r, pytest.raises(KeyError, match="nope"):
+        r.trajectory("nope")
@@ -0,0 +1,82 @@
+import io, os
+from concurrent.futures import ProcessPoolExecutor
+from matrix_sim import events
+from matrix_sim.cache import ResultCache, cached_timeline, events_digest, final_state, run_key
+from matrix_sim.cli import build_parser, run_args
+from matrix_sim.movies import SimulationConfig, build_trilogy
+from matrix_sim.sweep import expand_grid, sweep
+
+def key(cfg):
+    return run_key(*build_trilogy(cfg), cfg)
+
+def test_key_tracks_config_and_event_definitions():
+    assert key(SimulationConfig()) == key(SimulationConfig(final_bonus=8.0))   # normalisiert
+    assert key(SimulationConfig()) != key(SimulationConfig(smith_rate=0.31))
+    _, evs = build_trilogy(SimulationConfig())
+    base = events_digest(evs)
+    changed = list(evs)
+    # gleicher Name, andere Wirkung: anderer Schlüssel
+    changed[3] = events.Event(evs[3].movie, evs[3].name, evs[3].desc, set(evs[3].themes), evs[3].myth,
+                              effect=lambda w: setattr(w, "peace", True))
+    assert events_digest(changed) != base and events_digest(list(evs)) == base
+
+def test_cli_reads_through_and_replays_identically(tmp_path):
+    argv = ["--print-report", "--query-theme", "FREE_WILL", "--cache-dir", str(tmp_path)]
+    outs = []
+    for extra in ([], ["--cache"], ["--cache"]):
+        out = io.StringIO()
+        jsonl = tmp_path / f"run{len(outs)}.jsonl"
+        w = run_args(build_parser().parse_args(argv + extra + ["--jsonl", str(jsonl)]), out)
+        outs.append((out.getvalue(), jsonl.read_text(), w.log, final_state(w)))   # exakt, nicht gerundet
+    assert outs[0] == outs[1] == outs[2]
+    assert not os.path.exists(os.environ["MATRIX_SIM_CACHE_DIR"])   # ohne --cache kein Zugriff
+    c = ResultCache(str(tmp_path))
+    entry = c.get(key(SimulationConfig()), with_log=True)
+    assert entry["log"] == outs[0][2] and entry["records"] == len(outs[0][2])
+
+def test_log_only_when_asked(tmp_path):
+    c = ResultCache(str(tmp_path))
+    plain = cached_timeline(*build_trilogy(SimulationConfig()), None)
+    for _ in range(2):                                       # Fehlschlag, dann Treffer
+        w = cached_timeline(*build_trilogy(SimulationConfig()), c, config=SimulationConfig(), with_log=False)
+        assert final_state(w) == final_state(plain)
+    assert (c.hits, c.misses) == (1, 1) and len(w.log) == 0
+    assert not [e for e in c._files() if e.name.endswith(".gz")]
+    w = cached_timeline(*build_trilogy(SimulationConfig()), c, config=SimulationConfig())   # Log gewünscht: neu laufen
+    assert c.misses == 2 and w.log == plain.log
+
+def test_sweep_reads_through(tmp_path):
+    grid = list(expand_grid(("TRINITY", "ZION"), (0.1, 0.5, 0.9), (0.2, 0.5)))
+    plain = list(sweep(grid, workers=1, ordered=True))
+    c = ResultCache(str(tmp_path))
+    assert list(sweep(grid, workers=1, ordered=True, cache=c)) == plain
+    assert (c.hits, c.misses) == (0, len(grid))
+    assert list(sweep(grid, workers=2, chunksize=3, ordered=True, cache=c)) == plain
+    c2 = ResultCache(str(tmp_path))
+    assert list(sweep(grid, workers=1, ordered=True, cache=c2)) == plain and c2.hits == len(grid)
+
+def test_lru_eviction(tmp_path):
+    c = ResultCache(str(tmp_path))
+    blob = {"final": {}, "pad": "x" * 900}
+    keys = [f"{i:02d}" + "0" * 62 for i in range(30)]
+    for i, k in enumerate(keys):
+        c.put(k, blob)
+        os.utime(c._path(k, ".json"), ns=(i * 10**9, i * 10**9))   # deterministische Reihenfolge
+    assert c.get(keys[0]) is not None                              # Treffer -> zuletzt benutzt
+    c.max_bytes = 10_000
+    c.put(keys[29], blob)                                          # über der Grenze: räumt auf
+    left = {e.name[:2] for e in c._files()}
+    assert {"00", "29"} <= left and "01" not in left
+    assert c._scan_size() <= 9_000 and c.get(keys[1]) is None
+
+def _put(args):
+    root, i = args
+    c = ResultCache(root)
+    c.put("ab" * 32, {"final": {"i": i}}, log=[{"n": n} for n in range(200)])
+    got = c.get("ab" * 32, with_log=True)
+    return got is not None and len(got["log"]) == 200
+
+def test_concurrent_writers_never_expose_partial_entries(tmp_path):
+    with ProcessPoolExecutor(4) as pool:
+        assert all(pool.map(_put, [(str(tmp_path), i) for i in range(16)]))
+    assert not [e for e in os.scandir(tmp_path / "ab") if e.name.endswith(".tmp")]
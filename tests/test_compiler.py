@@ -0,0 +1,96 @@
+import random
+from itertools import product
+from matrix_sim import compiler
+from matrix_sim.compiler import TEMPLATES, compile_events
+from matrix_sim.engine import Movie, Realm, Theme
+from matrix_sim.events import Event, ev_smith_spreads
+from matrix_sim.instrument import Profiler
+from matrix_sim.movies import SimulationConfig, build_trilogy, init_world
+from matrix_sim.registry import REGISTRY
+from matrix_sim.simulate import TimelineSimulator
+from matrix_sim.themeindex import ThemeIndex
+
+def chars(w):
+    return {n: (c.realm, c.power, c.alive) for n, c in w.chars.items()}
+
+def both(events, setup=lambda w: None, make=init_world):
+    out = []
+    for compiled in (False, True):
+        w = make()
+        setup(w)
+        TimelineSimulator(w, compiled=compiled).run(events)
+        out.append(w)
+    return out
+
+def test_canon_grid_matches_interpreter():
+    for a, s, z, b in product(("TRINITY", "ZION"), (0.0, 0.15, 0.3, 0.6, 1.0), (0.0, 0.25, 0.4, 1.0), (-40, -6, 8)):
+        events = build_trilogy(SimulationConfig(a, s, z, b))[1]
+        i, c = both(events)
+        assert c.log == i.log and chars(c) == chars(i) and c.snapshot() == i.snapshot()
+
+def test_templates_match_factories_on_random_states():
+    # jede Vorlage einzeln gegen ihre Factory, aus zufälligen Ausgangszuständen
+    rng = random.Random(7)
+    params = {"ev_architect_choice": [("TRINITY",), ("ZION",), ("zion",)], "ev_smith_spreads": [(0.3,), (0.9,)],
+              "ev_zion_assault": [(0.25,), (0.5,)], "ev_final_fight": [(-30,), (8,)]}
+    for factory in TEMPLATES:
+        for p in params.get(factory.__name__, [()]):
+            ev = REGISTRY.get(factory, *p)
+            for _ in range(25):
+                state = {"neo_awake": rng.random() < 0.5, "trinity_alive": rng.random() < 0.5,
+                         "smith_factor": rng.choice([0.0, rng.random()]), "matrix_control": rng.random(),
+                         "zion_defense": rng.random(), "power": rng.randint(0, 100)}
+                def setup(w, st=state):
+                    for k, v in st.items():
+                        if k == "power":
+                            w.get("Neo").power = v
+                        else:
+                            setattr(w, k, v)
+                i, c = both([ev], setup)
+                assert c.log == i.log and chars(c) == chars(i), (factory.__name__, p, state)
+
+def test_generic_path_for_bounded_logs_index_and_listeners():
+    events = build_trilogy(SimulationConfig())[1]
+    def setup(w):
+        w.set_retention("ring", keep=4, compact=True)
+        w.index = ThemeIndex()
+    i, c = both(events, setup)
+    assert list(c.log) == list(i.log) and c.index.coverage() == i.index.coverage()
+    seen = []
+    for compiled in (False, True):
+        w = init_world()
+        recs = []
+        w.subscribe(recs.append)
+        TimelineSimulator(w, compiled=compiled).run(events)
+        seen.append(recs)
+    assert seen[0] == seen[1] and len(seen[0]) == len(events) + 2
+
+def test_fallbacks_ad_hoc_events_entities_and_profiler():
+    odd = Event(Movie.MATRIX, "Glitch", "Deja vu.", {Theme.REALITY_ILLUSION}, [],
+                pre=lambda w: w.neo_awake, effect=lambda w: setattr(w.get("Neo"), "realm", Realm.LIMINAL))
+    events = build_trilogy(SimulationConfig())[1]
+    mixed = events[:2] + [odd] + events[2:]
+    ct = compile_events(mixed)
+    assert "e2.run(w)" in ct.source
+    i, c = both(mixed)
+    assert c.log == i.log and chars(c) == chars(i)
+    def ent():
+        w = init_world()
+        w.use_entities()
+        return w
+    i, c = both(events, make=ent)
+    assert c.log == i.log and c.entities.count() == i.entities.count()
+    w = init_world()
+    prof = Profiler()
+    TimelineSimulator(w, profiler=prof, compiled=True).run(events)
+    assert w.log == both(events)[0].log and prof.to_dict()
+
+def test_code_is_shared_across_numeric_params():
+    compiler.clear_cache()
+    a = compile_events(build_trilogy(SimulationConfig(smith_rate=0.1, final_bonus=3))[1])
+    b = compile_events(build_trilogy(SimulationConfig(smith_rate=0.7, zion_intensity=0.9))[1])
+    z = compile_events(build_trilogy(SimulationConfig("ZION"))[1])
+    assert a._fast is b._fast and a._args != b._args
+    assert z._fast is not a._fast and "w.prophecy_valid = True" in z.source
+    assert compile_events(b.events) is b and len(compiler._CACHE) == 2
+    assert REGISTRY.get(ev_smith_spreads, 0.7) in b.events
@@ -0,0 +1,50 @@
+import random
+from matrix_sim.agents import AgentSimulator, default_agents
+from matrix_sim.ensemble import EnsembleStats, derive_seed, run_ensemble, run_seed
+from matrix_sim.movies import init_world
+
+def test_deterministic_policy_is_default():
+    logs = []
+    for seed in (1, 2):
+        rng = random.Random(seed)
+        logs.append(AgentSimulator(init_world(), rng).run(default_agents(rng)).log)
+    assert logs[0] == logs[1]
+
+def test_seeds_are_reproducible_and_matter():
+    assert derive_seed(7, 3) == derive_seed(7, 3) != derive_seed(7, 4)
+    outcomes = {run_seed(derive_seed(0, i)) for i in range(200)}
+    assert run_seed(derive_seed(0, 5)) == run_seed(derive_seed(0, 5))
+    assert len(outcomes) > 1
+
+def test_parallel_ensemble_matches_serial():
+    serial = list(run_ensemble(300, base_seed=1, workers=1, chunksize=50))[-1]
+    parallel = list(run_ensemble(300, base_seed=1, workers=2, chunksize=50))[-1]
+    assert serial.to_dict() == parallel.to_dict()
+    assert serial.runs == 300 and sum(serial.ticks.values()) == 300
+    assert 0 < serial.peace < 300
+
+def test_yields_are_snapshots():
+    # frühere Zwischenstände dürfen sich nicht mehr ändern
+    runs = [s.runs for s in run_ensemble(300, workers=1, chunksize=100)]
+    assert [s.runs for s in list(run_ensemble(300, workers=1, chunksize=100))] == runs == [100, 200, 300]
+
+def test_early_stop_on_ci_target():
+    stats = list(run_ensemble(50_000, workers=1, chunksize=100, ci_halfwidth=0.05))[-1]
+    assert stats.runs < 50_000 and stats.halfwidth() <= 0.05
+
+def test_merge_adds_counts():
+    a, b = EnsembleStats(), EnsembleStats()
+    a.add(True, True, 3)
+    b.add(False, False, 2)
+    assert a.merge(b).to_dict()["ticks_hist"] == {"2": 1, "3": 1}
+
+def test_des_ensemble_uses_its_parameters():
+    # Standard: Smith ist schnell, Frieden in jedem Lauf; langsamer Smith -> Zion fällt
+    run = lambda **des: list(run_ensemble(200, workers=1, chunksize=50, des=des))[-1]
+    assert run().peace == 200
+    slow = run(smith_delay=50.0)
+    assert slow.zion_fell == 200 and slow.peace == 0
+    fast_waves = run(smith_delay=50.0, sentinel_period=2.0)
+    assert sum(t * c for t, c in fast_waves.ticks.items()) < sum(t * c for t, c in slow.ticks.items())
+    assert set(run(until=5.0).ticks) == {5}
+    assert run(smith_rate=0.1).peace < 100
@@ -0,0 +1,65 @@
+from matrix_sim.engine import Faction, Realm
+from matrix_sim.entities import EntityTable, Kind
+from matrix_sim.events import FREED_PER_AWAKENING, SENTINELS_PER_INTENSITY, SMITH_COPIES_PER_RATE
+from matrix_sim.movies import build_trilogy, init_world, SimulationConfig
+from matrix_sim.simulate import TimelineSimulator
+
+def test_views_behave_like_characters():
+    w = init_world()
+    before = {n: (c.faction, c.realm, c.alive, c.power) for n, c in w.chars.items()}
+    t = w.use_entities()
+    assert {n: (c.faction, c.realm, c.alive, c.power) for n, c in w.chars.items()} == before
+    neo = w.get("Neo")
+    neo.power, neo.realm = 75, Realm.REAL
+    assert t.power[t.names["Neo"]] == 75 and w.get("Neo").realm is Realm.REAL
+    assert neo.to_character().name == "Neo"
+
+def test_entity_mode_keeps_the_canon_and_bulk_spawns():
+    cfg = SimulationConfig()
+    plain = TimelineSimulator(build_trilogy(cfg)[0]).run(build_trilogy(cfg)[1]).log
+    w, events = build_trilogy(cfg)
+    t = w.use_entities()
+    log = TimelineSimulator(w).run(events).log
+    strip = lambda recs: [(r["event"], {k: v for k, v in r["snapshot"].items() if not k.startswith("humans")})
+                          for r in recs]
+    assert strip(log) == strip(plain)
+    assert t.count(Kind.FREED_HUMAN) == FREED_PER_AWAKENING
+    assert w.humans_free == plain[-1]["snapshot"]["humans_free"] + FREED_PER_AWAKENING
+    # canon: Neo wins the final fight, so every Smith copy is deleted
+    assert t.count(Kind.SMITH_COPY, alive=False) == int(cfg.smith_rate * SMITH_COPIES_PER_RATE)
+    assert t.count(Kind.SMITH_COPY) == 0
+
+def test_sentinel_squads_spawn_and_deplete():
+    # Smith gewinnt (kein Frieden): Angriff 0.25 auf Verteidigung 0.4, die Docks zerstören 40 % der Squad
+    w, events = build_trilogy(SimulationConfig("TRINITY", 0.30, 0.25, -50))
+    t = w.use_entities()
+    TimelineSimulator(w).run(events)
+    squad = int(0.25 * SENTINELS_PER_INTENSITY)
+    assert len(t.ranges[Kind.SENTINEL]) == 1
+    assert t.count(Kind.SENTINEL, alive=False) == int(squad * 0.4)
+    assert t.count(Kind.SENTINEL) == squad - int(squad * 0.4)
+    assert w.zion_alive and not w.peace
+    # Canon: Frieden ruft alle Squads zurück
+    w, events = build_trilogy(SimulationConfig())
+    t = w.use_entities()
+    TimelineSimulator(w).run(events)
+    assert w.peace and t.count(Kind.SENTINEL) == 0
+    assert t.count(Kind.SENTINEL, alive=False) == int(0.25 * SENTINELS_PER_INTENSITY)
+
+def test_clone_copies_columns():
+    w = init_world()
+    t = w.use_entities()
+    t.spawn(Kind.SENTINEL, Faction.MACHINE, Realm.REAL, 40, 500)
+    c = w.clone()
+    c.entities.kill_kind(Kind.SENTINEL)
+    c.get("Neo").power = 99
+    assert t.count(Kind.SENTINEL) == 500 and c.entities.count(Kind.SENTINEL) == 0
+    assert w.get("Neo").power == 20
+
+def test_spawn_merges_adjacent_ranges():
+    t = EntityTable()
+    a = t.spawn(Kind.SMITH_COPY, Faction.PROGRAM, Realm.MATRIX, 80, 3)
+    t.spawn(Kind.SMITH_COPY, Faction.PROGRAM, Realm.MATRIX, 80, 2)
+    assert t.ranges[Kind.SMITH_COPY] == [(0, 5)]
+    t.kill(a)
+    assert t.count(Kind.SMITH_COPY) == 2 and t.name_of(4) == "smith_copy#4"
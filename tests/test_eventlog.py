@@ -0,0 +1,74 @@
+import random
+from matrix_sim.agents import AgentSimulator, NeoAgent, SmithAgent
+from matrix_sim.eventlog import EventLog
+from matrix_sim.movies import build_trilogy, SimulationConfig
+from matrix_sim.simulate import TimelineSimulator, format_timeline
+
+def run_timeline(log=None):
+    world, events = build_trilogy(SimulationConfig())
+    if log is not None:
+        world.log = log
+    return TimelineSimulator(world).run(events).log
+
+def test_compact_log_reads_back_identical_records():
+    plain = run_timeline()
+    compact = run_timeline(EventLog(keyframe_every=4))
+    assert len(compact) == len(plain)
+    assert list(compact) == plain
+    assert [compact[i] for i in range(len(plain))] == plain
+    assert compact[-2] == plain[-2] and compact[1:3] == plain[1:3]
+    assert format_timeline(compact) == format_timeline(plain)
+
+def test_compact_log_on_long_agent_run():
+    # Nur Neo + Smith: kein Frieden, kein Zion-Fall -> läuft alle Ticks
+    def run(log=None):
+        rng = random.Random(1)
+        world, _ = build_trilogy(SimulationConfig())
+        if log is not None:
+            world.log = log
+        return AgentSimulator(world, rng, max_ticks=300).run([NeoAgent("n", rng), SmithAgent("s", rng)]).log
+    plain, compact = run(), run(EventLog())
+    assert list(compact) == plain
+    # die meisten Snapshots sind unverändert und kosten nur einen None-Eintrag
+    assert sum(1 for d in compact._snap if d is None) > len(plain) // 2
+
+def test_append_accepts_plain_records():
+    log = EventLog()
+    log.extend(run_timeline())
+    assert log[-1]["event"] == "End"
+
+def _agent_world(retention, keep=8, spill=None):
+    rng = random.Random(1)
+    world, _ = build_trilogy(SimulationConfig())
+    world.set_retention(retention, keep, spill)
+    return world, AgentSimulator(world, rng, max_ticks=300).run([NeoAgent("n", rng), SmithAgent("s", rng)])
+
+def test_ring_retention_keeps_tail_and_spills_the_rest():
+    _, full = _agent_world("full")
+    spilled = []
+    world, ring = _agent_world("ring", keep=8, spill=spilled.append)
+    assert len(ring.log) == 8 and ring.log.total == len(full.log)
+    assert list(ring.log) == full.log[-8:]
+    assert spilled + list(ring.log) == full.log
+    assert world.snapshot() == full.log[-1]["snapshot"]
+
+def test_bounded_retention_summary_matches_full_log():
+    from matrix_sim.themeindex import ThemeIndex
+    _, full = _agent_world("full")
+    coverage = ThemeIndex.from_log(full.log).coverage()
+    for mode in ("ring", "events", "none"):
+        _, w = _agent_world(mode)
+        assert w.log.summary.themes == coverage
+        assert w.log.summary.records == len(full.log)
+        assert w.log.summary.last == full.log[-1]   # auch wenn der Log ihn verworfen hat
+    _, ev = _agent_world("events")
+    assert all(r["movie"] not in ("Tick", "Prelude", "Epilogue") and not r["event"].startswith("[SKIP]") for r in ev.log)
+
+def test_sink_sees_every_record_under_any_retention():
+    from matrix_sim.sinks import ListSink
+    world, events = build_trilogy(SimulationConfig())
+    world.set_retention("none")
+    sink = ListSink()
+    TimelineSimulator(world, sink=sink).run(events)
+    assert len(world.log) == 0
+    assert sink.records == run_timeline()
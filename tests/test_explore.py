@@ -0,0 +1,56 @@
+import pytest
+from matrix_sim.explore import Explorer
+from matrix_sim.movies import SimulationConfig
+from matrix_sim.sweep import run_config
+
+def outcome(**kw):
+    f = run_config(SimulationConfig(**kw))["final"]
+    return (f["peace"], f["zion_alive"], f["neo_alive"])
+
+def test_final_bonus_boundary_matches_dense_grid():
+    ex = Explorer()
+    res = ex.explore({"final_bonus": (-60, 60)})
+    dense = {b: outcome(final_bonus=b) for b in range(-60, 61)}
+    flips = [b for b in range(-60, 60) if dense[b] != dense[b + 1]]
+    assert [bd["between"] for bd in res["boundaries"]] == [[b, b + 1] for b in flips]
+    for r in res["regions"]:                       # Regionen stimmen mit dem dichten Raster überein
+        assert {dense[b] for b in range(r["from"], r["to"] + 1)} == {tuple(r["outcome"].values())}
+    assert res["evaluations"] < len(dense) / 4
+
+def test_float_axis_resolution_and_memo():
+    ex = Explorer()
+    res = ex.explore({"zion_intensity": (0.0, 1.0)}, {"zion_intensity": 1e-3})
+    (bd,) = res["boundaries"]
+    a, b = bd["between"]
+    assert b - a <= 1e-3 and bd["below"]["zion_alive"] and not bd["above"]["zion_alive"]
+    assert outcome(zion_intensity=a)[1] and not outcome(zion_intensity=b)[1]
+    assert res["evaluations"] < 40 and res["grid_equivalent"] == 1001
+    assert ex.explore({"zion_intensity": (0.0, 1.0)}, {"zion_intensity": 1e-3})["evaluations"] == 0
+
+def test_two_axes_refine_only_near_boundaries():
+    ex = Explorer()
+    res = ex.explore({"smith_rate": (0.0, 1.0), "zion_intensity": (0.0, 1.0)},
+                     {"smith_rate": 0.02, "zion_intensity": 0.02})
+    assert res["evaluations"] < res["grid_equivalent"] / 2
+    for cell in res["cells"]:
+        if cell["outcome"] is not None:            # einheitliche Zellen: Mittelpunkt stichprobenartig prüfen
+            mid = {k: (a + b) / 2 for k, (a, b) in cell["bounds"].items()}
+            assert outcome(**mid) == tuple(cell["outcome"].values())
+        else:
+            assert all(b - a <= 0.02 + 1e-12 for a, b in cell["bounds"].values())
+
+def test_rejects_bad_axes():
+    with pytest.raises(ValueError):
+        Explorer().explore({"architect_choice": (0, 1)})
+    with pytest.raises(ValueError):
+        Explorer().explore({"final_bonus": (5, 5)})
+
+@pytest.mark.parametrize("argv", [["--axis", "smith_rate=a:1"], ["--axis", "smith_rate"],
+                                  ["--axis", "smith_rate=0:1", "--set", "final_bonus=1.5"],
+                                  ["--axis", "smith_rate=0:1", "--set", "bogus=1"]])
+def test_cli_reports_bad_specs(argv, capsys):
+    # Tippfehler ergeben eine argparse-Meldung, keinen Traceback
+    from matrix_sim.cli import main
+    with pytest.raises(SystemExit) as exc:
+        main(["explore", *argv])
+    assert exc.value.code == 2 and "matrix-sim explore: error:" in capsys.readouterr().err
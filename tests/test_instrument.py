@@ -0,0 +1,52 @@
+import random
+from matrix_sim.agents import AgentSimulator, default_agents
+from matrix_sim.instrument import Hooks, Profiler
+from matrix_sim.movies import build_trilogy, init_world, SimulationConfig
+from matrix_sim.simulate import TimelineSimulator
+
+def test_profiler_counts_runs_and_skips():
+    world, events = build_trilogy(SimulationConfig())
+    world.trinity_alive = False  # Rescue Morpheus + Save Trinity werden übersprungen
+    prof = Profiler()
+    plain_world, _ = build_trilogy(SimulationConfig())
+    plain_world.trinity_alive = False
+    log = TimelineSimulator(world, profiler=prof).run(events).log
+    assert log == TimelineSimulator(plain_world).run(events).log  # Hooks ändern nichts am Ergebnis
+    assert prof.events["Rescue Morpheus"].skips == 1 and prof.events["Rescue Morpheus"].runs == 0
+    assert prof.events["Peace accord"].runs == 1
+    assert all(st.total_s >= 0 for st in prof.events.values())
+    assert "Save Trinity" in prof.format_table()
+
+def test_custom_hooks_see_every_event():
+    w, events = build_trilogy(SimulationConfig())
+    w.hooks = Hooks()
+    seen = []
+    w.hooks.on_pre(lambda ev, world: seen.append(("pre", ev.name)))
+    w.hooks.on_post(lambda ev, world, ran, t: seen.append(("post", ev.name, ran)))
+    TimelineSimulator(w).run(events)
+    assert len(seen) == 2 * len(events)
+    assert seen[0] == ("pre", events[0].name) and seen[1] == ("post", events[0].name, True)
+
+def test_agent_choose_timings():
+    rng = random.Random(0)
+    prof = Profiler()
+    AgentSimulator(init_world(), rng, profiler=prof).run(default_agents(rng))
+    assert set(prof.agents) == {"NeoAgent", "SmithAgent", "MachineAgent"}
+    assert prof.agents["NeoAgent"].calls >= 1
+    assert set(prof.to_dict()) == {"events", "agents"}
+
+def test_profiler_detaches_after_run():
+    # nach dem Lauf wieder der schnelle Pfad ohne Hooks
+    world, events = build_trilogy(SimulationConfig())
+    prof = Profiler()
+    TimelineSimulator(world, profiler=prof).run(events)
+    assert world.hooks is None
+    runs = prof.events["Peace accord"].runs
+    TimelineSimulator(world).run(events)
+    assert prof.events["Peace accord"].runs == runs
+    rng = random.Random(0)
+    w = init_world()
+    w.hooks = Hooks()
+    w.hooks.on_pre(lambda ev, world: None)
+    AgentSimulator(w, rng, profiler=Profiler()).run(default_agents(rng))
+    assert w.hooks is not None and w.hooks.post_run == []   # fremde Hooks bleiben
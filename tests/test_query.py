@@ -0,0 +1,89 @@
+import json, os, random, tempfile
+import pytest
+from matrix_sim import query
+from matrix_sim.agents import AgentSimulator, default_agents
+from matrix_sim.movies import init_world
+from matrix_sim.query import Query, load_index, merge_coverage, parse_predicate, run_query
+
+def archive(d, seeds=(1, 2, 3)):
+    logs = {}
+    for s in seeds:
+        rng = random.Random(s)
+        suffix = ".jsonl.gz" if s == seeds[-1] else ".jsonl"   # auch komprimierte Läufe
+        path = os.path.join(d, "runs", f"r{s}{suffix}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        w = AgentSimulator(init_world(), rng, max_ticks=40, jsonl_path=path).run(default_agents(rng, stochastic=True))
+        logs[path] = w.log
+    return logs
+
+def brute(logs, pred):
+    return {(p, i) for p, log in logs.items() for i, rec in enumerate(log) if pred(rec)}
+
+def hits(results):
+    return {(r["file"], m["record"]) for r in results for m in r["matches"]}
+
+def test_parse_predicate():
+    assert parse_predicate("zion_alive=false") == query.Predicate("zion_alive", "=", False)
+    assert parse_predicate(" smith_factor >= 0.5 ").op == ">="
+    assert parse_predicate("humans_free!=1000").value == 1000
+    with pytest.raises(ValueError):
+        parse_predicate("smith_factor~0.5")
+    # Vergleich mit einem Text würde erst im Worker-Pool mit TypeError scheitern
+    with pytest.raises(ValueError, match="needs a number"):
+        parse_predicate("smith_factor>abc")
+    assert parse_predicate("smith_factor=abc").value == "abc"
+    assert not query.Predicate("smith_factor", "=", "abc").may_match(0.0, 1.0)
+    assert query.Predicate("smith_factor", "!=", "abc").may_match(0.0, 1.0)
+
+def test_queries_match_brute_force():
+    with tempfile.TemporaryDirectory() as d:
+        logs = archive(d)
+        root = os.path.join(d, "runs")
+        cases = [
+            (Query(event="Smith spreads"), lambda r: r["event"] == "Smith spreads"),
+            (Query(theme="SMITH_SHADOW,FREE_WILL"), lambda r: {"SMITH_SHADOW", "FREE_WILL"} & set(r["themes"])),
+            (Query(theme="CONTROL_SYSTEMS+FREE_WILL"), lambda r: {"CONTROL_SYSTEMS", "FREE_WILL"} <= set(r["themes"])),
+            (Query(where=(parse_predicate("zion_alive=false"),)), lambda r: not r["snapshot"]["zion_alive"]),
+            (Query(event="Smith spreads", where=(parse_predicate("smith_factor>0.5"),)),
+             lambda r: r["event"] == "Smith spreads" and r["snapshot"]["smith_factor"] > 0.5),
+        ]
+        for q, pred in cases:
+            for workers in (1, 2):
+                assert hits(run_query([root], q, workers=workers, chunksize=1)) == brute(logs, pred)
+
+def test_index_skips_files_and_lines():
+    with tempfile.TemporaryDirectory() as d:
+        logs = archive(d)
+        root = os.path.join(d, "runs")
+        # unmöglich laut min/max: keine Zeile wird gelesen
+        res = list(run_query([root], Query(where=(parse_predicate("smith_factor>5"),)), workers=1))
+        assert all(r["scanned"] == 0 and not r["matches"] for r in res)
+        res = list(run_query([root], Query(event="Smith spreads"), workers=1))
+        assert sum(r["scanned"] for r in res) == len(brute(logs, lambda r: r["event"] == "Smith spreads"))
+
+def test_index_reused_and_invalidated():
+    with tempfile.TemporaryDirectory() as d:
+        path = next(p for p in archive(d, seeds=(1, 2)) if p.endswith(".jsonl"))
+        load_index(path)
+        stamp = os.stat(path + query.INDEX_SUFFIX).st_mtime_ns
+        load_index(path)
+        assert os.stat(path + query.INDEX_SUFFIX).st_mtime_ns == stamp
+        with open(path, "a", encoding="utf-8") as fh:     # Lauf wurde verlängert
+            fh.write(json.dumps({"movie": "X", "event": "Extra", "desc": "", "themes": [], "myth": [],
+                                 "snapshot": {"zion_alive": False}}) + "\n")
+        idx = load_index(path)
+        assert idx["events"]["Extra"] == [idx["records"] - 1]
+        res = query.query_file(path, Query(event="Extra"))
+        assert [m["event"] for m in res["matches"]] == ["Extra"]
+
+def test_coverage_aggregates_across_runs():
+    with tempfile.TemporaryDirectory() as d:
+        logs = archive(d)
+        want = {}
+        for log in logs.values():
+            for rec in log:
+                for t in rec["themes"]:
+                    want[t] = want.get(t, 0) + 1
+        res = list(run_query([os.path.join(d, "runs")], Query(coverage=True), workers=2, chunksize=1))
+        assert merge_coverage(res) == dict(sorted(want.items(), key=lambda kv: (-kv[1], kv[0])))
+        assert all(r["scanned"] == 0 for r in res)        # ungefiltert: nur aus den Indizes
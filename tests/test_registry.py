@@ -0,0 +1,54 @@
+import random
+from matrix_sim.agents import AgentSimulator, NeoAgent, SmithAgent, MachineCollectiveAgent
+from matrix_sim.events import build_events_trilogy, ev_smith_spreads, ev_peace
+from matrix_sim.movies import init_world
+from matrix_sim.registry import REGISTRY, EventKey, EventRegistry
+
+def test_registry_returns_shared_instances():
+    a = build_events_trilogy("TRINITY", 0.3, 0.25, 8)
+    b = build_events_trilogy("ZION", 0.3, 0.25, 8)
+    assert a[0] is b[0]            # gleiches Event, einmal gebaut
+    assert a[6] is not b[6]        # Architect-Variante je Parameter
+    assert REGISTRY.get(ev_smith_spreads, 0.3) is a[8]
+    assert REGISTRY.key_of(a[8]) == EventKey("matrix_sim.events.ev_smith_spreads", (0.3,))
+    assert hash(REGISTRY.key_of(a[8]))
+
+def test_agent_ticks_allocate_no_new_events():
+    rng = random.Random(0)
+    AgentSimulator(init_world(), rng, max_ticks=5).run([NeoAgent("n", rng), SmithAgent("s", rng)])
+    size = len(REGISTRY)
+    rng = random.Random(0)
+    w = AgentSimulator(init_world(), rng, max_ticks=500).run([NeoAgent("n", rng), SmithAgent("s", rng)])
+    assert len(REGISTRY) == size
+    assert w.log[-2]["event"] == REGISTRY.get(ev_peace).name
+
+def test_agent_run_unchanged():
+    rng = random.Random(0)
+    agents = [NeoAgent("n", rng), SmithAgent("s", rng), MachineCollectiveAgent("m", rng)]
+    w = AgentSimulator(init_world(), rng).run(agents)
+    events = [r["event"] for r in w.log]
+    assert events[:3] == ["Start", "T1", "Neo awakens (Red Pill)"]
+    assert events[-1] == "End" and not w.zion_alive
+
+def test_registry_is_bounded():
+    # kontinuierliche Parameter (Explorer, Sweeps) dürfen die Registry nicht unbegrenzt füllen
+    reg = EventRegistry(maxsize=4)
+    first = reg.get(ev_smith_spreads, 0.0)
+    for i in range(1, 100):
+        reg.get(ev_smith_spreads, i / 100)
+    assert len(reg) == 4 and len(reg._keys) == 4
+    assert reg.key_of(first) is None
+    assert reg.get(ev_smith_spreads, 0.0) is not first
+    hot = reg.get(ev_peace)
+    for i in range(10):
+        reg.get(ev_smith_spreads, i / 10)
+        assert reg.get(ev_peace) is hot  # zuletzt benutzt: bleibt drin
+
+def test_equal_params_of_other_types_are_distinct():
+    # 8 == 8.0 und 1 == True, die Events unterscheiden sich aber (Beschreibung, Schlüssel)
+    reg = EventRegistry()
+    assert reg.get(ev_smith_spreads, 8) is not reg.get(ev_smith_spreads, 8.0)
+    assert reg.key_of(reg.get(ev_smith_spreads, 8.0)).params == (8.0,)
+    assert type(reg.key_of(reg.get(ev_smith_spreads, 1)).params[0]) is int
+    assert reg.get(ev_smith_spreads, True) is not reg.get(ev_smith_spreads, 1)
+    assert reg.get(ev_smith_spreads, 8) is reg.get(ev_smith_spreads, 8)
@@ -0,0 +1,44 @@
+import io
+from matrix_sim.cli import main
+from matrix_sim.eventlog import EventLog
+from matrix_sim.movies import build_trilogy, SimulationConfig
+from matrix_sim.simulate import TimelineSimulator, TimelineWriter, format_timeline, iter_timeline, write_timeline
+
+def run(trinity_alive=True, log=None):
+    world, events = build_trilogy(SimulationConfig())
+    world.trinity_alive = trinity_alive
+    if log is not None:
+        world.log = log
+    return world, events
+
+def test_streaming_matches_format_timeline():
+    world, events = run()
+    buf = io.StringIO()
+    world.subscribe(TimelineWriter(buf))
+    log = TimelineSimulator(world).run(events).log
+    assert buf.getvalue() == format_timeline(log) + "\n"
+    out = io.StringIO()
+    write_timeline(log, out)
+    assert out.getvalue() == buf.getvalue()
+
+def test_listener_works_with_compact_log():
+    world, events = run(log=EventLog())
+    recs = []
+    world.subscribe(recs.append)
+    TimelineSimulator(world).run(events)
+    assert recs == list(world.log)
+
+def test_output_modes():
+    world, events = run(trinity_alive=False)
+    log = TimelineSimulator(world).run(events).log
+    events_only = "\n".join(iter_timeline(log, "events"))
+    assert "Prelude" not in events_only and "[SKIP] Save Trinity" in events_only
+    no_skips = "\n".join(iter_timeline(log, "no-skips"))
+    assert "[SKIP]" not in no_skips and "- End:" in no_skips
+    headers = list(iter_timeline(log, "headers"))
+    assert not any(line.startswith("- Neo") for line in headers)
+    assert "\n=== Summary ===" in headers and "- Matrix (1999): 4 records, 1 skipped" in headers
+
+def test_cli_streams_timeline(capsys):
+    assert main(["--output", "no-skips"]) == 0
+    assert capsys.readouterr().out.startswith("\n=== Prelude ===\n- Start:")
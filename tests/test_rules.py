@@ -0,0 +1,47 @@
+import random
+from matrix_sim.agents import AgentSimulator, default_agents
+from matrix_sim.events import ev_final_fight, ev_rescue_morpheus
+from matrix_sim.movies import init_world
+from matrix_sim.rules import PolicyAgent, Rule, RuleEngine, infer_access, neo_rules, policy_agents, smith_rules
+
+def run(make, seed, stochastic):
+    rng = random.Random(seed)
+    return AgentSimulator(init_world(), rng, max_ticks=40).run(make(rng, stochastic)).log
+
+def test_policy_agents_match_imperative_agents():
+    for stochastic in (False, True):
+        for seed in range(50):
+            assert run(policy_agents, seed, stochastic) == run(default_agents, seed, stochastic)
+
+def test_unchanged_inputs_skip_reevaluation():
+    rng = random.Random(0)
+    neo = PolicyAgent("n", rng, rules=neo_rules())
+    smith = PolicyAgent("s", rng, rules=smith_rules())
+    AgentSimulator(init_world(), rng, max_ticks=500).run([neo, smith])
+    # nur die smith_factor-Regeln laufen jeden Tick neu, der Rest kommt aus dem Cache
+    assert neo.engine.evaluations < 3 * 500
+    assert neo.engine.skipped > neo.engine.evaluations
+
+def test_traced_reads_follow_the_branch_taken():
+    w = init_world()
+    engine = RuleEngine([Rule("ready", lambda w: w.neo_awake and w.get("Neo").power >= 60)])
+    assert list(engine.matching(w)) == []
+    assert engine._reads[0] == {"neo_awake"}        # Kurzschluss: power nie gelesen
+    w.neo_awake = True
+    assert list(engine.matching(w)) == []
+    assert engine._reads[0] == {"neo_awake", "Neo.power"}
+    w.get("Neo").power = 80                         # Charakter-Attribut, per Wert erkannt
+    assert [r.name for r in engine.matching(w)] == ["ready"]
+    n = engine.evaluations
+    w.humans_free += 1                              # nicht gelesen -> kein Neuauswerten
+    list(engine.matching(w))
+    assert engine.evaluations == n
+
+def test_infer_access_leaves_world_untouched():
+    w = init_world()
+    w.neo_awake = True
+    acc = infer_access(ev_rescue_morpheus(), w)
+    assert {"neo_awake", "trinity_alive"} <= acc.reads
+    assert acc.writes == {"Neo.power", "matrix_control"}
+    assert "smith_factor" in infer_access(ev_final_fight(8), w).writes
+    assert w.get("Neo").power == 20 and w.matrix_control == 1.0 and w.log == []
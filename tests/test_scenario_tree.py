@@ -0,0 +1,33 @@
+from matrix_sim.events import Event, ev_peace
+from matrix_sim.engine import Movie, Theme
+from matrix_sim.movies import build_trilogy, init_world, SimulationConfig
+from matrix_sim.scenario_tree import run_event_lists, run_tree
+from matrix_sim.simulate import TimelineSimulator
+from matrix_sim.sweep import expand_grid
+
+def test_leaf_logs_equal_independent_runs():
+    grid = list(expand_grid(["TRINITY", "ZION"], [0.15, 0.45], [0.25, 1.0], [0, 8]))
+    grid.append(grid[0])  # Duplikat: zwei Blätter am selben Knoten
+    seen = set()
+    for idx, cfg, world in run_tree(grid):
+        seen.add(idx)
+        w, events = build_trilogy(cfg)
+        assert world.log == TimelineSimulator(w).run(events).log
+    assert seen == set(range(len(grid)))
+
+def test_clone_is_independent():
+    w = init_world()
+    c = w.clone()
+    c.get("Neo").power = 99
+    c.smith_factor = 0.5
+    c.log.append({"event": "x"})
+    assert w.get("Neo").power == 20 and w.smith_factor == 0.0 and w.log == []
+
+def test_ad_hoc_events_and_shared_prefix_runs_once():
+    calls = []
+    probe = Event(Movie.MATRIX, "Probe", "", {Theme.FREE_WILL}, [], effect=lambda w: calls.append(1))
+    lists = [[probe, ev_peace()], [probe, ev_peace()]]
+    out = list(run_event_lists(lists))
+    assert sorted(i for i, _ in out) == [0, 1]
+    assert len(calls) == 1  # gemeinsamer Präfix nur einmal ausgeführt
+    assert out[0][1].log[-1]["event"] == "End"
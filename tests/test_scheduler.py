@@ -0,0 +1,70 @@
+from matrix_sim.events import ev_train_neo
+from matrix_sim.movies import init_world
+from matrix_sim.registry import REGISTRY
+from matrix_sim.scheduler import DiscreteEventSimulator, Scheduler, SentinelWaves, default_processes
+
+def test_actions_run_in_time_order_with_cooldowns():
+    s = Scheduler(init_world())
+    seen = []
+    s.schedule(5.0, lambda s: seen.append(("late", s.now)))
+    s.schedule(0.0, lambda s: seen.append(("a", s.now)), duration=1.0, key="k", cooldown=2.0)
+    # gleicher Schlüssel: startet erst nach Dauer + Cooldown von "a"
+    s.schedule(0.0, lambda s: seen.append(("b", s.now)), duration=1.0, key="k")
+    s.every(2.0, lambda s: seen.append(("tick", s.now)) or s.now < 4.0)
+    s.run()
+    assert seen == [("a", 1.0), ("tick", 2.0), ("b", 4.0), ("tick", 4.0), ("late", 5.0)]
+
+def test_recurring_event_survives_a_skip():
+    # Training braucht neo_awake: erster Lauf wird übersprungen, darf die Wiederholung nicht beenden
+    w = init_world()
+    s = Scheduler(w)
+    s.every(1.0, REGISTRY.get(ev_train_neo), until=3.0)
+    s.at(1.5, lambda s: setattr(s.world, "neo_awake", True))
+    s.run()
+    assert [r["event"] for r in w.log] == ["[SKIP] Training (Kung Fu, Bullet Time)",
+                                            "Training (Kung Fu, Bullet Time)",
+                                            "Training (Kung Fu, Bullet Time)"]
+
+def test_triggers_fire_once_after_the_action_that_enables_them():
+    w = init_world()
+    s = Scheduler(w)
+    fired = []
+    s.when(lambda w: w.smith_factor > 0.5, lambda s: fired.append(s.now))
+    for t in (1.0, 2.0, 3.0):
+        s.at(t, lambda s: setattr(s.world, "smith_factor", s.world.smith_factor + 0.3))
+    s.run()
+    assert fired == [2.0]
+
+def test_idle_time_is_skipped():
+    w = init_world()
+    w.zion_defense = 1.0
+    s = Scheduler(w)
+    SentinelWaves(period=1e6, intensity=0.25).start(s)
+    n = s.run(until=1e12)
+    # vier Wellen, die fünfte sieht Zion gefallen und beendet sich
+    assert n == 5 and s.now == 5e6 and not w.zion_alive
+
+def test_default_processes_reach_peace():
+    w = DiscreteEventSimulator(init_world(), mark_time=False).run(default_processes())
+    events = [r["event"] for r in w.log]
+    assert events[-3:] == ["Final fight: Neo vs Smith", "Peace accord", "End"]
+    assert w.peace and w.zion_alive
+
+def test_final_bonus_comes_from_the_config():
+    # zu schwacher Bonus: Smith gewinnt den Endkampf, kein Frieden
+    w = DiscreteEventSimulator(init_world(), mark_time=False).run(default_processes(final_bonus=-50))
+    assert not w.peace and w.neo_alive
+
+def test_smith_rate_and_zion_intensity_reach_the_processes():
+    run = lambda **kw: DiscreteEventSimulator(init_world(), mark_time=False).run(default_processes(**kw))
+    # langsamer Smith: die Konfrontation kommt zu spät, Zion fällt vorher
+    slow = run(smith_rate=0.1)
+    assert not slow.peace and not slow.zion_alive and slow.smith_factor < 0.6
+    # stärkere Wellen (deterministisch): Zion fällt trotz schnellem Smith
+    strong = run(zion_intensity=0.6)
+    assert not strong.zion_alive and run().zion_alive
+
+def test_cli_des_uses_the_config_rates():
+    from matrix_sim.cli import build_parser, run_args
+    snap = lambda *extra: run_args(build_parser().parse_args(["--mode", "des", *extra]), None).snapshot()
+    assert snap() != snap("--smith-rate", "0.1") and snap()["zion_alive"] and not snap("--zion-intensity", "0.6")["zion_alive"]
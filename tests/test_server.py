@@ -0,0 +1,109 @@
+import asyncio, json, os, tempfile
+import pytest
+from matrix_sim.server import SimulationService, cache_key, parse_request, start_server
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_requests_match_cli_and_hit_the_cache(capsys):
+    from matrix_sim.cli import main
+    main(["--scenario", "zion_falls", "--output", "events"])
+    expected = capsys.readouterr().out
+
+    async def go():
+        svc = SimulationService(workers=1)
+        reqs = [{"id": i, "argv": ["--scenario", "zion_falls", "--output", "events"]} for i in range(3)]
+        first = await asyncio.gather(*(svc.submit(r) for r in reqs))
+        again = await svc.submit({"argv": ["--output", "events", "--scenario", "zion_falls"]})
+        return svc, first, again
+
+    svc, first, again = run(go())
+    assert [r["id"] for r in first] == [0, 1, 2]
+    assert all(r["ok"] and r["output"] == expected for r in first)
+    assert svc.batches == 1                      # drei gleichzeitige Anfragen, ein Batch
+    assert again["cached"] and again["output"] == expected
+    assert first[0]["summary"]["zion_alive"] is False
+
+def test_bad_requests_fail_alone():
+    async def go():
+        svc = SimulationService(workers=1)
+        return await asyncio.gather(svc.submit({"argv": ["--mode", "nope"]}),
+                                    svc.submit({"argv": [], "format": "summary"}))
+    bad, good = run(go())
+    assert not bad["ok"] and "invalid choice" in bad["error"]
+    assert good["ok"] and "output" not in good and good["summary"]["peace"]
+
+def test_unix_socket_json_lines():
+    async def go(path):
+        svc = SimulationService(workers=1)
+        server = await start_server(svc, socket_path=path)
+        async with server:
+            reader, writer = await asyncio.open_unix_connection(path)
+            for i, fmt in enumerate(["summary", "timeline"]):
+                writer.write((json.dumps({"id": i, "argv": ["--mode", "agent"], "format": fmt}) + "\n").encode())
+            writer.write(b"not json\n")
+            await writer.drain()
+            writer.write_eof()
+            lines = [json.loads(l) for l in (await reader.read()).splitlines()]
+            writer.close()
+        return lines
+    with tempfile.TemporaryDirectory() as d:
+        a, b, c = run(go(os.path.join(d, "sim.sock")))
+    assert (a["id"], b["id"]) == (0, 1) and a["summary"] == b["summary"]
+    assert "=== Prelude ===" in b["output"] and not c["ok"]
+
+def test_http_post_run():
+    async def go():
+        svc = SimulationService(workers=1)
+        server = await start_server(svc, host="127.0.0.1", port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            body = json.dumps({"argv": ["--scenario", "neo_chooses_zion"], "format": "summary"}).encode()
+            raws = []
+            for ctype in (b"application/json; charset=utf-8", b"text/plain"):
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"POST /run HTTP/1.1\r\nHost: x\r\nContent-Type: %s\r\nContent-Length: %d\r\n\r\n"
+                             % (ctype, len(body)) + body)
+                raws.append(await reader.read())
+                writer.close()
+        return raws
+    ok, plain = run(go())
+    head, _, body = ok.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200")
+    assert json.loads(body)["summary"]["final"]["prophecy_valid"] is True
+    # einfacher text/plain-POST (z. B. aus einer Webseite) wird abgewiesen
+    assert plain.startswith(b"HTTP/1.1 415")
+
+def test_file_options_are_refused_or_confined(tmp_path):
+    with pytest.raises(ValueError, match="--jsonl is not allowed"):
+        parse_request({"argv": ["--jsonl", "/tmp/x.jsonl"]})
+    with pytest.raises(ValueError, match="--cache-dir is not allowed"):
+        parse_request({"argv": ["--cache-dir", "c"]})
+    for escape in ("../x.jsonl", "/etc/x.jsonl"):
+        with pytest.raises(ValueError, match="outside the output directory"):
+            parse_request({"argv": ["--spill", escape]}, str(tmp_path))
+    args, _ = parse_request({"argv": ["--jsonl", "runs/a.jsonl"]}, str(tmp_path))
+    assert args.jsonl == os.path.join(os.path.realpath(tmp_path), "runs", "a.jsonl")
+
+def test_file_outputs_are_never_cached(tmp_path):
+    # sonst würde eine wiederholte Anfrage aus dem LRU beantwortet und die Datei nie geschrieben
+    for flag in ("--jsonl", "--spill", "--binlog", "--cache-dir"):
+        args, fmt = parse_request({"argv": [flag, "out"]}, str(tmp_path))
+        assert cache_key(args, fmt) is None
+    assert cache_key(*parse_request({"argv": []})) is not None
+
+    async def go():
+        svc = SimulationService(workers=1, output_dir=str(tmp_path))
+        for _ in range(2):
+            res = await svc.submit({"argv": ["--binlog", "run.bin"], "format": "summary"})
+            assert res["ok"] and not res["cached"]
+            assert (tmp_path / "run.bin").exists()
+            (tmp_path / "run.bin").unlink()
+    run(go())
+
+def test_requests_never_use_the_disk_cache():
+    async def go():
+        svc = SimulationService(workers=1)
+        return await svc.submit({"argv": ["--cache"], "format": "summary"})
+    assert run(go())["ok"]
+    assert not os.path.exists(os.environ["MATRIX_SIM_CACHE_DIR"])   # nichts gelesen, nichts geschrieben
@@ -0,0 +1,52 @@
+import gzip, json, random
+import pytest
+from matrix_sim.agents import AgentSimulator, NeoAgent, SmithAgent, MachineCollectiveAgent
+from matrix_sim.movies import build_trilogy, SimulationConfig
+from matrix_sim.simulate import TimelineSimulator
+from matrix_sim.sinks import JsonlSink, ListSink, LogSink, ThreadedSink, open_sink
+
+def read_jsonl(path):
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_timeline_jsonl_matches_log(tmp_path):
+    out = tmp_path / "run.jsonl"
+    world, events = build_trilogy(SimulationConfig())
+    result = TimelineSimulator(world, jsonl_path=str(out)).run(events)
+    assert read_jsonl(out) == json.loads(json.dumps(result.log))
+
+def test_gzip_threaded_sink_and_agent_mode(tmp_path):
+    out = tmp_path / "agent.jsonl.gz"
+    sink = open_sink(str(out), threaded=True, max_records=2)
+    rng = random.Random(0)
+    world, _ = build_trilogy(SimulationConfig())
+    agents = [NeoAgent("n", rng), SmithAgent("s", rng), MachineCollectiveAgent("m", rng)]
+    with sink:
+        result = AgentSimulator(world, rng, sink=sink).run(agents)
+    assert read_jsonl(out) == json.loads(json.dumps(result.log))
+
+def test_buffer_flushes_by_count(tmp_path):
+    out = tmp_path / "buf.jsonl"
+    sink = JsonlSink(str(out), max_records=3)
+    for i in range(2):
+        sink.write({"i": i})
+    assert not out.exists()  # noch gepuffert
+    sink.write({"i": 2})
+    assert len(read_jsonl(out)) == 3
+    sink.close()
+
+def test_threaded_sink_surfaces_errors():
+    class Boom(LogSink):
+        def write(self, rec):
+            raise RuntimeError("disk full")
+    sink = ThreadedSink(Boom())
+    sink.write({"x": 1})
+    with pytest.raises(RuntimeError):
+        sink.close()
+
+def test_caller_owned_sink_is_not_closed():
+    sink = ListSink()
+    world, events = build_trilogy(SimulationConfig())
+    TimelineSimulator(world, sink=sink).run(events)
+    assert sink.records[-1]["event"] == "End" and len(sink.records) == len(world.log)
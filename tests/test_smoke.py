@@ -8,3 +8,10 @@ def test_timeline_runs():
     assert any("Matrix (1999)" in rec["movie"] for rec in r.log)
     assert any("Matrix Revolutions" in rec["movie"] for rec in r.log)
     assert r.log[-1]["event"] == "End"
+
+def test_markers_are_shared():
+    from matrix_sim.agents import AgentSimulator
+    from matrix_sim.scheduler import DiscreteEventSimulator
+    # eine Instanz pro Name, egal welcher Simulator fragt
+    assert TimelineSimulator._m("Prelude") is AgentSimulator._m("Prelude") is DiscreteEventSimulator._m("Prelude")
+    assert AgentSimulator._m("Tick").value == "Tick"
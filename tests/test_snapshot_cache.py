@@ -0,0 +1,35 @@
+import copy, json, pickle, random
+import pytest
+from matrix_sim.agents import AgentSimulator, NeoAgent, SmithAgent
+from matrix_sim.engine import Snapshot
+from matrix_sim.movies import init_world
+
+def test_snapshot_reused_until_a_field_changes():
+    w = init_world()
+    a = w.snapshot()
+    assert w.snapshot() is a
+    w.trinity_alive = True          # gleicher Wert -> gleiches Objekt
+    assert w.snapshot() is a
+    w.matrix_control = 0.91234
+    b = w.snapshot()
+    assert b is not a and b["matrix_control"] == 0.912
+    assert {k: v for k, v in b.items() if k != "matrix_control"} == {k: v for k, v in a.items() if k != "matrix_control"}
+
+def test_snapshot_is_immutable_but_serialisable():
+    snap = init_world().snapshot()
+    with pytest.raises(TypeError):
+        snap["peace"] = True
+    assert json.loads(json.dumps(snap)) == snap
+    assert pickle.loads(pickle.dumps(snap)) == snap and isinstance(copy.deepcopy(snap), Snapshot)
+
+def test_clone_tracks_changes_separately():
+    w = init_world()
+    w.snapshot()
+    c = w.clone()
+    c.smith_factor = 0.5
+    assert w.snapshot()["smith_factor"] == 0.0 and c.snapshot()["smith_factor"] == 0.5
+
+def test_long_agent_run_shares_snapshots():
+    rng = random.Random(0)
+    w = AgentSimulator(init_world(), rng, max_ticks=200).run([NeoAgent("n", rng), SmithAgent("s", rng)])
+    assert len({id(r["snapshot"]) for r in w.log}) < len(w.log) // 2
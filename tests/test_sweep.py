@@ -0,0 +1,34 @@
+import pytest
+from matrix_sim.movies import build_trilogy, SimulationConfig
+from matrix_sim.simulate import TimelineSimulator
+from matrix_sim.sweep import sweep, expand_grid, frange, parse_values
+
+def test_expand_grid_is_cartesian():
+    grid = list(expand_grid(["TRINITY", "ZION"], [0.1, 0.3], [0.25], [6, 8]))
+    assert len(grid) == 8
+    assert grid[0] == SimulationConfig("TRINITY", 0.1, 0.25, 6)
+    assert frange(0.1, 0.5, 0.1) == [0.1, 0.2, 0.3, 0.4, 0.5]
+    assert parse_values("2:6:2", int) == [2, 4, 6]
+
+def test_sweep_rows_match_single_runs():
+    grid = list(expand_grid(["TRINITY", "ZION"], [0.15, 0.45], [0.25, 0.40], [6, 8]))
+    rows = list(sweep(grid, workers=2, chunksize=3, ordered=True))
+    assert [r["index"] for r in rows] == list(range(len(grid)))
+    for cfg, row in zip(grid, rows):
+        world, events = build_trilogy(cfg)
+        final = TimelineSimulator(world).run(events).log[-1]["snapshot"]
+        assert row["final"] == final
+        assert row["peace"] is final["peace"] and row["zion_alive"] is final["zion_alive"]
+
+def test_sweep_in_process_reports_skips():
+    rows = list(sweep([SimulationConfig()], workers=1))
+    assert rows[0]["skipped"] == []
+    assert rows[0]["config"]["architect_choice"] == "TRINITY"
+
+def test_cli_reports_bad_value_specs(capsys):
+    # kaputte Werteliste -> argparse-Fehler statt ValueError-Traceback
+    from matrix_sim.cli import main
+    for argv in (["--smith-rate", "abc"], ["--zion-intensity", "0:1"], ["--final-bonus", "1:2:0"]):
+        with pytest.raises(SystemExit) as exc:
+            main(["sweep", "--workers", "1", *argv])
+        assert exc.value.code == 2 and "matrix-sim sweep: error:" in capsys.readouterr().err
@@ -0,0 +1,49 @@
+from matrix_sim.engine import Theme, ThemeFlag, theme_mask
+from matrix_sim.eventlog import EventLog
+from matrix_sim.movies import build_trilogy, SimulationConfig
+from matrix_sim.simulate import TimelineSimulator
+from matrix_sim.themeindex import ThemeIndex
+
+def indexed_run(log=None):
+    world, events = build_trilogy(SimulationConfig())
+    world.index = ThemeIndex()
+    if log is not None:
+        world.log = log
+    return TimelineSimulator(world).run(events)
+
+def test_flags_mirror_theme_enum():
+    assert [f.name for f in ThemeFlag] == [t.name for t in Theme]
+    assert theme_mask(["FREE_WILL", Theme.DETERMINISM]) == ThemeFlag.FREE_WILL | ThemeFlag.DETERMINISM
+    assert Theme.SMITH_SHADOW.flag is ThemeFlag.SMITH_SHADOW
+
+def test_live_index_matches_log_scan():
+    w = indexed_run()
+    counts = {}
+    for rec in w.log:
+        for t in rec["themes"]:
+            counts[t] = counts.get(t, 0) + 1
+    assert w.index.coverage() == counts
+    assert w.index.coverage() == ThemeIndex.from_log(w.log).coverage()
+    free = [i for i, rec in enumerate(w.log) if "FREE_WILL" in rec["themes"]]
+    assert w.index.query(any_of=["FREE_WILL"]) == free
+    assert list(w.index.by_movie("Prelude")) == [0]
+
+def test_and_or_queries():
+    w = indexed_run(EventLog())
+    both = w.index.query(all_of=[Theme.SMITH_SHADOW, Theme.LOVE_SACRIFICE])
+    assert [w.log[i]["event"] for i in both] == ["Final fight: Neo vs Smith"]
+    either = w.index.query(any_of=["DETERMINISM", "UNDERWORLD_PASSAGES"])
+    assert [w.log[i]["event"] for i in either] == ["Merovingian & Persephone", "The Architect (choice)"]
+    assert w.index.query(all_of=["CONTROL_SYSTEMS"], any_of=["DETERMINISM"]) == either[1:]
+
+def test_bounded_retention_keeps_record_numbers():
+    # Ring- und Null-Log wachsen nicht mit: Positionen müssen trotzdem fortlaufend sein
+    full = indexed_run()
+    for retention in ("ring", "none"):
+        world, events = build_trilogy(SimulationConfig())
+        world.set_retention(retention, keep=3)
+        world.index = ThemeIndex()
+        TimelineSimulator(world).run(events)
+        assert world.index.total == world.log.total == len(full.log)
+        assert world.index.coverage() == full.index.coverage() == world.log.summary.themes
+        assert world.index.query(any_of=["FREE_WILL"]) == full.index.query(any_of=["FREE_WILL"])
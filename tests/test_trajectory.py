@@ -0,0 +1,93 @@
+import json, math, pickle, random, statistics
+import pytest
+from matrix_sim.movies import build_trilogy
+from matrix_sim.simulate import TimelineSimulator
+from matrix_sim.sweep import expand_grid
+from matrix_sim.trajectory import (Histogram, QuantileSketch, TrajectoryAggregator, Welford,
+                                   aggregate_agents, aggregate_timelines)
+
+def test_welford_matches_statistics_and_merges():
+    rng = random.Random(1)
+    xs = [rng.gauss(5, 2) for _ in range(1000)]
+    whole, a, b = Welford(), Welford(), Welford()
+    for i, x in enumerate(xs):
+        whole.add(x)
+        (a if i % 3 else b).add(x)
+    a.merge(b)
+    for w in (whole, a):
+        assert w.n == 1000 and math.isclose(w.mean, statistics.fmean(xs))
+        assert math.isclose(w.variance, statistics.variance(xs)) and (w.min, w.max) == (min(xs), max(xs))
+
+def test_sketch_relative_error_and_merge():
+    rng = random.Random(2)
+    xs = [rng.lognormvariate(3, 2) for _ in range(20_000)] + [0.0] * 500 + [-rng.random() for _ in range(500)]
+    parts = [QuantileSketch(0.01) for _ in range(4)]
+    for i, x in enumerate(xs):
+        parts[i % 4].add(x)
+    sk = pickle.loads(pickle.dumps(parts[0]))   # Teilergebnisse kommen gepickelt aus Workern
+    for p in parts[1:]:
+        sk.merge(p)
+    xs.sort()
+    for q in (0.01, 0.03, 0.05, 0.25, 0.5, 0.9, 0.99):
+        exact = xs[int(q * (len(xs) - 1))]
+        assert abs(sk.quantile(q) - exact) <= 0.0101 * abs(exact) + 1e-12, q
+    assert len(sk.pos) < 2000                     # Speicher: Buckets, nicht Werte
+
+def test_sketch_without_positive_values():
+    # nur negative Werte bzw. Nullen: q > 1 darf nicht über ein leeres pos laufen
+    neg = QuantileSketch(0.01)
+    for x in (-5.0, -2.0, -1.0):
+        neg.add(x)
+    assert math.isclose(neg.quantile(1.0), -1.0, rel_tol=0.011)
+    assert neg.quantile(1.5) == neg.quantile(1.0)
+    zeros = QuantileSketch(0.01)
+    zeros.add(-3.0)
+    zeros.add(0.0)
+    assert zeros.quantile(1.5) == 0.0
+    assert pickle.loads(pickle.dumps(neg))._gamma == neg._gamma
+
+def test_histogram_edges():
+    h = Histogram(0.0, 1.0, 4)
+    for x in (-0.1, 0.0, 0.25, 0.999, 1.0, 1.5):
+        h.add(x)
+    assert h.to_dict() == {"lo": 0.0, "hi": 1.0, "counts": [1, 1, 0, 2], "under": 1, "over": 1}
+
+def test_timeline_positions_match_logs():
+    grid = list(expand_grid(("TRINITY", "ZION"), (0.1, 0.4, 0.8), (0.1, 0.5)))
+    agg = TrajectoryAggregator()
+    logs = []
+    for cfg in grid:
+        w, events = build_trilogy(cfg)
+        with agg.track(w):
+            logs.append(TimelineSimulator(w).run(events).log)
+    assert agg.runs == len(grid) and len(agg.positions) == len(logs[0])
+    for pos in (0, 9, len(logs[0]) - 1):
+        vals = [log[pos]["snapshot"]["smith_factor"] for log in logs]
+        m = agg.positions[pos]["smith_factor"].moments
+        assert math.isclose(m.mean, statistics.fmean(vals), abs_tol=1e-12) and (m.min, m.max) == (min(vals), max(vals))
+    par = aggregate_timelines(grid, workers=2, chunksize=3)
+    assert par.runs == agg.runs
+    for mine, theirs in zip(agg.positions, par.positions):
+        assert math.isclose(mine["zion_defense"].moments.mean, theirs["zion_defense"].moments.mean, abs_tol=1e-12)
+        assert mine["zion_defense"].hist.counts == theirs["zion_defense"].hist.counts
+
+def test_agent_ticks_constant_memory_and_json():
+    small = aggregate_agents(50, max_ticks=8, workers=1)
+    big = aggregate_agents(400, max_ticks=8, workers=2, chunksize=64)
+    assert big.runs == 400 and len(small.positions) <= len(big.positions) <= 8
+    buckets = lambda a: sum(len(s.sketch.pos) for st in a.positions for s in st.values())
+    assert buckets(big) < 8 * 4 * 200                # durch Horizont und alpha begrenzt, nicht durch Läufe
+    # Zustand am Ende jedes Ticks: Tick 1 erreichen alle Läufe
+    assert big.positions[0]["smith_factor"].moments.n == 400
+    assert sum(big.positions[0]["matrix_control"].hist.counts) + big.positions[0]["matrix_control"].hist.over == 400
+    d = json.loads(json.dumps(big.to_dict()))
+    assert d["runs"] == 400 and d["by"] == "tick" and set(d["positions"][0]) == set(big.fields)
+    assert d["positions"][0]["smith_factor"]["quantiles"]["p50"] is not None
+
+def test_cli_reports_bad_field_specs(capsys):
+    # unbekanntes Feld oder kaputtes LO:HI:BINS -> argparse-Fehler statt Traceback
+    from matrix_sim.cli import main
+    for spec in ("nope=0:1:4", "smith_factor=0:1", "smith_factor=a:1:4", "smith_factor=1:0:4"):
+        with pytest.raises(SystemExit) as exc:
+            main(["trajectory", "--runs", "2", "--workers", "1", "--field", spec])
+        assert exc.value.code == 2 and "matrix-sim trajectory: error:" in capsys.readouterr().err